@@ -6,3 +6,5 @@ from .models import UserProfile
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'phone', 'city')
     search_fields = ('user__username', 'phone', 'city')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
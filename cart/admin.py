@@ -1,5 +1,18 @@
+import datetime
+
 from django.contrib import admin
-from .models import Order, OrderItem
+from django.db.models import Sum
+from django.template.response import TemplateResponse
+from django.utils import timezone
+
+from core.pagination import EstimatedCountPaginator
+
+from .analytics import sales_report
+from .models import CartItem, DailySales, Order, OrderItem, OrderNotification
+
+SALES_PERIODS = [7, 30, 90, 365]
+CITY_FILTER_DAYS = 90
+CITY_FILTER_LIMIT = 20
 
 
 class OrderItemInline(admin.TabularInline):
@@ -7,15 +20,104 @@ class OrderItemInline(admin.TabularInline):
     extra = 0
     readonly_fields = ('product', 'product_name', 'quantity', 'price', 'subtotal')
 
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
     def subtotal(self, obj):
         return obj.subtotal
 
 
+class CityFilter(admin.SimpleListFilter):
+    """
+    The busiest recent cities, read from the daily sales rollups.
+
+    A plain ``list_filter`` on ``city`` runs ``SELECT DISTINCT city`` over
+    every order on each changelist load.
+    """
+    title = 'city'
+    parameter_name = 'city'
+
+    def lookups(self, request, model_admin):
+        since = timezone.localdate() - datetime.timedelta(days=CITY_FILTER_DAYS)
+        cities = (
+            DailySales.objects.filter(dimension='city', day__gte=since).values('key')
+            .annotate(orders=Sum('orders')).order_by('-orders', 'key').values_list('key', flat=True)[:CITY_FILTER_LIMIT]
+        )
+        return [(city, city) for city in cities if city]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(city=self.value())
+        return queryset
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ('id', 'full_name', 'phone', 'city', 'total_price', 'status', 'created_at')
-    list_filter = ('status', 'created_at', 'city')
+    list_filter = ('status', 'created_at', CityFilter)
     list_editable = ('status',)
     search_fields = ('full_name', 'phone', 'address')
     readonly_fields = ('created_at', 'updated_at')
+    raw_id_fields = ('user',)
     inlines = [OrderItemInline]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(OrderNotification)
+class OrderNotificationAdmin(admin.ModelAdmin):
+    list_display = ('order', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    readonly_fields = ('order', 'attempts', 'last_error', 'created_at', 'sent_at')
+
+
+@admin.register(CartItem)
+class CartItemAdmin(admin.ModelAdmin):
+    list_display = ('cart_key', 'product', 'quantity', 'price', 'updated_at')
+    list_select_related = ('product',)
+    search_fields = ('cart_key', 'product__name')
+    raw_id_fields = ('product',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(admin.ModelAdmin):
+    """Sales dashboard over the ``rollup_orders`` tables instead of a change list."""
+    change_list_template = 'admin/cart/dailysales/dashboard.html'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        if not self.has_view_permission(request):
+            return super().changelist_view(request, extra_context)
+        try:
+            period = int(request.GET.get('days', 30))
+        except ValueError:
+            period = 30
+        if period not in SALES_PERIODS:
+            period = 30
+        last = timezone.localdate()
+        first = last - datetime.timedelta(days=period - 1)
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Sales',
+            'periods': SALES_PERIODS,
+            'period': period,
+            'first': first,
+            'last': last,
+            'report': sales_report(first, last),
+            **(extra_context or {}),
+        }
+        return TemplateResponse(request, self.change_list_template, context)
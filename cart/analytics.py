@@ -0,0 +1,179 @@
+"""
+Daily sales rollups.
+
+``DailySales`` keeps one row per day for the store total and for every
+product, category, city and status that sold that day, so the admin sales
+dashboard sums a few rows per day however many orders there are.
+
+``manage.py rollup_orders`` keeps them current. Each run re-aggregates only
+the days of orders created or changed (``Order.updated_at``) since the last
+run, plus days flagged ``stale`` when an order or order line was deleted.
+A day is always recomputed from scratch, ``ROLLUP_CHUNK_DAYS`` at a time,
+so running twice, or overlapping the previous run, is harmless, and even a
+full rebuild holds only a week of rows in memory.
+
+Cancelled orders only count towards the ``status`` breakdown. Changes made
+with ``QuerySet.update()`` don't touch ``updated_at``; run with ``--full``
+after those.
+"""
+import datetime
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Min, Subquery, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailySales, Order, OrderItem, RollupRun
+
+EXCLUDED_STATUSES = ('cancelled',)
+# Re-read orders changed this long before the last run, in case a
+# transaction committed after it with an earlier ``updated_at``.
+ROLLUP_OVERLAP = datetime.timedelta(minutes=5)
+# Days aggregated and written per transaction, which bounds the rows held in memory.
+ROLLUP_CHUNK_DAYS = 7
+
+LINE_REVENUE = ExpressionWrapper(F('quantity') * F('price'), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def mark_stale(created_at):
+    """
+    Flag the rollups of the day ``created_at`` falls on for recomputing.
+
+    A day without rows hasn't been rolled up yet and needs no flag.
+    """
+    DailySales.objects.filter(day=timezone.localdate(created_at)).update(stale=True)
+
+
+def mark_order_stale(order_id):
+    """:func:`mark_stale` for the day of order ``order_id``, in one query."""
+    day = Order.objects.filter(pk=order_id).annotate(day=TruncDate('created_at')).values('day')[:1]
+    DailySales.objects.filter(day=Subquery(day)).update(stale=True)
+
+
+def day_spans(days, chunk_days=ROLLUP_CHUNK_DAYS):
+    """Collapse sorted ``days`` into ``(first, last)`` runs of at most ``chunk_days`` consecutive days."""
+    spans = []
+    for day in days:
+        if spans and day - spans[-1][1] == datetime.timedelta(days=1) and (day - spans[-1][0]).days < chunk_days:
+            spans[-1][1] = day
+        else:
+            spans.append([day, day])
+    return [tuple(span) for span in spans]
+
+
+def date_range(first, last):
+    return (first + datetime.timedelta(days=offset) for offset in range((last - first).days + 1))
+
+
+def _rollup_rows(dimension, groups, computed_at):
+    for group in groups:
+        key = group.get('key')
+        yield DailySales(
+            day=group['day'], dimension=dimension, key='' if key is None else str(key), label=group.get('label') or key or '',
+            orders=group['orders'], units=group['units'] or 0, revenue=group['revenue'] or 0, computed_at=computed_at,
+        )
+
+
+def aggregate_span(first, last, computed_at):
+    """``DailySales`` rows for every day from ``first`` to ``last``."""
+    start, end = day_start(first), day_start(last + datetime.timedelta(days=1))
+    orders = Order.objects.filter(created_at__gte=start, created_at__lt=end).annotate(day=TruncDate('created_at'))
+    lines = OrderItem.objects.filter(order__created_at__gte=start, order__created_at__lt=end).annotate(
+        day=TruncDate('order__created_at'),
+    )
+    counted_orders = orders.exclude(status__in=EXCLUDED_STATUSES)
+    counted_lines = lines.exclude(order__status__in=EXCLUDED_STATUSES)
+
+    rows = []
+    for dimension, order_groups, line_groups in [
+        ('total', counted_orders.values('day'), counted_lines.values('day')),
+        ('city', counted_orders.values('day', key=F('city')), counted_lines.values('day', key=F('order__city'))),
+        ('status', orders.values('day', key=F('status')), lines.values('day', key=F('order__status'))),
+    ]:
+        # Counted separately: joining the lines would repeat each order's total.
+        units = {
+            (group['day'], group.get('key')): group['units']
+            for group in line_groups.annotate(units=Sum('quantity')).order_by()
+        }
+        groups = order_groups.annotate(orders=Count('pk'), revenue=Sum('total_price')).order_by()
+        groups = [dict(group, units=units.get((group['day'], group.get('key')))) for group in groups]
+        rows.extend(_rollup_rows(dimension, groups, computed_at))
+
+    for dimension, key, label in [
+        ('product', F('product_id'), Max('product_name')),
+        ('category', F('product__category_id'), Max('product__category__name')),
+    ]:
+        groups = counted_lines.values('day', key=key).annotate(
+            label=label, orders=Count('order_id', distinct=True), units=Sum('quantity'), revenue=Sum(LINE_REVENUE),
+        ).order_by()
+        rows.extend(_rollup_rows(dimension, groups, computed_at))
+    return rows
+
+
+def changed_days(since):
+    """Days with orders changed after ``since``, or flagged stale."""
+    changed = Order.objects.filter(updated_at__gt=since).annotate(day=TruncDate('created_at'))
+    days = set(changed.values_list('day', flat=True).distinct())
+    days.update(DailySales.objects.filter(stale=True).values_list('day', flat=True).distinct())
+    return days
+
+
+def rollup_watermark():
+    return RollupRun.objects.aggregate(last=Max('started_at'))['last']
+
+
+def rollup_orders(full=False):
+    """
+    Bring ``DailySales`` up to date; returns ``(days recomputed, rows written)``.
+
+    The run time is taken before reading any order and recorded as a
+    ``RollupRun`` once every day is written, becoming the next run's
+    watermark; an interrupted run is simply redone by the next one.
+    """
+    computed_at = timezone.now()
+    since = None if full else rollup_watermark()
+    if since is None:
+        bounds = Order.objects.aggregate(first=Min('created_at'), last=Max('created_at'))
+        if bounds['first'] is None:
+            days = []
+            DailySales.objects.all().delete()
+        else:
+            first, last = timezone.localdate(bounds['first']), timezone.localdate(bounds['last'])
+            DailySales.objects.exclude(day__range=(first, last)).delete()
+            days = date_range(first, last)
+    else:
+        days = sorted(changed_days(since - ROLLUP_OVERLAP))
+
+    recomputed = written = 0
+    # Each chunk replaces its days in one transaction, so the dashboard
+    # never sees a half-written day.
+    for first, last in day_spans(days):
+        rows = aggregate_span(first, last, computed_at)
+        with transaction.atomic():
+            DailySales.objects.filter(day__range=(first, last)).delete()
+            DailySales.objects.bulk_create(rows, batch_size=2000)
+        recomputed += (last - first).days + 1
+        written += len(rows)
+    RollupRun.objects.create(started_at=computed_at, full=since is None, days=recomputed, rows=written)
+    return recomputed, written
+
+
+def sales_report(first, last, top=10):
+    """Totals, daily series and top breakdowns from ``first`` to ``last``, read from the rollups only."""
+    rows = DailySales.objects.filter(day__range=(first, last))
+    sums = {'orders': Sum('orders'), 'units': Sum('units'), 'revenue': Sum('revenue')}
+    report = {
+        'totals': rows.filter(dimension='total').aggregate(**sums),
+        'daily': list(rows.filter(dimension='total').order_by('-day').values('day', 'orders', 'units', 'revenue')),
+        'status': list(rows.filter(dimension='status').values('key').annotate(**sums).order_by('-orders')),
+        'computed_at': rollup_watermark(),
+        'stale': DailySales.objects.filter(stale=True).exists(),
+    }
+    for dimension in ('product', 'category', 'city'):
+        groups = rows.filter(dimension=dimension).values('key').annotate(label=Max('label'), **sums)
+        report[dimension] = list(groups.order_by('-revenue')[:top])
+    return report
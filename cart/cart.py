@@ -0,0 +1,155 @@
+from decimal import Decimal
+
+from products.models import Product
+from .storage import get_cart_storage
+
+
+class CartLine:
+    """A cart entry joined with its current product row."""
+
+    def __init__(self, product, quantity, price, price_changed=False, quantity_adjusted=False):
+        self.product = product
+        self.quantity = quantity
+        self.price = price
+        self.price_changed = price_changed
+        self.quantity_adjusted = quantity_adjusted
+
+    @property
+    def subtotal(self):
+        return self.price * self.quantity
+
+
+class Cart:
+    """
+    Shopping cart on top of the configured cart storage.
+
+    The storage holds ``{product_id: {'quantity', 'price', 'name'}}``.
+    Iterating the cart hydrates every line with a single query and
+    reconciles it against the database: prices are refreshed, quantities
+    are clamped to stock, and products that are gone or sold out are
+    dropped. Only the changed lines are written back.
+
+    Async views build the cart with ``await Cart.aload(request)`` and use
+    the ``a``-prefixed mutators.
+    """
+
+    def __init__(self, request):
+        self.storage = get_cart_storage(request)
+        self.data = self.storage.load()
+        self._lines = None
+        self.removed = []
+
+    @classmethod
+    async def aload(cls, request):
+        await get_cart_storage(request).aload()
+        return cls(request)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def __bool__(self):
+        return bool(self.data)
+
+    @property
+    def count(self):
+        """Total quantity across all lines, without touching the database."""
+        return self.storage.count()
+
+    @property
+    def lines(self):
+        if self._lines is None:
+            self._lines = self._hydrate()
+        return self._lines
+
+    @property
+    def total(self):
+        return sum((line.subtotal for line in self.lines), Decimal('0.00'))
+
+    @property
+    def has_changes(self):
+        return bool(self.removed) or any(
+            line.price_changed or line.quantity_adjusted for line in self.lines
+        )
+
+    def _hydrate(self):
+        products = Product.objects.select_related('category', 'cover_image').in_bulk(
+            [int(product_id) for product_id in self.data]
+        )
+        lines = []
+        for product_key, item in list(self.data.items()):
+            product = products.get(int(product_key))
+            if product is None or product.stock <= 0:
+                self.removed.append(product.name if product else item.get('name', 'An item'))
+                self.storage.delete_line(product_key)
+                continue
+
+            quantity = min(item['quantity'], product.stock)
+            line = CartLine(
+                product, quantity, product.price,
+                price_changed=Decimal(item['price']) != product.price,
+                quantity_adjusted=quantity != item['quantity'],
+            )
+            if line.price_changed or line.quantity_adjusted:
+                self.storage.save_line(product_key, dict(item, quantity=quantity, price=str(product.price)))
+            lines.append(line)
+        return lines
+
+    def _added_line(self, product, quantity):
+        product_key = str(product.pk)
+        current = self.data.get(product_key, {}).get('quantity', 0)
+        return product_key, {
+            'quantity': min(current + quantity, product.stock),
+            'price': str(product.price),
+            'name': product.name,
+        }
+
+    def add(self, product, quantity=1):
+        self.storage.save_line(*self._added_line(product, quantity))
+        self._lines = None
+
+    async def aadd(self, product, quantity=1):
+        await self.storage.asave_line(*self._added_line(product, quantity))
+        self._lines = None
+
+    def update(self, product, quantity):
+        product_key = str(product.pk)
+        if product_key not in self.data:
+            return
+        if quantity <= 0:
+            self.remove(product.pk)
+            return
+        self.storage.save_line(product_key, dict(self.data[product_key], quantity=min(quantity, product.stock)))
+        self._lines = None
+
+    async def aupdate(self, product, quantity):
+        product_key = str(product.pk)
+        if product_key not in self.data:
+            return
+        if quantity <= 0:
+            await self.aremove(product.pk)
+            return
+        await self.storage.asave_line(product_key, dict(self.data[product_key], quantity=min(quantity, product.stock)))
+        self._lines = None
+
+    def remove(self, product_id):
+        product_key = str(product_id)
+        if product_key not in self.data:
+            return False
+        self.storage.delete_line(product_key)
+        self._lines = None
+        return True
+
+    async def aremove(self, product_id):
+        product_key = str(product_id)
+        if product_key not in self.data:
+            return False
+        await self.storage.adelete_line(product_key)
+        self._lines = None
+        return True
+
+    def clear(self):
+        self.storage.clear()
+        self._lines = None
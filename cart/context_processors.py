@@ -1,15 +1,30 @@
-from django.utils.deprecation import MiddlewareMixin
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 
+CART_COUNT_COOKIE = 'cart_count'
 
-def cart_context(request):
-    """Add cart item count to all templates."""
-    cart = request.session.get('cart', {})
-    cart_count = sum(item.get('quantity', 0) for item in cart.values())
-    return {'cart_count': cart_count}
 
+def get_cart_count(request):
+    """
+    Number of items in the cart, touching as little as possible.
+
+    Uses the cart if this request already loaded it, then the ``cart_count``
+    cookie, and only falls back to loading the cart storage (and therefore
+    the session) when neither is available.
+    """
+    storage = getattr(request, '_cart_storage', None)
+    if storage is not None and storage.loaded:
+        return storage.count()
+    try:
+        return int(request.COOKIES[CART_COUNT_COOKIE])
+    except (KeyError, ValueError):
+        pass
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return 0
+    from .storage import get_cart_storage
+    return get_cart_storage(request).count()
 
-class CartMiddleware(MiddlewareMixin):
-    """Ensure session cart exists."""
-    def process_request(self, request):
-        if 'cart' not in request.session:
-            request.session['cart'] = {}
+
+def cart_context(request):
+    """Add a lazily computed cart item count to all templates."""
+    return {'cart_count': SimpleLazyObject(lambda: get_cart_count(request))}
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from cart.storage import delete_stale_anonymous_carts
+
+
+class Command(BaseCommand):
+    help = 'Delete database carts of anonymous visitors whose session has expired.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age', type=int, default=settings.SESSION_COOKIE_AGE,
+            help='Seconds since the cart was last changed (default: SESSION_COOKIE_AGE).',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        carts = delete_stale_anonymous_carts(options['max_age'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {carts} anonymous carts.'))
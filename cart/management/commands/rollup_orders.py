@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cart.analytics import rollup_orders
+
+
+class Command(BaseCommand):
+    help = 'Update the daily sales rollups with orders changed since the last run, or all of them with --full.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every day.')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        days, rows = rollup_orders(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed {days} days ({rows} rollup rows) in {time.perf_counter() - start:.1f}s.'
+        ))
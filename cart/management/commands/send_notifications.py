@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cart.notifications import process_outbox
+from cart.telegram import is_configured
+
+
+class Command(BaseCommand):
+    help = 'Deliver pending Telegram order notifications from the outbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling instead of exiting once the outbox is drained.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when the outbox is empty.')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--max-attempts', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if not is_configured():
+            self.stderr.write('Telegram bot token or chat ID not configured. Nothing sent.')
+            return
+
+        while True:
+            sent, failed = process_outbox(options['batch_size'], options['max_attempts'])
+            if sent or failed:
+                self.stdout.write(f'Sent {sent}, failed {failed}.')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
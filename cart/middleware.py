@@ -0,0 +1,47 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .context_processors import CART_COUNT_COOKIE
+
+
+class CartCountMiddleware:
+    """
+    Keep the ``cart_count`` cookie in step with the cart.
+
+    The navbar badge is filled in from this cookie by ``main.js``, so pages
+    render the same HTML whatever is in the cart and never need the session
+    just to show the count. The cookie is only rewritten when the cart was
+    loaded during the request and its count differs, or after login/logout.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if getattr(request, '_cart_count_stale', False):
+            from .storage import get_cart_storage
+            get_cart_storage(request).load()
+        return self.set_count_cookie(request, response)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if getattr(request, '_cart_count_stale', False):
+            from .storage import get_cart_storage
+            await get_cart_storage(request).aload()
+        return self.set_count_cookie(request, response)
+
+    def set_count_cookie(self, request, response):
+        storage = getattr(request, '_cart_storage', None)
+        if storage is None or not storage.loaded:
+            return response
+
+        count = str(storage.count())
+        if request.COOKIES.get(CART_COUNT_COOKIE) != count:
+            response.set_cookie(CART_COUNT_COOKIE, count, max_age=60 * 60 * 24 * 30, samesite='Lax')
+        return response
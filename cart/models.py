@@ -1,5 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
 from products.models import Product
 
 
@@ -25,6 +29,11 @@ class Order(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Admin order list (newest first, ties broken on id) and date filters.
+            models.Index(fields=['created_at', 'id'], name='order_newest_idx'),
+            models.Index(fields=['updated_at'], name='order_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Order #{self.pk} - {self.full_name}"
@@ -43,3 +52,126 @@ class OrderItem(models.Model):
     @property
     def subtotal(self):
         return self.price * self.quantity
+
+
+class OrderNotification(models.Model):
+    """Outbox row for a pending Telegram order notification."""
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name='notification')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"Notification for order #{self.order_id} ({self.status})"
+
+
+class CartItem(models.Model):
+    """A cart line for ``DatabaseCartStorage``, keyed by user or anonymous cart id."""
+    cart_key = models.CharField(max_length=64)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='cart_items')
+    quantity = models.PositiveIntegerField(default=1)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('cart_key', 'product')
+
+    def __str__(self):
+        return f"{self.cart_key}: {self.product_id} x{self.quantity}"
+
+
+class DailySales(models.Model):
+    """One day's orders, units and revenue for one product, category, city or status."""
+
+    DIMENSION_CHOICES = [
+        ('total', 'Total'),
+        ('product', 'Product'),
+        ('category', 'Category'),
+        ('city', 'City'),
+        ('status', 'Status'),
+    ]
+
+    day = models.DateField()
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=100, blank=True)
+    label = models.CharField(max_length=300, blank=True)
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    stale = models.BooleanField(default=False)
+    computed_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name_plural = 'daily sales'
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'dimension', 'key'], name='daily_sales_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['dimension', 'day'], name='daily_sales_dimension_idx'),
+            models.Index(fields=['day'], condition=models.Q(stale=True), name='daily_sales_stale_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.dimension} {self.label or self.key}"
+
+
+class RollupRun(models.Model):
+    """A completed ``rollup_orders`` run; the latest ``started_at`` is the next run's watermark."""
+    started_at = models.DateTimeField(db_index=True)
+    finished_at = models.DateTimeField(auto_now_add=True)
+    full = models.BooleanField(default=False)
+    days = models.PositiveIntegerField(default=0)
+    rows = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"Rollup of {self.started_at:%Y-%m-%d %H:%M} ({self.days} days)"
+
+
+@receiver(post_delete, sender=Order)
+@receiver(post_delete, sender=OrderItem)
+def mark_daily_sales_stale(sender, instance, origin=None, **kwargs):
+    """Deletes don't bump ``Order.updated_at``; flag the day for the next rollup instead."""
+    from .analytics import mark_order_stale, mark_stale
+    if sender is Order:
+        mark_stale(instance.created_at)
+        return
+    # Lines deleted along with their order are covered by the order's own signal.
+    deleting_orders = isinstance(origin, Order) or (isinstance(origin, models.QuerySet) and origin.model is Order)
+    if not deleting_orders:
+        mark_order_stale(instance.order_id)
+
+
+@receiver(user_logged_in)
+def merge_cart_on_login(sender, request, user, **kwargs):
+    from .storage import get_cart_storage, mark_cart_count_stale
+    if request is not None and hasattr(request, 'session'):
+        get_cart_storage(request).merge_anonymous_cart(user)
+        mark_cart_count_stale(request)
+
+
+@receiver(user_logged_out)
+def reset_cart_count_on_logout(sender, request, **kwargs):
+    from .storage import mark_cart_count_stale
+    if request is not None:
+        mark_cart_count_stale(request)
@@ -0,0 +1,85 @@
+"""
+Order notification outbox.
+
+Checkout only writes an ``OrderNotification`` row inside the order
+transaction; ``manage.py send_notifications`` drains the outbox in batches,
+retrying failed deliveries with exponential backoff.
+"""
+import logging
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OrderNotification
+from .telegram import deliver_order_notification
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next try after ``attempts`` failures."""
+    delay = settings.NOTIFICATION_RETRY_BACKOFF * 2 ** (attempts - 1)
+    return min(delay, settings.NOTIFICATION_RETRY_MAX_DELAY)
+
+
+def claim_batch(batch_size):
+    """
+    Fetch due notifications and push their next attempt past the HTTP timeout.
+
+    Claimed rows won't be picked up by another worker while this one is
+    delivering them. Row locks use ``SKIP LOCKED`` where the database has it.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = OrderNotification.objects.filter(status='pending', next_attempt_at__lte=now)
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        lease = now + timedelta(seconds=settings.TELEGRAM_TIMEOUT * (len(ids) + 1))
+        OrderNotification.objects.filter(pk__in=ids).update(next_attempt_at=lease)
+    return list(
+        OrderNotification.objects.filter(pk__in=ids)
+        .select_related('order').prefetch_related('order__items')
+    )
+
+
+def process_outbox(batch_size=None, max_attempts=None):
+    """
+    Deliver one batch of due notifications.
+
+    Returns ``(sent, failed)`` counts for the batch.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    max_attempts = max_attempts or settings.NOTIFICATION_MAX_ATTEMPTS
+    sent = failed = 0
+
+    with requests.Session() as session:
+        for notification in claim_batch(batch_size):
+            notification.attempts += 1
+            try:
+                deliver_order_notification(notification.order, session=session)
+            except Exception as e:
+                # Anything, not just HTTP errors: one bad row must not stop the batch with its lease held.
+                failed += 1
+                notification.last_error = f'{type(e).__name__}: {e}'
+                if notification.attempts >= max_attempts:
+                    notification.status = 'failed'
+                    logger.error(f"Giving up on notification for order #{notification.order_id}: {e}")
+                else:
+                    notification.next_attempt_at = timezone.now() + timedelta(
+                        seconds=retry_delay(notification.attempts)
+                    )
+                    logger.warning(f"Notification for order #{notification.order_id} failed, will retry: {e}")
+            else:
+                sent += 1
+                notification.status = 'sent'
+                notification.sent_at = timezone.now()
+                notification.last_error = ''
+            notification.save(update_fields=[
+                'status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at',
+            ])
+
+    return sent, failed
@@ -0,0 +1,76 @@
+from django.db import transaction
+from django.db.models import Case, F, Q, When
+from django.utils import timezone
+
+from core.cache import invalidate_home
+from products.models import Product
+from .models import Order, OrderItem, OrderNotification
+
+
+class InsufficientStock(Exception):
+    """Raised when one or more cart lines can no longer be fulfilled."""
+
+    def __init__(self, lines):
+        self.lines = lines
+        names = ', '.join(line.product.name for line in lines)
+        super().__init__(f'Not enough stock for: {names}')
+
+
+def reserve_stock(lines):
+    """
+    Decrement stock for every line in a single conditional UPDATE.
+
+    Each row is only touched when ``stock >= quantity``, so concurrent
+    checkouts can never drive stock negative. Must be called inside a
+    transaction; raises :class:`InsufficientStock` if any line is short.
+    """
+    if not lines:
+        return
+    quantities = {line.product.pk: line.quantity for line in lines}
+    condition = Q()
+    for product_id, quantity in quantities.items():
+        condition |= Q(pk=product_id, stock__gte=quantity)
+
+    updated = Product.objects.filter(condition).update(
+        stock=F('stock') - Case(*[
+            When(pk=product_id, then=quantity) for product_id, quantity in quantities.items()
+        ]),
+        updated_at=timezone.now(),
+    )
+    if updated != len(quantities):
+        available = dict(Product.objects.filter(pk__in=quantities).values_list('pk', 'stock'))
+        short = [line for line in lines if available.get(line.product.pk, 0) < line.quantity]
+        raise InsufficientStock(short or lines)
+
+
+def place_order(cart, user=None, **details):
+    """
+    Create an order from ``cart`` atomically.
+
+    Stock is reserved and the order, its items and its notification outbox
+    row are written in one transaction; if any line is short nothing is
+    saved and :class:`InsufficientStock` propagates to the caller.
+    """
+    lines = list(cart)
+    with transaction.atomic():
+        reserve_stock(lines)
+        order = Order.objects.create(
+            user=user,
+            total_price=cart.total,
+            **details,
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=line.product,
+                product_name=line.product.name,
+                quantity=line.quantity,
+                price=line.price,
+            )
+            for line in lines
+        ])
+        OrderNotification.objects.create(order=order)
+        # The stock UPDATE sends no signals; drop sold-out products from the cached home page.
+        if Product.objects.filter(pk__in=[line.product.pk for line in lines], stock__lte=0).exists():
+            transaction.on_commit(invalidate_home)
+    return order
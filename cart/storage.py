@@ -0,0 +1,333 @@
+"""
+Pluggable cart storage.
+
+``settings.CART_STORAGE`` names the backend. Every backend stores a cart as
+``{product_id: {'quantity', 'price', 'name'}}`` and writes individual lines
+rather than the whole cart:
+
+* ``DatabaseCartStorage`` keeps one ``CartItem`` row per line.
+* ``MemoryCartStorage`` keeps carts in a per-process LRU dict (development
+  and tests only; carts are lost on restart).
+* ``SessionCartStorage`` is the original session-pickled dict.
+
+Keyed backends store a logged-in user's cart under ``user:<pk>`` and an
+anonymous cart under a random id kept in the session. On login the
+anonymous cart is merged into the account cart. Anonymous ``CartItem``
+rows outlive their session; ``manage.py clear_anonymous_carts`` deletes
+the ones nobody has touched for ``SESSION_COOKIE_AGE``.
+
+The ``a``-prefixed methods are the async API used by the async cart views.
+They fall back to running the sync method in a thread; the session and
+database backends implement them natively.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+CART_SESSION_KEY = 'cart'
+CART_ID_SESSION_KEY = 'cart_id'
+
+
+class BaseCartStorage:
+
+    def __init__(self, request):
+        self.request = request
+        self._data = None
+
+    def load(self):
+        """Return the cart dict, loading it at most once per request."""
+        if self._data is None:
+            self._data = self._load()
+        return self._data
+
+    async def aload(self):
+        if self._data is None:
+            self._data = await self._aload()
+        return self._data
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def count(self):
+        return sum(item['quantity'] for item in self.load().values())
+
+    def _load(self):
+        raise NotImplementedError
+
+    async def _aload(self):
+        return await sync_to_async(self._load)()
+
+    def save_line(self, product_key, item):
+        raise NotImplementedError
+
+    async def asave_line(self, product_key, item):
+        await sync_to_async(self.save_line)(product_key, item)
+
+    def delete_line(self, product_key):
+        raise NotImplementedError
+
+    async def adelete_line(self, product_key):
+        await sync_to_async(self.delete_line)(product_key)
+
+    def clear(self):
+        raise NotImplementedError
+
+    def merge_anonymous_cart(self, user):
+        """Fold the pre-login anonymous cart into ``user``'s cart."""
+
+
+class SessionCartStorage(BaseCartStorage):
+    """The whole cart lives in ``request.session['cart']``."""
+
+    def _load(self):
+        return self.request.session.get(CART_SESSION_KEY, {})
+
+    async def _aload(self):
+        return await self.request.session.aget(CART_SESSION_KEY, {})
+
+    def _write(self):
+        self.request.session[CART_SESSION_KEY] = self.load()
+        self.request.session.modified = True
+
+    async def _awrite(self):
+        await self.request.session.aset(CART_SESSION_KEY, await self.aload())
+
+    def save_line(self, product_key, item):
+        self.load()[product_key] = item
+        self._write()
+
+    async def asave_line(self, product_key, item):
+        (await self.aload())[product_key] = item
+        await self._awrite()
+
+    def delete_line(self, product_key):
+        self.load().pop(product_key, None)
+        self._write()
+
+    async def adelete_line(self, product_key):
+        (await self.aload()).pop(product_key, None)
+        await self._awrite()
+
+    def clear(self):
+        self.load().clear()
+        self._write()
+
+
+class KeyedCartStorage(BaseCartStorage):
+    """Base for backends that address carts by user or anonymous cart id."""
+
+    def cart_key(self, create=False):
+        user = getattr(self.request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f'user:{user.pk}'
+        cart_id = self.request.session.get(CART_ID_SESSION_KEY)
+        if cart_id is None and create:
+            cart_id = uuid.uuid4().hex
+            self.request.session[CART_ID_SESSION_KEY] = cart_id
+        return f'anon:{cart_id}' if cart_id else None
+
+    async def acart_key(self, create=False):
+        auser = getattr(self.request, 'auser', None)
+        user = await auser() if auser is not None else None
+        if user is not None and user.is_authenticated:
+            return f'user:{user.pk}'
+        cart_id = await self.request.session.aget(CART_ID_SESSION_KEY)
+        if cart_id is None and create:
+            cart_id = uuid.uuid4().hex
+            await self.request.session.aset(CART_ID_SESSION_KEY, cart_id)
+        return f'anon:{cart_id}' if cart_id else None
+
+    def _load(self):
+        key = self.cart_key()
+        return self.load_key(key) if key else {}
+
+    async def _aload(self):
+        key = await self.acart_key()
+        return await self.aload_key(key) if key else {}
+
+    def save_line(self, product_key, item):
+        self.load()[product_key] = item
+        self.save_key_line(self.cart_key(create=True), product_key, item)
+
+    async def asave_line(self, product_key, item):
+        (await self.aload())[product_key] = item
+        await self.asave_key_line(await self.acart_key(create=True), product_key, item)
+
+    def delete_line(self, product_key):
+        self.load().pop(product_key, None)
+        key = self.cart_key()
+        if key:
+            self.delete_key_line(key, product_key)
+
+    async def adelete_line(self, product_key):
+        (await self.aload()).pop(product_key, None)
+        key = await self.acart_key()
+        if key:
+            await self.adelete_key_line(key, product_key)
+
+    def clear(self):
+        self.load().clear()
+        key = self.cart_key()
+        if key:
+            self.clear_key(key)
+
+    def merge_anonymous_cart(self, user):
+        cart_id = self.request.session.pop(CART_ID_SESSION_KEY, None)
+        if not cart_id:
+            return
+        anonymous_key = f'anon:{cart_id}'
+        user_key = f'user:{user.pk}'
+        cart = self.load_key(user_key)
+        for product_key, item in self.load_key(anonymous_key).items():
+            if product_key in cart:
+                item = dict(item, quantity=cart[product_key]['quantity'] + item['quantity'])
+            self.save_key_line(user_key, product_key, item)
+        self.clear_key(anonymous_key)
+        self._data = None
+
+    def load_key(self, key):
+        raise NotImplementedError
+
+    async def aload_key(self, key):
+        return await sync_to_async(self.load_key)(key)
+
+    def save_key_line(self, key, product_key, item):
+        raise NotImplementedError
+
+    async def asave_key_line(self, key, product_key, item):
+        await sync_to_async(self.save_key_line)(key, product_key, item)
+
+    def delete_key_line(self, key, product_key):
+        raise NotImplementedError
+
+    async def adelete_key_line(self, key, product_key):
+        await sync_to_async(self.delete_key_line)(key, product_key)
+
+    def clear_key(self, key):
+        raise NotImplementedError
+
+
+class DatabaseCartStorage(KeyedCartStorage):
+    """One ``CartItem`` row per cart line."""
+
+    # ``bulk_create`` options that turn the insert into an upsert.
+    upsert = {
+        'update_conflicts': True,
+        'unique_fields': ['cart_key', 'product'],
+        'update_fields': ['quantity', 'price', 'updated_at'],
+    }
+
+    def _line_rows(self, key):
+        from .models import CartItem
+        return CartItem.objects.filter(cart_key=key).values_list(
+            'product_id', 'quantity', 'price', 'product__name'
+        )
+
+    def _cart_item(self, key, product_key, item):
+        from .models import CartItem
+        return CartItem(cart_key=key, product_id=int(product_key), quantity=item['quantity'], price=Decimal(item['price']))
+
+    def load_key(self, key):
+        return {
+            str(product_id): {'quantity': quantity, 'price': str(price), 'name': name}
+            for product_id, quantity, price, name in self._line_rows(key)
+        }
+
+    async def aload_key(self, key):
+        return {
+            str(product_id): {'quantity': quantity, 'price': str(price), 'name': name}
+            async for product_id, quantity, price, name in self._line_rows(key)
+        }
+
+    def save_key_line(self, key, product_key, item):
+        from .models import CartItem
+        CartItem.objects.bulk_create([self._cart_item(key, product_key, item)], **self.upsert)
+
+    async def asave_key_line(self, key, product_key, item):
+        from .models import CartItem
+        await CartItem.objects.abulk_create([self._cart_item(key, product_key, item)], **self.upsert)
+
+    def delete_key_line(self, key, product_key):
+        from .models import CartItem
+        CartItem.objects.filter(cart_key=key, product_id=int(product_key)).delete()
+
+    async def adelete_key_line(self, key, product_key):
+        from .models import CartItem
+        await CartItem.objects.filter(cart_key=key, product_id=int(product_key)).adelete()
+
+    def clear_key(self, key):
+        from .models import CartItem
+        CartItem.objects.filter(cart_key=key).delete()
+
+
+class MemoryCartStorage(KeyedCartStorage):
+    """Per-process LRU of carts; the least recently used cart is evicted."""
+
+    _carts = OrderedDict()
+    _lock = threading.Lock()
+
+    def load_key(self, key):
+        with self._lock:
+            cart = self._carts.get(key)
+            if cart is None:
+                return {}
+            self._carts.move_to_end(key)
+            return {product_key: dict(item) for product_key, item in cart.items()}
+
+    def save_key_line(self, key, product_key, item):
+        with self._lock:
+            cart = self._carts.setdefault(key, {})
+            cart[product_key] = dict(item)
+            self._carts.move_to_end(key)
+            while len(self._carts) > settings.CART_MEMORY_MAX_CARTS:
+                self._carts.popitem(last=False)
+
+    def delete_key_line(self, key, product_key):
+        with self._lock:
+            self._carts.get(key, {}).pop(product_key, None)
+
+    def clear_key(self, key):
+        with self._lock:
+            self._carts.pop(key, None)
+
+
+def delete_stale_anonymous_carts(max_age, batch_size=500):
+    """
+    Delete anonymous ``CartItem`` carts whose newest line is older than
+    ``max_age`` seconds; returns the number of carts removed.
+    """
+    from .models import CartItem
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    stale = (
+        CartItem.objects.filter(cart_key__startswith='anon:')
+        .values('cart_key').annotate(last_updated=Max('updated_at')).filter(last_updated__lt=cutoff)
+        .values_list('cart_key', flat=True)
+    )
+    keys = list(stale.iterator(chunk_size=batch_size))
+    for start in range(0, len(keys), batch_size):
+        CartItem.objects.filter(cart_key__in=keys[start:start + batch_size]).delete()
+    return len(keys)
+
+
+def mark_cart_count_stale(request):
+    """Have ``CartCountMiddleware`` recompute the count cookie for this response."""
+    request._cart_count_stale = True
+    request.__dict__.pop('_cart_storage', None)
+
+
+def get_cart_storage(request):
+    """Return the configured cart storage bound to ``request`` (one per request)."""
+    storage = getattr(request, '_cart_storage', None)
+    if storage is None:
+        storage = import_string(settings.CART_STORAGE)(request)
+        request._cart_storage = storage
+    return storage
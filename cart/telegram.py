@@ -1,19 +1,13 @@
 import requests
 from django.conf import settings
-import logging
 
-logger = logging.getLogger(__name__)
 
+def is_configured():
+    return bool(settings.TELEGRAM_BOT_TOKEN and settings.TELEGRAM_CHAT_ID)
 
-def send_order_notification(order):
-    """Send order details to Telegram chat."""
-    token = settings.TELEGRAM_BOT_TOKEN
-    chat_id = settings.TELEGRAM_CHAT_ID
-
-    if not token or not chat_id:
-        logger.warning("Telegram bot token or chat ID not configured. Skipping notification.")
-        return False
 
+def format_order_message(order):
+    """Build the Markdown message text for an order."""
     items_text = ""
     for item in order.items.all():
         items_text += f"  - {item.product_name} x{item.quantity} = ${item.subtotal}\n"
@@ -34,17 +28,22 @@ def send_order_notification(order):
     if order.note:
         message += f"📝 *Note:* {order.note}\n"
 
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
+    return message
+
+
+def deliver_order_notification(order, session=None):
+    """
+    Post the order message to Telegram.
+
+    Raises ``requests.RequestException`` on failure so callers can retry.
+    Pass a ``requests.Session`` to reuse one connection across a batch.
+    """
+    url = f"{settings.TELEGRAM_API_URL}/bot{settings.TELEGRAM_BOT_TOKEN}/sendMessage"
     payload = {
-        'chat_id': chat_id,
-        'text': message,
+        'chat_id': settings.TELEGRAM_CHAT_ID,
+        'text': format_order_message(order),
         'parse_mode': 'Markdown',
     }
+    response = (session or requests).post(url, json=payload, timeout=settings.TELEGRAM_TIMEOUT)
+    response.raise_for_status()
 
-    try:
-        response = requests.post(url, json=payload, timeout=10)
-        response.raise_for_status()
-        return True
-    except requests.RequestException as e:
-        logger.error(f"Failed to send Telegram notification: {e}")
-        return False
@@ -1,3 +1,499 @@
-from django.test import TestCase
+import json
+import threading
+import unittest.mock
+from datetime import timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache import get_home_version
+from products.models import Category, Product
+from . import telegram
+from .cart import CartLine
+from .analytics import ROLLUP_CHUNK_DAYS, day_start, rollup_orders
+from .models import CartItem, DailySales, Order, OrderItem, OrderNotification, RollupRun
+from .notifications import claim_batch, process_outbox
+from .storage import MemoryCartStorage
+from .orders import InsufficientStock, place_order
+
+
+class CartQuantityTests(TestCase):
+    """Posted quantities must be whole numbers of at least 1."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Living', slug='living')
+        cls.product = Product.objects.create(
+            name='Sofa', slug='sofa', category=category, description='Furniture', price=100, stock=5,
+        )
+
+    def post(self, name, quantity, ajax=True):
+        headers = {'X-Requested-With': 'XMLHttpRequest'} if ajax else {}
+        return self.client.post(reverse(name, args=[self.product.pk]), {'quantity': quantity}, headers=headers)
+
+    def test_add_rejects_invalid_quantities(self):
+        for quantity in ('-1', '0', 'two', '1.5', ''):
+            with self.subTest(quantity=quantity):
+                response = self.post('cart:add_to_cart', quantity)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()['status'], 'error')
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_add_without_javascript_redirects_with_message(self):
+        response = self.post('cart:add_to_cart', '-1', ajax=False)
+        self.assertRedirects(response, reverse('cart:cart_detail'), fetch_redirect_response=False)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_update_rejects_invalid_quantities(self):
+        self.post('cart:add_to_cart', '2')
+        for quantity in ('-3', '0', 'x'):
+            with self.subTest(quantity=quantity):
+                self.assertEqual(self.post('cart:update_cart', quantity).status_code, 400)
+        self.assertEqual(CartItem.objects.get().quantity, 2)
+
+    def test_valid_quantities_are_clamped_to_stock(self):
+        self.assertEqual(self.post('cart:add_to_cart', '2').json()['cart_count'], 2)
+        self.assertEqual(self.post('cart:update_cart', '9').json()['cart_count'], 5)
+
+
+class CheckoutHomeCacheTests(TestCase):
+    """Stock is reserved with an UPDATE, so checkout itself must refresh the home page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Living', slug='living')
+        cls.product = Product.objects.create(
+            name='Sofa', slug='sofa', category=category, description='Furniture', price=100, stock=2, is_featured=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def checkout(self, quantity):
+        self.client.post(reverse('cart:add_to_cart', args=[self.product.pk]), {'quantity': quantity})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('cart:checkout'), {
+                'full_name': 'Ann', 'phone': '1', 'address': 'Street 1', 'city': 'Tashkent',
+            })
+
+    def test_selling_out_replaces_home_version(self):
+        self.assertContains(self.client.get(reverse('core:home')), self.product.get_absolute_url())
+        version = get_home_version()
+        self.checkout(2)
+        self.assertNotEqual(get_home_version(), version)
+        self.assertNotContains(self.client.get(reverse('core:home')), self.product.get_absolute_url())
+
+    def test_stock_left_keeps_home_version(self):
+        version = get_home_version()
+        self.checkout(1)
+        self.assertEqual(get_home_version(), version)
+
+
+class StaticCart:
+    """Just the part of ``Cart`` that ``place_order`` reads."""
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    @property
+    def total(self):
+        return sum((line.subtotal for line in self.lines), Decimal('0.00'))
+
+
+class ConcurrentCheckoutTests(TransactionTestCase):
+    """Many buyers racing for one SKU must never oversell it."""
+
+    STOCK = 5
+    BUYERS = 16
+
+    def setUp(self):
+        category = Category.objects.create(name='Living', slug='living')
+        self.product = Product.objects.create(
+            name='Sofa', slug='sofa', category=category, description='Furniture', price=100, stock=self.STOCK,
+        )
+
+    def buy(self, quantity, start, results):
+        line = CartLine(Product.objects.get(pk=self.product.pk), quantity, self.product.price)
+        start.wait()
+        try:
+            while True:
+                try:
+                    place_order(StaticCart([line]), full_name='Buyer', phone='1', address='Street 1', city='Tashkent')
+                except InsufficientStock:
+                    results.append((quantity, False))
+                except OperationalError:
+                    # SQLite's shared in-memory test database reports lock
+                    # contention instead of waiting; the buyer tries again.
+                    continue
+                else:
+                    results.append((quantity, True))
+                break
+        finally:
+            connection.close()
+
+    def test_competing_orders_never_oversell(self):
+        start = threading.Barrier(self.BUYERS)
+        results = []
+        threads = [
+            threading.Thread(target=self.buy, args=(1 + i % 2, start, results))
+            for i in range(self.BUYERS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.product.refresh_from_db()
+        sold = sum(quantity for quantity, placed in results if placed)
+        self.assertEqual(len(results), self.BUYERS)
+        self.assertGreaterEqual(self.product.stock, 0)
+        self.assertEqual(self.product.stock, self.STOCK - sold)
+        self.assertLessEqual(Order.objects.count(), self.STOCK)
+        self.assertEqual(Order.objects.count(), sum(placed for quantity, placed in results))
+        # Every buyer wants at most 2, so a refusal means fewer than 2 were left.
+        self.assertLess(self.product.stock, 2)
+
+
+class StubTelegram(BaseHTTPRequestHandler):
+    """Answers ``sendMessage`` with the next status in ``server.statuses`` (200 once they run out)."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((self.path, body))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps({'ok': status == 200}).encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+@override_settings(
+    TELEGRAM_BOT_TOKEN='test-token', TELEGRAM_CHAT_ID='42', TELEGRAM_TIMEOUT=5,
+    NOTIFICATION_RETRY_BACKOFF=30, NOTIFICATION_RETRY_MAX_DELAY=3600, NOTIFICATION_MAX_ATTEMPTS=3,
+)
+class NotificationOutboxTests(TestCase):
+    """``process_outbox`` against a local stub of the Telegram Bot API."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubTelegram)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.api_url = override_settings(TELEGRAM_API_URL=f'http://127.0.0.1:{cls.server.server_port}')
+        cls.api_url.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.api_url.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.requests = []
+        self.server.statuses = []
+
+    def notify(self, count=1, **fields):
+        notifications = []
+        for i in range(count):
+            order = Order.objects.create(
+                full_name=f'Buyer {i}', phone='1', address='Street 1', city='Tashkent', total_price=100,
+            )
+            notifications.append(OrderNotification.objects.create(order=order, **fields))
+        return notifications
+
+    def test_delivers_and_marks_sent(self):
+        notification, = self.notify()
+        self.assertEqual(process_outbox(), (1, 0))
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), ('sent', 1))
+        self.assertIsNotNone(notification.sent_at)
+        path, body = self.server.requests[0]
+        self.assertEqual(path, '/bottest-token/sendMessage')
+        self.assertEqual(body['chat_id'], '42')
+        self.assertIn(f'Order #{notification.order_id}', body['text'])
+
+    def test_failures_back_off_exponentially(self):
+        notification, = self.notify()
+        self.server.statuses = [500, 502]
+        for attempt, delay in ((1, 30), (2, 60)):
+            before = timezone.now()
+            with self.assertLogs('cart.notifications', 'WARNING'):
+                self.assertEqual(process_outbox(), (0, 1))
+            notification.refresh_from_db()
+            self.assertEqual((notification.status, notification.attempts), ('pending', attempt))
+            self.assertIn('Server Error', notification.last_error)
+            self.assertGreaterEqual(notification.next_attempt_at, before + timedelta(seconds=delay))
+            self.assertLessEqual(notification.next_attempt_at, timezone.now() + timedelta(seconds=delay))
+            # Not due yet: the next run leaves it alone.
+            self.assertEqual(process_outbox(), (0, 0))
+            OrderNotification.objects.filter(pk=notification.pk).update(next_attempt_at=timezone.now())
+
+        self.assertEqual(process_outbox(), (1, 0))
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts, notification.last_error), ('sent', 3, ''))
+
+    def test_gives_up_after_max_attempts(self):
+        notification, = self.notify(attempts=2)
+        self.server.statuses = [500]
+        with self.assertLogs('cart.notifications', 'ERROR'):
+            self.assertEqual(process_outbox(), (0, 1))
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), ('failed', 3))
+        OrderNotification.objects.filter(pk=notification.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(process_outbox(), (0, 0))
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_unexpected_errors_fail_only_their_row(self):
+        broken, working = self.notify(2)
+        format_message = telegram.format_order_message
+
+        def format_or_fail(order):
+            if order.pk == broken.order_id:
+                raise KeyError('missing field')
+            return format_message(order)
+
+        with unittest.mock.patch('cart.telegram.format_order_message', format_or_fail):
+            with self.assertLogs('cart.notifications', 'WARNING'):
+                self.assertEqual(process_outbox(), (1, 1))
+        broken.refresh_from_db()
+        self.assertEqual((broken.status, broken.attempts), ('pending', 1))
+        self.assertEqual(broken.last_error, "KeyError: 'missing field'")
+        self.assertGreater(broken.next_attempt_at, timezone.now() + timedelta(seconds=20))
+        self.assertEqual(OrderNotification.objects.get(pk=working.pk).status, 'sent')
+
+    def test_claims_due_rows_in_batches(self):
+        self.notify(5)
+        later, = self.notify(next_attempt_at=timezone.now() + timedelta(hours=1))
+        first, second = claim_batch(2), claim_batch(2)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({n.pk for n in first} & {n.pk for n in second})
+        # Claimed rows are leased past the HTTP timeout of the whole batch.
+        for notification in first:
+            notification.refresh_from_db()
+            self.assertGreater(notification.next_attempt_at, timezone.now() + timedelta(seconds=10))
+
+        # Four are leased, one is still due and the last isn't due yet.
+        self.assertEqual(process_outbox(batch_size=3), (1, 0))
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(OrderNotification.objects.get(pk=later.pk).status, 'pending')
+
+
+class CartStorageTests(TestCase):
+    """Every cart backend through the cart views, and the login merge for keyed ones."""
+
+    BACKENDS = ['cart.storage.DatabaseCartStorage', 'cart.storage.MemoryCartStorage', 'cart.storage.SessionCartStorage']
+    KEYED_BACKENDS = BACKENDS[:2]
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Living', slug='living')
+        cls.sofa, cls.chair = [
+            Product.objects.create(name=name, slug=name.lower(), category=category, description='Furniture', price=100, stock=10)
+            for name in ('Sofa', 'Chair')
+        ]
+        cls.user = User.objects.create_user('shopper', password='secret')
+
+    def setUp(self):
+        MemoryCartStorage._carts.clear()
+
+    def add(self, product, quantity):
+        response = self.client.post(
+            reverse('cart:add_to_cart', args=[product.pk]), {'quantity': quantity},
+            headers={'X-Requested-With': 'XMLHttpRequest'},
+        )
+        return response.json()['cart_count']
+
+    def lines(self):
+        cart = self.client.get(reverse('cart:cart_detail')).context['cart']
+        return {line.product.pk: line.quantity for line in cart}
+
+    def test_add_update_remove(self):
+        for backend in self.BACKENDS:
+            with self.subTest(backend=backend), self.settings(CART_STORAGE=backend):
+                self.client.logout()
+                self.assertEqual(self.add(self.sofa, 2), 2)
+                self.assertEqual(self.add(self.chair, 1), 3)
+                self.client.post(reverse('cart:update_cart', args=[self.sofa.pk]), {'quantity': 4})
+                self.assertEqual(self.lines(), {self.sofa.pk: 4, self.chair.pk: 1})
+                self.client.post(reverse('cart:remove_from_cart', args=[self.chair.pk]))
+                self.assertEqual(self.lines(), {self.sofa.pk: 4})
+
+    def test_login_merges_anonymous_cart(self):
+        for backend in self.KEYED_BACKENDS:
+            with self.subTest(backend=backend), self.settings(CART_STORAGE=backend):
+                CartItem.objects.all().delete()
+                self.client.force_login(self.user)
+                self.add(self.sofa, 1)
+                self.client.logout()
+
+                self.add(self.sofa, 2)
+                self.add(self.chair, 1)
+                self.client.force_login(self.user)
+                self.assertEqual(self.lines(), {self.sofa.pk: 3, self.chair.pk: 1})
+                # The anonymous cart is gone rather than merged again on the next login.
+                self.client.logout()
+                self.assertEqual(self.lines(), {})
+                self.client.force_login(self.user)
+                self.assertEqual(self.lines(), {self.sofa.pk: 3, self.chair.pk: 1})
+                self.client.logout()
+
+    def test_database_lines_are_rows(self):
+        with self.settings(CART_STORAGE='cart.storage.DatabaseCartStorage'):
+            self.add(self.sofa, 2)
+            self.add(self.sofa, 1)
+            item = CartItem.objects.get()
+            self.assertTrue(item.cart_key.startswith('anon:'))
+            self.assertEqual(item.quantity, 3)
+
+    def test_clear_anonymous_carts(self):
+        now = timezone.now()
+        CartItem.objects.bulk_create([
+            CartItem(cart_key='anon:old', product=self.sofa, quantity=1, price=100),
+            CartItem(cart_key='anon:mixed', product=self.sofa, quantity=1, price=100),
+            CartItem(cart_key='anon:mixed', product=self.chair, quantity=1, price=100),
+            CartItem(cart_key='anon:new', product=self.sofa, quantity=1, price=100),
+            CartItem(cart_key=f'user:{self.user.pk}', product=self.sofa, quantity=1, price=100),
+        ])
+        CartItem.objects.exclude(cart_key='anon:new').update(updated_at=now - timedelta(days=30))
+        CartItem.objects.filter(cart_key='anon:mixed', product=self.chair).update(updated_at=now)
+
+        out = StringIO()
+        call_command('clear_anonymous_carts', max_age=14 * 24 * 60 * 60, stdout=out)
+        self.assertIn('Deleted 1 anonymous carts', out.getvalue())
+        self.assertEqual(
+            sorted(CartItem.objects.values_list('cart_key', flat=True)),
+            ['anon:mixed', 'anon:mixed', 'anon:new', f'user:{self.user.pk}'],
+        )
+
+
+class OrderAdminTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for i, city in enumerate(['Tashkent', 'Tashkent', 'Samarkand', 'Bukhara']):
+            Order.objects.create(full_name=f'Buyer {i}', phone='1', address='Street 1', city=city, total_price=100)
+        call_command('rollup_orders', stdout=StringIO())
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_city_filter_reads_rollups(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:cart_order_changelist'))
+        self.assertFalse([query['sql'] for query in queries if 'DISTINCT' in query['sql'] and 'cart_order' in query['sql']])
+        self.assertEqual(
+            [choice['display'] for choice in response.context['cl'].filter_specs[2].choices(response.context['cl'])],
+            ['All', 'Tashkent', 'Bukhara', 'Samarkand'],
+        )
+        response = self.client.get(reverse('admin:cart_order_changelist'), {'city': 'Tashkent'})
+        self.assertEqual(len(response.context['cl'].result_list), 2)
+
+
+class SalesRollupTests(TestCase):
+    """``rollup_orders`` only recomputes changed days, and always matches the orders."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Living', slug='living')
+        cls.sofa = Product.objects.create(
+            name='Sofa', slug='sofa', category=category, description='Furniture', price=100, stock=100,
+        )
+        cls.today = timezone.localdate()
+        for days_ago in range(20):
+            for city in ('Tashkent', 'Samarkand'):
+                cls.order(days_ago, city)
+
+    @classmethod
+    def order(cls, days_ago, city='Tashkent', quantity=2, fresh=False):
+        """An order placed ``days_ago``; unless ``fresh``, last changed well before any rollup."""
+        order = Order.objects.create(
+            full_name='Buyer', phone='1', address='Street 1', city=city, total_price=100 * quantity,
+        )
+        created_at = day_start(timezone.localdate() - timedelta(days=days_ago)) + timedelta(hours=12)
+        updated_at = timezone.now() if fresh else created_at - timedelta(days=1)
+        Order.objects.filter(pk=order.pk).update(created_at=created_at, updated_at=updated_at)
+        OrderItem.objects.create(order=order, product=cls.sofa, product_name='Sofa', quantity=quantity, price=100)
+        return order
+
+    def day(self, days_ago):
+        return self.today - timedelta(days=days_ago)
+
+    def rollup(self, dimension, days_ago, key=''):
+        row = DailySales.objects.filter(day=self.day(days_ago), dimension=dimension, key=key).first()
+        return row and (row.orders, row.units, row.revenue)
+
+    def test_full_rollup(self):
+        days, rows = rollup_orders()
+        self.assertEqual(days, 20)
+        # total, two cities, one status, one product and one category per day
+        self.assertEqual(rows, 20 * 6)
+        self.assertEqual(self.rollup('total', 3), (2, 4, Decimal('400.00')))
+        self.assertEqual(self.rollup('city', 3, 'Samarkand'), (1, 2, Decimal('200.00')))
+        self.assertEqual(self.rollup('product', 3, str(self.sofa.pk)), (2, 4, Decimal('400.00')))
+        self.assertEqual(RollupRun.objects.get().full, True)
+
+    def test_full_rollup_is_written_in_chunks(self):
+        with CaptureQueriesContext(connection) as queries:
+            rollup_orders()
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "cart_dailysales"')]
+        self.assertEqual(len(inserts), -(-20 // ROLLUP_CHUNK_DAYS))
+
+    def test_only_changed_days_are_recomputed(self):
+        rollup_orders()
+        self.assertEqual(rollup_orders(), (0, 0))
+
+        order = Order.objects.filter(created_at__date=self.day(5), city='Samarkand').get()
+        order.status = 'cancelled'
+        order.save()
+        self.order(0, 'Bukhara', quantity=1, fresh=True)
+        self.assertEqual(rollup_orders()[0], 2)
+        self.assertEqual(self.rollup('total', 5), (1, 2, Decimal('200.00')))
+        self.assertIsNone(self.rollup('city', 5, 'Samarkand'))
+        self.assertEqual(self.rollup('status', 5, 'cancelled'), (1, 2, Decimal('200.00')))
+        self.assertEqual(self.rollup('city', 0, 'Bukhara'), (1, 1, Decimal('100.00')))
+
+    def test_deletes_flag_their_day_stale(self):
+        rollup_orders()
+        Order.objects.filter(created_at__date=self.day(7), city='Tashkent').get().delete()
+        item = OrderItem.objects.filter(order__created_at__date=self.day(9), order__city='Tashkent').get()
+        with CaptureQueriesContext(connection) as queries:
+            item.delete()
+        self.assertEqual(len([query for query in queries if 'cart_dailysales' in query['sql']]), 1)
+        self.assertEqual(
+            set(DailySales.objects.filter(stale=True).values_list('day', flat=True)), {self.day(7), self.day(9)},
+        )
+
+        self.assertEqual(rollup_orders()[0], 2)
+        self.assertFalse(DailySales.objects.filter(stale=True).exists())
+        self.assertEqual(self.rollup('total', 7), (1, 2, Decimal('200.00')))
+        self.assertEqual(self.rollup('total', 9), (2, 2, Decimal('400.00')))
+
+    def test_interrupted_run_leaves_the_watermark(self):
+        rollup_orders()
+        watermark = RollupRun.objects.get().started_at
+        self.order(2, 'Bukhara', fresh=True)
+        with self.assertRaises(RuntimeError), unittest.mock.patch(
+            'cart.analytics.aggregate_span', side_effect=RuntimeError,
+        ):
+            rollup_orders()
+        self.assertEqual(RollupRun.objects.get().started_at, watermark)
+        self.assertEqual(rollup_orders()[0], 1)
+        self.assertEqual(self.rollup('city', 2, 'Bukhara'), (1, 2, Decimal('200.00')))
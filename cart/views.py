@@ -1,54 +1,57 @@
-from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from core.http import is_ajax, json_view
 from products.models import Product
-from .models import Order, OrderItem
-from .telegram import send_order_notification
-from decimal import Decimal
+from .cart import Cart
+from .models import Order
+from .orders import InsufficientStock, place_order
 
 
-def _get_cart(request):
-    """Get cart dict from session."""
-    return request.session.get('cart', {})
+def _notify_cart_changes(request, cart):
+    """Tell the shopper about lines changed while reconciling the cart."""
+    for line in cart:
+        if line.price_changed:
+            messages.info(request, f'The price of {line.product.name} has changed to ${line.price}.')
+        if line.quantity_adjusted:
+            messages.warning(request, f'Only {line.product.stock} of {line.product.name} left in stock.')
+    for name in cart.removed:
+        messages.warning(request, f'{name} is no longer available and was removed from your cart.')
 
 
-def _save_cart(request, cart):
-    """Save cart dict to session."""
-    request.session['cart'] = cart
-    request.session.modified = True
-
-
-def add_to_cart(request, product_id):
-    """Add a product to the cart (AJAX or regular)."""
-    if request.method == 'POST':
-        product = get_object_or_404(Product, pk=product_id, stock__gt=0)
-        cart = _get_cart(request)
-        product_key = str(product_id)
+def _parse_quantity(request):
+    """The posted quantity, or ``None`` unless it is a whole number of at least 1."""
+    try:
         quantity = int(request.POST.get('quantity', 1))
+    except (TypeError, ValueError):
+        return None
+    return quantity if quantity >= 1 else None
 
-        if product_key in cart:
-            cart[product_key]['quantity'] += quantity
-        else:
-            cart[product_key] = {
-                'quantity': quantity,
-                'price': str(product.price),
-                'name': product.name,
-            }
-
-        if cart[product_key]['quantity'] > product.stock:
-            cart[product_key]['quantity'] = product.stock
 
-        _save_cart(request, cart)
+def _invalid_quantity(request):
+    if is_ajax(request):
+        return {'status': 'error', 'message': 'Quantity must be a whole number of at least 1.'}, 400
+    messages.error(request, 'Please enter a quantity of at least 1.')
+    return redirect(request.META.get('HTTP_REFERER', 'cart:cart_detail'))
 
-        cart_count = sum(item['quantity'] for item in cart.values())
 
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({
+@json_view
+async def add_to_cart(request, product_id):
+    """Add a product to the cart (AJAX or regular)."""
+    if request.method == 'POST':
+        quantity = _parse_quantity(request)
+        if quantity is None:
+            return _invalid_quantity(request)
+        product = await aget_object_or_404(Product, pk=product_id, stock__gt=0)
+        cart = await Cart.aload(request)
+        await cart.aadd(product, quantity)
+
+        if is_ajax(request):
+            return {
                 'status': 'success',
                 'message': f'{product.name} added to cart',
-                'cart_count': cart_count,
-            })
+                'cart_count': cart.count,
+            }
 
         messages.success(request, f'{product.name} added to cart!')
         return redirect(request.META.get('HTTP_REFERER', 'core:home'))
@@ -58,62 +61,31 @@ def add_to_cart(request, product_id):
 
 def cart_detail(request):
     """View shopping cart."""
-    cart = _get_cart(request)
-    cart_items = []
-    total = Decimal('0.00')
+    cart = Cart(request)
+    _notify_cart_changes(request, cart)
+    return render(request, 'cart/cart.html', {'cart': cart})
 
-    for product_id, item in cart.items():
-        try:
-            product = Product.objects.prefetch_related('images').get(pk=int(product_id))
-            subtotal = Decimal(item['price']) * item['quantity']
-            cart_items.append({
-                'product': product,
-                'quantity': item['quantity'],
-                'price': Decimal(item['price']),
-                'subtotal': subtotal,
-            })
-            total += subtotal
-        except Product.DoesNotExist:
-            continue
-
-    return render(request, 'cart/cart.html', {
-        'cart_items': cart_items,
-        'total': total,
-    })
 
-
-def update_cart(request, product_id):
+@json_view
+async def update_cart(request, product_id):
     """Update quantity of a cart item."""
     if request.method == 'POST':
-        cart = _get_cart(request)
-        product_key = str(product_id)
-        quantity = int(request.POST.get('quantity', 1))
-
-        if product_key in cart:
-            if quantity <= 0:
-                del cart[product_key]
-            else:
-                product = get_object_or_404(Product, pk=product_id)
-                if quantity > product.stock:
-                    quantity = product.stock
-                cart[product_key]['quantity'] = quantity
+        quantity = _parse_quantity(request)
+        if quantity is None:
+            return _invalid_quantity(request)
+        cart = await Cart.aload(request)
+        product = await aget_object_or_404(Product, pk=product_id)
+        await cart.aupdate(product, quantity)
 
-        _save_cart(request, cart)
-
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            cart_count = sum(item['quantity'] for item in cart.values())
-            return JsonResponse({'status': 'success', 'cart_count': cart_count})
+        if is_ajax(request):
+            return {'status': 'success', 'cart_count': cart.count}
 
     return redirect('cart:cart_detail')
 
 
 def remove_from_cart(request, product_id):
     """Remove item from cart."""
-    cart = _get_cart(request)
-    product_key = str(product_id)
-    if product_key in cart:
-        del cart[product_key]
-        _save_cart(request, cart)
+    if Cart(request).remove(product_id):
         messages.info(request, 'Item removed from cart.')
 
     return redirect('cart:cart_detail')
@@ -121,27 +93,14 @@ def remove_from_cart(request, product_id):
 
 def checkout(request):
     """Checkout page and order placement."""
-    cart = _get_cart(request)
+    cart = Cart(request)
     if not cart:
         messages.warning(request, 'Your cart is empty.')
         return redirect('cart:cart_detail')
 
-    cart_items = []
-    total = Decimal('0.00')
-
-    for product_id, item in cart.items():
-        try:
-            product = Product.objects.get(pk=int(product_id))
-            subtotal = Decimal(item['price']) * item['quantity']
-            cart_items.append({
-                'product': product,
-                'quantity': item['quantity'],
-                'price': Decimal(item['price']),
-                'subtotal': subtotal,
-            })
-            total += subtotal
-        except Product.DoesNotExist:
-            continue
+    if cart.has_changes:
+        _notify_cart_changes(request, cart)
+        return redirect('cart:cart_detail')
 
     if request.method == 'POST':
         full_name = request.POST.get('full_name', '').strip()
@@ -152,39 +111,25 @@ def checkout(request):
 
         if not all([full_name, phone, address, city]):
             messages.error(request, 'Please fill in all required fields.')
-            return render(request, 'cart/checkout.html', {
-                'cart_items': cart_items,
-                'total': total,
-            })
-
-        order = Order.objects.create(
-            user=request.user if request.user.is_authenticated else None,
-            full_name=full_name,
-            phone=phone,
-            address=address,
-            city=city,
-            note=note,
-            total_price=total,
-        )
-
-        for cart_item in cart_items:
-            product = cart_item['product']
-            OrderItem.objects.create(
-                order=order,
-                product=product,
-                product_name=product.name,
-                quantity=cart_item['quantity'],
-                price=cart_item['price'],
-            )
-            product.stock -= cart_item['quantity']
-            product.save()
+            return render(request, 'cart/checkout.html', {'cart': cart})
 
-        # Send Telegram notification
-        send_order_notification(order)
+        try:
+            order = place_order(
+                cart,
+                user=request.user if request.user.is_authenticated else None,
+                full_name=full_name,
+                phone=phone,
+                address=address,
+                city=city,
+                note=note,
+            )
+        except InsufficientStock as e:
+            for line in e.lines:
+                messages.error(request, f'Sorry, {line.product.name} no longer has {line.quantity} in stock.')
+            return redirect('cart:cart_detail')
 
         # Clear cart
-        request.session['cart'] = {}
-        request.session.modified = True
+        cart.clear()
 
         return redirect('cart:order_success', order_id=order.pk)
 
@@ -200,8 +145,7 @@ def checkout(request):
         }
 
     return render(request, 'cart/checkout.html', {
-        'cart_items': cart_items,
-        'total': total,
+        'cart': cart,
         'initial': initial,
     })
 
@@ -3,3 +3,22 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save, pre_save
+
+        from . import signals
+        from .storage import REFERENCING_FIELDS
+
+        for label in ('core.Banner', 'products.Category', 'products.Product', 'products.ProductImage'):
+            name = label.split('.')[1]
+            post_save.connect(signals.invalidate_home_cache, sender=label, dispatch_uid=f'home_cache_save_{name}')
+            post_delete.connect(signals.invalidate_home_cache, sender=label, dispatch_uid=f'home_cache_delete_{name}')
+
+        connection_created.connect(signals.install_query_metrics, dispatch_uid='install_query_metrics')
+
+        for label in {label for label, field in REFERENCING_FIELDS}:
+            pre_save.connect(signals.remember_stored_files, sender=label, dispatch_uid=f'remember_stored_files_{label}')
+            post_save.connect(signals.count_stored_files, sender=label, dispatch_uid=f'count_stored_files_{label}')
+            post_delete.connect(signals.release_stored_files, sender=label, dispatch_uid=f'release_stored_files_{label}')
@@ -0,0 +1,310 @@
+"""
+Storefront benchmark harness.
+
+Each worker plays shoppers through the flow browse -> filter -> detail ->
+add_to_cart -> cart -> checkout, either in-process through the Django test
+client or over HTTP against a running server. Every request is timed and
+its query count is read from the ``Server-Timing`` header written by
+``RequestMetricsMiddleware``; a server that doesn't send it is refused
+before the run starts. Results are reported per step as
+p50/p95/p99 latency, throughput and average queries, and can be saved as
+a JSON baseline to compare another branch against.
+
+:func:`run_cart_load` hammers the AJAX add-to-cart endpoint through the
+WSGI handler (one thread per shopper) or the ASGI handler (one task per
+shopper on a single event loop) to compare the two.
+"""
+import asyncio
+import http.cookiejar
+import json
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+from products.models import Category, Product
+
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+PERCENTILES = (50, 95, 99)
+CHECKOUT_FORM = {
+    'full_name': 'Benchmark Customer',
+    'phone': '+998900000000',
+    'address': '1 Benchmark Street',
+    'city': 'Tashkent',
+}
+
+
+class ClientDriver:
+    """Runs requests in-process through the Django test client."""
+
+    def __init__(self):
+        self.client = Client(raise_request_exception=False)
+
+    def request(self, method, path, data=None, headers=None):
+        response = getattr(self.client, method.lower())(path, data or {}, headers=headers or {})
+        return response.status_code, response.get('Server-Timing', '')
+
+    def close(self):
+        connections.close_all()
+
+
+class HTTPDriver:
+    """Runs requests over HTTP against ``base_url``, keeping cookies like a browser."""
+
+    class _NoRedirect(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, *args, **kwargs):
+            return None
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), self._NoRedirect,
+        )
+
+    def _csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def request(self, method, path, data=None, headers=None):
+        headers = dict(headers or {})
+        body = None
+        if method == 'POST':
+            body = urllib.parse.urlencode(data or {}).encode()
+            headers['X-CSRFToken'] = self._csrf_token()
+            headers['Referer'] = self.base_url + path
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(request) as response:
+                response.read()
+                return response.status, response.headers.get('Server-Timing', '')
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get('Server-Timing', '')
+
+    def close(self):
+        pass
+
+
+class Recorder:
+    """Thread-safe store of ``(step, seconds, queries, ok)`` samples."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, step, elapsed, server_timing, ok):
+        match = QUERIES_RE.search(server_timing)
+        with self._lock:
+            self.samples[step].append((elapsed, int(match.group(1)) if match else None))
+            if not ok:
+                self.errors[step] += 1
+
+
+class Shopper:
+    """One simulated visitor walking the storefront flow."""
+
+    def __init__(self, driver, recorder, catalog, rand):
+        self.driver = driver
+        self.recorder = recorder
+        self.catalog = catalog
+        self.rand = rand
+
+    def step(self, name, method, path, data=None, headers=None, expect=(200,)):
+        start = time.perf_counter()
+        status, server_timing = self.driver.request(method, path, data, headers)
+        self.recorder.add(name, time.perf_counter() - start, server_timing, status in expect)
+
+    def run(self, checkout=True):
+        rand, catalog = self.rand, self.catalog
+        catalog_url = reverse('products:catalog')
+        self.step('home', 'GET', reverse('core:home'))
+        self.step('browse', 'GET', catalog_url)
+        query = urllib.parse.urlencode({
+            'category': rand.choice(catalog['categories']),
+            'sort': rand.choice(['price_asc', 'price_desc', 'newest', 'name']),
+            'max_price': rand.choice([500, 1000, 2000]),
+        })
+        self.step('filter', 'GET', f'{catalog_url}?{query}')
+        product_pk, product_url = rand.choice(catalog['products'])
+        self.step('detail', 'GET', product_url)
+        self.step(
+            'add_to_cart', 'POST', reverse('cart:add_to_cart', args=[product_pk]), {'quantity': 1},
+            headers={'X-Requested-With': 'XMLHttpRequest'},
+        )
+        self.step('cart', 'GET', reverse('cart:cart_detail'))
+        if checkout:
+            self.step('checkout', 'GET', reverse('cart:checkout'), expect=(200, 302))
+            self.step('place_order', 'POST', reverse('cart:checkout'), CHECKOUT_FORM, expect=(302,))
+
+
+def load_catalog(sample=1000):
+    """Slugs and product urls the shoppers pick from."""
+    products = Product.objects.filter(stock__gt=0).order_by('?').values_list('pk', 'slug')[:sample]
+    return {
+        'categories': list(Category.objects.values_list('slug', flat=True)),
+        'products': [(pk, reverse('products:product_detail', args=[slug])) for pk, slug in products],
+    }
+
+
+def check_server_timing(make_driver):
+    """Fail fast when the server doesn't report query counts in ``Server-Timing``."""
+    driver = make_driver()
+    try:
+        status, server_timing = driver.request('GET', reverse('core:home'))
+    finally:
+        driver.close()
+    if not QUERIES_RE.search(server_timing):
+        raise ValueError(
+            f'No query count in the Server-Timing header of the home page (HTTP {status}); '
+            'turn on SERVER_TIMING (or DEBUG) on the server being benchmarked.'
+        )
+
+
+def run_benchmark(make_driver, workers=4, flows=50, checkout=True, seed=0):
+    """Run ``flows`` shopper flows on each of ``workers`` threads and return a report."""
+    catalog = load_catalog()
+    if not catalog['products']:
+        raise ValueError('No products in stock; seed the database first.')
+    check_server_timing(make_driver)
+    recorder = Recorder()
+
+    def worker(index):
+        rand = random.Random(seed + index)
+        driver = make_driver()
+        try:
+            if isinstance(driver, HTTPDriver):
+                driver.request('GET', reverse('cart:cart_detail'))  # csrftoken cookie
+            for _ in range(flows):
+                Shopper(driver, recorder, catalog, rand).run(checkout)
+        finally:
+            driver.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(worker, range(workers)))
+    return summarize(recorder, time.perf_counter() - start, workers)
+
+
+def _cart_load_wsgi(recorder, products, concurrency, requests, seed):
+    def worker(index):
+        rand = random.Random(seed + index)
+        shopper = Shopper(ClientDriver(), recorder, None, rand)
+        try:
+            for _ in range(requests):
+                shopper.step('add_to_cart', 'POST', *_add_to_cart_args(rand, products))
+        finally:
+            shopper.driver.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+
+
+async def _cart_load_asgi(recorder, products, concurrency, requests, seed):
+    async def worker(index):
+        rand = random.Random(seed + index)
+        client = AsyncClient(raise_request_exception=False)
+        for _ in range(requests):
+            path, data, headers = _add_to_cart_args(rand, products)
+            # Like ASGIHandler: sync code of one request shares a thread of its own.
+            async with ThreadSensitiveContext():
+                start = time.perf_counter()
+                response = await client.post(path, data, headers=headers)
+                recorder.add(
+                    'add_to_cart', time.perf_counter() - start,
+                    response.get('Server-Timing', ''), response.status_code == 200,
+                )
+                await sync_to_async(connections.close_all)()
+
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+
+
+def _add_to_cart_args(rand, products):
+    product_pk, product_url = rand.choice(products)
+    return (
+        reverse('cart:add_to_cart', args=[product_pk]), {'quantity': 1},
+        {'X-Requested-With': 'XMLHttpRequest'},
+    )
+
+
+def run_cart_load(mode, concurrency=16, requests=20, seed=0):
+    """
+    Send ``requests`` AJAX add-to-cart posts from each of ``concurrency``
+    anonymous shoppers through the ``'wsgi'`` or ``'asgi'`` handler.
+    """
+    products = load_catalog()['products']
+    if not products:
+        raise ValueError('No products in stock; seed the database first.')
+    recorder = Recorder()
+    start = time.perf_counter()
+    if mode == 'asgi':
+        asyncio.run(_cart_load_asgi(recorder, products, concurrency, requests, seed))
+    else:
+        _cart_load_wsgi(recorder, products, concurrency, requests, seed)
+    return summarize(recorder, time.perf_counter() - start, concurrency)
+
+
+def _percentile(sorted_values, percent):
+    index = min(len(sorted_values) - 1, round(percent / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def summarize(recorder, wall_time, workers):
+    steps = {}
+    for step, samples in recorder.samples.items():
+        latencies = sorted(elapsed * 1000 for elapsed, queries in samples)
+        queries = [queries for elapsed, queries in samples if queries is not None]
+        steps[step] = {
+            'requests': len(samples),
+            'errors': recorder.errors[step],
+            **{f'p{p}_ms': round(_percentile(latencies, p), 2) for p in PERCENTILES},
+            'queries_avg': round(sum(queries) / len(queries), 1) if queries else None,
+        }
+    total = sum(step['requests'] for step in steps.values())
+    return {
+        'workers': workers,
+        'wall_time_s': round(wall_time, 2),
+        'requests': total,
+        'throughput_rps': round(total / wall_time, 1) if wall_time else None,
+        'steps': steps,
+    }
+
+
+def compare(report, baseline):
+    """Per-step change in p50/p95/p99 and queries against ``baseline``, as rows."""
+    rows = []
+    for step, current in report['steps'].items():
+        previous = baseline['steps'].get(step)
+        if previous is None:
+            continue
+        row = [step]
+        for key in [f'p{p}_ms' for p in PERCENTILES] + ['queries_avg']:
+            before, after = previous.get(key), current.get(key)
+            if before in (None, 0) or after is None:
+                row.append('-')
+            else:
+                row.append(f'{(after - before) / before * 100:+.0f}%')
+        rows.append(row)
+    return rows
+
+
+def save_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
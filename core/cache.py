@@ -0,0 +1,71 @@
+"""
+Home page cache.
+
+Every key embeds a version token. Saving or deleting a product, product
+image, category or banner replaces the token, which orphans all cached
+querysets and rendered fragments at once; they then expire on their own.
+Checkouts that sell a product out replace it too. The token itself lives
+for ``CACHE_VERSION_TIMEOUT``, so workers that don't share the cache pick
+up the change within that time.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from products.models import Category, Product
+from .models import Banner
+
+HOME_CACHE_TIMEOUT = 60 * 15
+HOME_VERSION_KEY = 'home:version'
+
+
+def get_home_version():
+    version = cache.get(HOME_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(HOME_VERSION_KEY, version, settings.CACHE_VERSION_TIMEOUT):
+            version = cache.get(HOME_VERSION_KEY, version)
+    return version
+
+
+def invalidate_home():
+    cache.set(HOME_VERSION_KEY, time.time_ns(), settings.CACHE_VERSION_TIMEOUT)
+
+
+class HomeContent:
+    """
+    Lazily loaded, cached querysets for the home page.
+
+    Nothing is fetched until the template asks for it, so a fragment cache
+    hit in ``home.html`` skips these lookups entirely.
+    """
+
+    def __init__(self):
+        self.version = get_home_version()
+        self._loaded = {}
+
+    def _get(self, name, queryset):
+        if name not in self._loaded:
+            self._loaded[name] = cache.get_or_set(
+                f'home:{self.version}:{name}', lambda: list(queryset), HOME_CACHE_TIMEOUT
+            )
+        return self._loaded[name]
+
+    def banners(self):
+        return self._get('banners', Banner.objects.filter(is_active=True))
+
+    def categories(self):
+        return self._get('categories', Category.objects.filter(parent__isnull=True))
+
+    def featured_products(self):
+        return self._get('featured', _product_cards().filter(is_featured=True)[:8])
+
+    def new_arrivals(self):
+        return self._get('new_arrivals', _product_cards().order_by('-created_at')[:8])
+
+
+def _product_cards():
+    return Product.objects.filter(stock__gt=0).select_related(
+        'category', 'cover_image'
+    ).prefetch_related('images')
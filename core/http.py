@@ -0,0 +1,29 @@
+"""
+Response path shared by the storefront's AJAX endpoints.
+
+Views decorated with :func:`json_view` are async and return a plain dict
+(optionally as ``(data, status)``) instead of building a response. The
+dict is sent as JSON straight away, without templates or context
+processors. Views can still return a response, e.g. a redirect for the
+non-JavaScript form post.
+"""
+from functools import wraps
+
+from django.http import JsonResponse
+from django.http.response import HttpResponseBase
+
+
+def is_ajax(request):
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+
+def json_view(view):
+    """Send the dict returned by the async ``view`` as a ``JsonResponse``."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        result = await view(request, *args, **kwargs)
+        if isinstance(result, HttpResponseBase):
+            return result
+        data, status = result if isinstance(result, tuple) else (result, 200)
+        return JsonResponse(data, status=status)
+    return wrapper
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from core.benchmark import (
+    PERCENTILES, ClientDriver, HTTPDriver, compare, load_report, run_benchmark, save_report,
+)
+
+
+class Command(BaseCommand):
+    help = 'Drive browse/filter/detail/cart/checkout flows and report latency, throughput and queries.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent shoppers.')
+        parser.add_argument('--flows', type=int, default=50, help='Flows per worker.')
+        parser.add_argument('--url', help='Benchmark a running server (e.g. http://127.0.0.1:8000) '
+                                          'instead of the in-process test client.')
+        parser.add_argument('--no-checkout', action='store_true', help="Don't place orders.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--save', metavar='PATH', help='Write the report to PATH as a baseline.')
+        parser.add_argument('--compare', metavar='PATH', help='Compare against a saved baseline.')
+
+    def handle(self, *args, **options):
+        if options['url']:
+            make_driver = lambda: HTTPDriver(options['url'])
+        else:
+            make_driver = ClientDriver
+
+        # Query counts come from Server-Timing, so make sure it is on in-process.
+        with override_settings(SERVER_TIMING=True):
+            try:
+                report = run_benchmark(
+                    make_driver, workers=options['workers'], flows=options['flows'],
+                    checkout=not options['no_checkout'], seed=options['seed'],
+                )
+            except ValueError as e:
+                raise CommandError(e)
+
+        self.print_report(report)
+        if options['save']:
+            save_report(report, options['save'])
+            self.stdout.write(self.style.SUCCESS(f'Saved baseline to {options["save"]}.'))
+        if options['compare']:
+            self.print_comparison(report, load_report(options['compare']))
+
+    def print_report(self, report):
+        columns = ['requests', 'errors'] + [f'p{p}_ms' for p in PERCENTILES] + ['queries_avg']
+        self.stdout.write(f'{"step":<14}' + ''.join(f'{column:>13}' for column in columns))
+        for step, stats in report['steps'].items():
+            self.stdout.write(f'{step:<14}' + ''.join(f'{str(stats[column]):>13}' for column in columns))
+        self.stdout.write(
+            f'\n{report["requests"]} requests in {report["wall_time_s"]}s with {report["workers"]} workers: '
+            f'{report["throughput_rps"]} req/s'
+        )
+
+    def print_comparison(self, report, baseline):
+        self.stdout.write('\nChange against baseline (negative is faster/fewer):')
+        columns = [f'p{p}_ms' for p in PERCENTILES] + ['queries_avg']
+        self.stdout.write(f'{"step":<14}' + ''.join(f'{column:>13}' for column in columns))
+        for row in compare(report, baseline):
+            self.stdout.write(f'{row[0]:<14}' + ''.join(f'{value:>13}' for value in row[1:]))
+        before, after = baseline.get('throughput_rps'), report['throughput_rps']
+        if before and after:
+            self.stdout.write(f'throughput: {before} -> {after} req/s ({(after - before) / before * 100:+.0f}%)')
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from core.benchmark import PERCENTILES, run_cart_load
+
+
+class Command(BaseCommand):
+    help = 'Compare WSGI and ASGI throughput under concurrent AJAX add-to-cart load.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent shoppers.')
+        parser.add_argument('--requests', type=int, default=20, help='Add-to-cart posts per shopper.')
+        parser.add_argument('--mode', choices=['wsgi', 'asgi', 'both'], default='both')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        modes = ['wsgi', 'asgi'] if options['mode'] == 'both' else [options['mode']]
+        columns = ['requests', 'errors'] + [f'p{p}_ms' for p in PERCENTILES] + ['queries_avg']
+        self.stdout.write(f'{"handler":<10}' + ''.join(f'{column:>13}' for column in columns) + f'{"req/s":>13}')
+        with override_settings(SERVER_TIMING=True):
+            for mode in modes:
+                try:
+                    report = run_cart_load(
+                        mode, concurrency=options['concurrency'], requests=options['requests'], seed=options['seed'],
+                    )
+                except ValueError as e:
+                    raise CommandError(e)
+                stats = report['steps']['add_to_cart']
+                self.stdout.write(
+                    f'{mode:<10}' + ''.join(f'{str(stats[column]):>13}' for column in columns)
+                    + f'{str(report["throughput_rps"]):>13}'
+                )
@@ -0,0 +1,31 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.storage import REFERENCING_FIELDS, is_content_addressed
+
+
+class Command(BaseCommand):
+    help = 'Move existing media into the content-addressed store, merging identical files.'
+
+    def handle(self, *args, **options):
+        moved = missing = 0
+        for label, field in REFERENCING_FIELDS:
+            model = apps.get_model(label)
+            rows = model._base_manager.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+            for obj in rows.iterator(chunk_size=500):
+                file = getattr(obj, field)
+                if is_content_addressed(file.name):
+                    continue
+                if not file.storage.exists(file.name):
+                    missing += 1
+                    self.stderr.write(f'Missing: {file.name} ({label} {obj.pk})')
+                    continue
+                with file.storage.open(file.name) as f:
+                    setattr(obj, field, file.storage.save(file.name, f))
+                # Goes through save() so reference counts and renditions follow the new name.
+                obj.save(update_fields=[field])
+                moved += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {moved} files ({missing} missing). '
+            'Run "python manage.py gc_media --include-legacy" to delete the old copies.'
+        ))
@@ -0,0 +1,22 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from core.storage import collect_garbage
+
+
+class Command(BaseCommand):
+    help = 'Recount media references and delete stored files nothing refers to.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-age', type=float, default=24, help='Keep files modified within this many hours.')
+        parser.add_argument('--include-legacy', action='store_true',
+                            help='Also delete unreferenced files outside the content-addressed store.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted.')
+
+    def handle(self, *args, **options):
+        files, size = collect_garbage(
+            default_storage, options['min_age'] * 3600,
+            include_legacy=options['include_legacy'], dry_run=options['dry_run'],
+        )
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {files} files ({size / 1024 / 1024:.1f} MB).'))
@@ -0,0 +1,200 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from cart.models import CartItem, DailySales, Order, OrderItem, OrderNotification
+from core.cache import invalidate_home
+from favorites.models import Favorite
+from products.models import CatalogVersion, Category, Product, ProductImage, RelatedProduct
+from products.search import get_search_backend
+from products.seeding import seed_images, seed_products, synthetic_products
+
+BENCH_PREFIX = 'bench-'
+
+CATEGORIES = {
+    'living-room': ('Living Room', ['sofas', 'coffee-tables', 'tv-stands']),
+    'bedroom': ('Bedroom', ['beds', 'nightstands', 'wardrobes']),
+    'dining': ('Dining', ['dining-tables', 'dining-chairs']),
+    'office': ('Office', ['desks', 'office-chairs']),
+    'outdoor': ('Outdoor', []),
+    'storage': ('Storage', ['bookshelves']),
+}
+CITIES = ['Tashkent', 'Samarkand', 'Bukhara', 'Namangan', 'Andijan', 'Fergana']
+
+
+class Command(BaseCommand):
+    help = 'Seed a large synthetic catalog, users and order history for benchmarking.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100_000)
+        parser.add_argument('--images-per-product', type=int, default=5)
+        parser.add_argument('--orders', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--days', type=int, default=365, help='Spread orders over this many days.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42, help='Random seed, for reproducible data.')
+        parser.add_argument('--reset', action='store_true', help='Delete previously seeded benchmark data first.')
+
+    def handle(self, *args, **options):
+        self.seed = options['seed']
+        self.random = random.Random(self.seed)
+        self.batch_size = options['batch_size']
+
+        if options['reset']:
+            self.reset()
+        categories = self.seed_categories()
+        products = self.timed('products', self.seed_products, categories, options['products'])
+        self.timed('images', self.seed_images, products, options['images_per_product'])
+        self.timed('search index', lambda: get_search_backend().reindex(Product.objects.all()))
+        users = self.timed('users', self.seed_users, options['users'])
+        if products:
+            self.timed('orders', self.seed_orders, products, users, options['orders'], options['days'])
+
+    def timed(self, label, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.stdout.write(f'{label}: {time.perf_counter() - start:.1f}s')
+        return result
+
+    def batches(self, items):
+        for start in range(0, len(items), self.batch_size):
+            yield items[start:start + self.batch_size]
+
+    def reset(self):
+        """
+        Delete previous benchmark data with raw batched DELETEs.
+
+        ``Model.delete()`` would load every row and fire the per-row signals
+        (cover image refresh, home, catalog and rollup invalidation, search
+        removal), so the dependent rows are deleted here directly and the
+        home cache, catalog version and rollups are refreshed once at the
+        end. The search index is rebuilt by ``handle()``.
+        """
+        orders = Order.objects.filter(user__username__startswith=BENCH_PREFIX)
+        days = orders.aggregate(first=Min('created_at'), last=Max('created_at'))
+        self.delete_batches(orders, lambda pks: [
+            OrderNotification.objects.filter(order__in=pks),
+            OrderItem.objects.filter(order__in=pks),
+        ])
+        if days['first'] is not None:
+            DailySales.objects.filter(
+                day__range=(timezone.localdate(days['first']), timezone.localdate(days['last'])),
+            ).update(stale=True)
+
+        def product_rows(pks):
+            OrderItem.objects.filter(product__in=pks).update(product=None)
+            return [
+                CartItem.objects.filter(product__in=pks),
+                Favorite.objects.filter(product__in=pks),
+                RelatedProduct.objects.filter(models.Q(product__in=pks) | models.Q(related__in=pks)),
+                ProductImage.objects.filter(product__in=pks),
+            ]
+        self.delete_batches(Product.objects.filter(slug__startswith=BENCH_PREFIX), product_rows)
+        invalidate_home()
+        CatalogVersion.bump('deletions')
+
+        User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+        self.stdout.write('Removed previous benchmark data.')
+
+    def delete_batches(self, queryset, dependents):
+        """Delete ``queryset`` a batch at a time, after the rows ``dependents(pks)`` returns for each batch."""
+        pks = queryset.values_list('pk', flat=True)
+        while batch := list(pks[:self.batch_size]):
+            with transaction.atomic():
+                for rows in dependents(batch):
+                    rows._raw_delete(rows.db)
+                rows = queryset.model._base_manager.filter(pk__in=batch)
+                rows._raw_delete(rows.db)
+
+    def seed_categories(self):
+        categories = []
+        for slug, (name, children) in CATEGORIES.items():
+            parent, _ = Category.objects.get_or_create(slug=slug, defaults={'name': name})
+            categories.append(parent)
+            for child_slug in children:
+                child, _ = Category.objects.get_or_create(
+                    slug=child_slug,
+                    defaults={'name': child_slug.replace('-', ' ').title(), 'parent': parent},
+                )
+                categories.append(child)
+        return categories
+
+    def seed_products(self, categories, count):
+        start = Product.objects.filter(slug__startswith=BENCH_PREFIX).count()
+        seed_products(
+            synthetic_products(categories, count, prefix=BENCH_PREFIX, start=start, seed=self.seed + start),
+            self.batch_size,
+        )
+        return list(
+            Product.objects.filter(slug__startswith=BENCH_PREFIX).values_list('pk', 'name', 'price')
+        )
+
+    def seed_images(self, products, per_product):
+        with_images = set(ProductImage.objects.filter(
+            product__slug__startswith=BENCH_PREFIX
+        ).values_list('product_id', flat=True).distinct())
+        seed_images(
+            (
+                ProductImage(
+                    product_id=pk,
+                    image=f'products/bench/{(pk + order) % 50}.jpg',
+                    is_primary=order == 0,
+                    order=order,
+                )
+                for pk, name, price in products if pk not in with_images
+                for order in range(per_product)
+            ),
+            self.batch_size,
+        )
+
+    def seed_users(self, count):
+        password = make_password('benchmark')
+        existing = set(User.objects.filter(username__startswith=BENCH_PREFIX).values_list('username', flat=True))
+        User.objects.bulk_create([
+            User(username=f'{BENCH_PREFIX}{i}', email=f'{BENCH_PREFIX}{i}@example.com', password=password)
+            for i in range(count) if f'{BENCH_PREFIX}{i}' not in existing
+        ], batch_size=self.batch_size)
+        return list(User.objects.filter(username__startswith=BENCH_PREFIX).values_list('pk', flat=True))
+
+    def seed_orders(self, products, users, count, days):
+        rand = self.random
+        now = timezone.now()
+        per_day = max(1, -(-count // days))
+        statuses = [value for value, label in Order.STATUS_CHOICES]
+
+        for day_start in range(0, count, per_day):
+            created_at = now - timedelta(days=day_start // per_day, minutes=rand.randint(0, 1439))
+            day_count = min(per_day, count - day_start)
+            for batch in self.batches(range(day_count)):
+                orders, lines = [], []
+                for _ in batch:
+                    picked = [rand.choice(products) for _ in range(rand.randint(1, 3))]
+                    quantities = [rand.randint(1, 3) for _ in picked]
+                    lines.append(list(zip(picked, quantities)))
+                    orders.append(Order(
+                        user_id=rand.choice(users) if users else None,
+                        full_name='Benchmark Customer',
+                        phone='+998900000000',
+                        address='1 Benchmark Street',
+                        city=rand.choice(CITIES),
+                        status=rand.choice(statuses),
+                        total_price=sum(price * quantity for (pk, name, price), quantity in lines[-1]),
+                    ))
+                with transaction.atomic():
+                    Order.objects.bulk_create(orders)
+                    OrderItem.objects.bulk_create([
+                        OrderItem(order=order, product_id=pk, product_name=name, quantity=quantity, price=price)
+                        for order, order_lines in zip(orders, lines)
+                        for (pk, name, price), quantity in order_lines
+                    ])
+                    # created_at is auto_now_add, so backdate the batch afterwards.
+                    Order.objects.filter(pk__in=[order.pk for order in orders]).update(created_at=created_at)
+            self.stdout.write(f'  orders: {day_start + day_count}/{count}', ending='\r')
+        self.stdout.write('')
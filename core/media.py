@@ -0,0 +1,162 @@
+"""
+Media file serving.
+
+:func:`serve_media` answers every request under ``MEDIA_URL``. It checks
+the path, answers conditional requests (``If-None-Match``,
+``If-Modified-Since``) from a single ``stat`` and then, depending on
+``MEDIA_OFFLOAD``:
+
+* ``'x-accel-redirect'`` hands the file to nginx through an ``internal``
+  location at ``MEDIA_ACCEL_REDIRECT_PREFIX``;
+* ``'x-sendfile'`` hands it to Apache (mod_xsendfile) or lighttpd;
+* ``''`` streams it from Python, honouring a single byte range.
+
+The front server handles byte ranges for offloaded files. When streaming,
+the response wraps the open file so that a WSGI server with a
+``wsgi.file_wrapper`` (gunicorn) sends it, or just the requested range,
+with zero-copy ``os.sendfile``; other servers read it in blocks.
+
+Content-addressed files (see ``core.storage``), whose name is their hex
+digest, and their renditions never change and are cached for a year as
+``immutable``.
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+# A hex digest file name, or a rendition of one (``<digest>_640w.webp``).
+CONTENT_ADDRESSED_RE = re.compile(r'(?:^|/)[0-9a-f]{32,}(?:_\d+w)?\.\w+$')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class FileRange:
+    """
+    The ``length`` bytes of ``file`` from ``start`` on.
+
+    Keeps ``fileno()`` so a WSGI ``file_wrapper`` can ``os.sendfile`` from
+    the current offset, capped by the response's ``Content-Length``.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` (inclusive) of a single ``bytes=`` range, or ``None``
+    to send the whole file. Malformed and multi-part ranges are ignored, as
+    the spec allows; unsatisfiable ones raise :class:`RangeNotSatisfiable`.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        if int(last) == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _range_applies(request, etag, mtime):
+    """``If-Range`` only lets the range through if the file is unchanged."""
+    if_range = request.headers.get('If-Range')
+    return not if_range or if_range == etag or parse_http_date_safe(if_range) == mtime
+
+
+def _cache_control(name):
+    if CONTENT_ADDRESSED_RE.search(name):
+        return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return f'public, max-age={settings.MEDIA_MAX_AGE}'
+
+
+def _stream(request, full_path, size, content_type, etag, mtime):
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size) if _range_applies(request, etag, mtime) else None
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+    else:
+        response = FileResponse(FileRange(open(full_path, 'rb'), start, length), content_type=content_type)
+        del response['Content-Disposition']
+    if byte_range:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = length
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve ``path`` from ``MEDIA_ROOT``, offloading to the front server if configured."""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        st = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404
+
+    mtime = int(st.st_mtime)
+    etag = f'"{mtime:x}-{st.st_size:x}"'
+    response = get_conditional_response(request, etag=etag, last_modified=mtime)
+    if response is None:
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        if settings.MEDIA_OFFLOAD == 'x-accel-redirect':
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+        elif settings.MEDIA_OFFLOAD == 'x-sendfile':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = full_path
+        else:
+            response = _stream(request, full_path, st.st_size, content_type, etag, mtime)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(mtime)
+    response['Cache-Control'] = _cache_control(path)
+    response['Accept-Ranges'] = 'bytes'
+    return response
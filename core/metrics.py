@@ -0,0 +1,150 @@
+"""
+Per-request performance metrics.
+
+``RequestMetricsMiddleware`` opens a :class:`RequestMetrics` for every
+request and records:
+
+* the number of SQL queries and the time spent in them, through the
+  ``execute_wrapper`` installed on every connection as it opens;
+* template render time, through the :class:`DjangoTemplates` backend below;
+* total view time (everything inside the middleware).
+
+Queries run while a template renders count towards both ``db`` and
+``tpl``. Finished requests go into a small rolling window per URL name,
+and ``QUERY_BUDGETS`` caps the queries each URL name may run.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates as BaseDjangoTemplates
+
+STATS_WINDOW = 500
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a view runs more queries than its budget."""
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.view_time = 0.0
+        self._template_depth = 0
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.view_time = time.perf_counter() - self._start
+        _current.reset(self._token)
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'view;dur={self.view_time * 1000:.1f}',
+        ])
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper that counts and times queries for the current request."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+class TimedTemplate:
+    """Wraps a backend template to add its render time to the current request."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return self.template.render(context, request)
+        metrics._template_depth += 1
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics._template_depth -= 1
+            if not metrics._template_depth:
+                metrics.template_time += time.perf_counter() - start
+
+
+class DjangoTemplates(BaseDjangoTemplates):
+    """The standard Django template backend with render timing."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class RequestStats:
+    """Rolling window of the last ``STATS_WINDOW`` requests per URL name."""
+
+    def __init__(self, window=STATS_WINDOW):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def record(self, name, metrics):
+        with self._lock:
+            self._samples[name].append(
+                (metrics.queries, metrics.db_time, metrics.template_time, metrics.view_time)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+        return {name: _summarize(name, values) for name, values in sorted(samples.items())}
+
+
+def _percentile(sorted_values, percent):
+    index = min(len(sorted_values) - 1, round(percent / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def _summarize(name, values):
+    queries = [sample[0] for sample in values]
+    view_ms = sorted(sample[3] * 1000 for sample in values)
+    return {
+        'requests': len(values),
+        'queries_avg': round(sum(queries) / len(queries), 1),
+        'queries_max': max(queries),
+        'query_budget': settings.QUERY_BUDGETS.get(name),
+        'db_ms_avg': round(sum(sample[1] for sample in values) * 1000 / len(values), 2),
+        'template_ms_avg': round(sum(sample[2] for sample in values) * 1000 / len(values), 2),
+        'view_ms_p50': round(_percentile(view_ms, 50), 2),
+        'view_ms_p95': round(_percentile(view_ms, 95), 2),
+        'view_ms_max': round(view_ms[-1], 2),
+    }
+
+
+request_stats = RequestStats()
@@ -0,0 +1,62 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import QueryBudgetExceeded, RequestMetrics, request_stats
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """
+    Measure queries, DB time, template time and view time for each request.
+
+    Results go to the rolling stats behind ``core:request_stats`` and, when
+    ``SERVER_TIMING`` is on, to a ``Server-Timing`` response header. Views
+    over their ``QUERY_BUDGETS`` entry are logged, or raise
+    :class:`QueryBudgetExceeded` when ``QUERY_BUDGET_STRICT`` is set (tests).
+    Should be first in ``MIDDLEWARE`` so it sees every query.
+
+    Works under both WSGI and ASGI. Queries are counted by the
+    ``record_query`` wrapper every connection gets when it opens, which
+    follows the request into ``sync_to_async`` threads.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with RequestMetrics() as metrics:
+            response = self.get_response(request)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        with RequestMetrics() as metrics:
+            response = await self.get_response(request)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        match = request.resolver_match
+        name = match.view_name if match else None
+        if name:
+            request_stats.record(name, metrics)
+            self.check_budget(name, metrics)
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = metrics.server_timing()
+        return response
+
+    def check_budget(self, name, metrics):
+        budget = settings.QUERY_BUDGETS.get(name)
+        if budget is None or metrics.queries <= budget:
+            return
+        message = f'{name} ran {metrics.queries} queries (budget {budget})'
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
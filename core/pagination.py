@@ -0,0 +1,50 @@
+"""
+Admin changelist pagination for large tables.
+
+Django's changelist counts the whole result set on every page load, which
+on a table of millions of orders means a full scan. With
+:class:`EstimatedCountPaginator` an unfiltered list takes its size from the
+database's table statistics (``pg_class.reltuples`` on PostgreSQL,
+``information_schema`` on MySQL). Filtered lists, and every list on
+SQLite, count at most ``ADMIN_EXACT_COUNT_LIMIT`` rows, so pages past the
+limit are only reachable by narrowing the filters. Below the limit counts
+are exact.
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from products.pagination import approximate_count
+
+TABLE_ROWS_SQL = {
+    'postgresql': 'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+    'mysql': 'SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s',
+}
+
+
+def estimated_table_rows(model, using='default'):
+    """The planner's row estimate for ``model``'s table, or ``None`` if the backend has none."""
+    connection = connections[using]
+    sql = TABLE_ROWS_SQL.get(connection.vendor)
+    if sql is None:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [model._meta.db_table])
+        row = cursor.fetchone()
+    # PostgreSQL reports -1 for a table that was never analyzed.
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose ``count`` is estimated once it passes ``ADMIN_EXACT_COUNT_LIMIT``."""
+
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_EXACT_COUNT_LIMIT
+        queryset = self.object_list
+        if not queryset.query.where and not queryset.query.distinct:
+            estimate = estimated_table_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate > limit:
+                return estimate
+        return approximate_count(queryset, cap=limit)[0]
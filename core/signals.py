@@ -0,0 +1,58 @@
+"""
+Signal receivers for the shared caches, query metrics and stored files.
+
+``CoreConfig.ready()`` connects them:
+
+* :func:`invalidate_home_cache` to saves and deletes of everything the
+  home page shows;
+* :func:`install_query_metrics` to every new database connection;
+* the stored-file receivers to each model in ``REFERENCING_FIELDS``, to
+  keep ``StoredFile.ref_count`` in step with the file fields.
+"""
+from .storage import REFERENCING_FIELDS, adjust_ref_count
+
+
+def invalidate_home_cache(sender, **kwargs):
+    from .cache import invalidate_home
+    invalidate_home()
+
+
+def install_query_metrics(sender, connection, **kwargs):
+    """Count every query on ``connection`` towards the current request's metrics."""
+    from .metrics import record_query
+    if record_query not in connection.execute_wrappers:
+        # At the front, so an enclosing ``execute_wrapper()`` block still pops its own wrapper.
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def _file_fields(sender):
+    return [field for label, field in REFERENCING_FIELDS if label == sender._meta.label]
+
+
+def remember_stored_files(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Note which files the row pointed at before this save."""
+    fields = _file_fields(sender)
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+    instance._stored_files_before = {}
+    if raw or instance.pk is None or not fields:
+        return
+    instance._stored_files_before = sender._base_manager.filter(pk=instance.pk).values(*fields).first() or {}
+
+
+def count_stored_files(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, '_stored_files_before', {})
+    for field in _file_fields(sender):
+        if update_fields is not None and field not in update_fields:
+            continue
+        old, new = before.get(field) or '', getattr(instance, field).name or ''
+        if old != new:
+            adjust_ref_count(new, 1)
+            adjust_ref_count(old, -1)
+
+
+def release_stored_files(sender, instance, **kwargs):
+    for field in _file_fields(sender):
+        adjust_ref_count(getattr(instance, field).name or '', -1)
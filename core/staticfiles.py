@@ -0,0 +1,186 @@
+"""
+Static asset pipeline.
+
+``collectstatic`` with :class:`CompressedManifestStaticFilesStorage` copies
+every file to ``STATIC_ROOT`` under a content-hashed name
+(``css/style.3f2a1b9c0d4e.css``) and writes ``.gz`` and, when the
+``brotli`` package is installed, ``.br`` variants next to each text asset.
+
+:class:`StaticFilesMiddleware` serves ``STATIC_ROOT`` from inside the app.
+It indexes the directory once at startup, with the response headers for
+every file and encoding worked out in advance, so serving a request is a
+dict lookup and an open file handed to the server. Hashed names never
+change content and are cached for a year as ``immutable``; anything else
+is revalidated with its ETag.
+"""
+import gzip
+import mimetypes
+import os
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.xml', '.html', '.ico', '.ttf', '.eot'}
+MIN_COMPRESS_SIZE = 256
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+STATIC_MAX_AGE = 60
+
+# (Content-Encoding, file suffix), best first.
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+ACCEPT_ENCODING = {encoding: re.compile(rf'\b{encoding}\b') for encoding, suffix in ENCODINGS}
+
+
+def compress(data):
+    """``{suffix: compressed bytes}`` for each encoding that saves at least 5%."""
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    return {suffix: body for suffix, body in variants.items() if len(body) < len(data) * 0.95}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also precompresses the collected files.
+
+    Until ``collectstatic`` has written a manifest (development, tests),
+    urls fall back to the source names.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(paths) | set(self.hashed_files.values()):
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                self.compress_file(name)
+
+    def compress_file(self, name):
+        with self.open(name) as f:
+            data = f.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        for suffix, body in compress(data).items():
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(body))
+
+
+class StaticFile:
+    """A file under ``STATIC_ROOT`` with its precompressed variants and headers."""
+
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        content_type, _ = mimetypes.guess_type(path)
+        self.etag = f'W/"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        if immutable:
+            cache_control = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            cache_control = f'public, max-age={STATIC_MAX_AGE}'
+        self.headers = {
+            'ETag': self.etag,
+            'Last-Modified': http_date(stat.st_mtime),
+            'Cache-Control': cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+        self.content_type = content_type or 'application/octet-stream'
+        # encoding -> (path, size); '' is the uncompressed file.
+        self.variants = {'': (path, stat.st_size)}
+        for encoding, suffix in ENCODINGS:
+            if os.path.isfile(path + suffix):
+                self.variants[encoding] = (path + suffix, os.path.getsize(path + suffix))
+
+    def pick_encoding(self, accept_encoding):
+        for encoding, suffix in ENCODINGS:
+            if encoding in self.variants and ACCEPT_ENCODING[encoding].search(accept_encoding):
+                return encoding
+        return ''
+
+    def response(self, request):
+        if self.etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            encoding = self.pick_encoding(request.headers.get('Accept-Encoding', ''))
+            path, size = self.variants[encoding]
+            if request.method == 'HEAD':
+                response = HttpResponse(content_type=self.content_type)
+            else:
+                response = FileResponse(open(path, 'rb'), content_type=self.content_type)
+                del response['Content-Disposition']
+            response['Content-Length'] = size
+            if encoding:
+                response['Content-Encoding'] = encoding
+        for header, value in self.headers.items():
+            response[header] = value
+        return response
+
+
+class StaticFilesMiddleware:
+    """
+    Serve the collected static files, preferring brotli or gzip variants.
+
+    Goes right after ``SecurityMiddleware``. Does nothing until
+    ``collectstatic`` has filled ``STATIC_ROOT``; restart after running it
+    again to pick up new files.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.files = self.scan(settings.STATIC_ROOT, settings.STATIC_URL)
+        if not self.files:
+            raise MiddlewareNotUsed
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def scan(root, url):
+        if not root or not os.path.isdir(root) or not url.startswith('/'):
+            return {}
+        hashed = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        suffixes = tuple(suffix for encoding, suffix in ENCODINGS)
+        files = {}
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(suffixes):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                files[url + name] = StaticFile(path, immutable=name in hashed)
+        return files
+
+    def serve(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        static_file = self.files.get(request.path_info)
+        return static_file.response(request) if static_file else None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.serve(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    async def __acall__(self, request):
+        response = self.serve(request)
+        if response is None:
+            response = await self.get_response(request)
+        return response
@@ -0,0 +1,148 @@
+"""
+Content-addressed media storage.
+
+:class:`ContentAddressedStorage` stores every upload as
+``cas/<aa>/<bb>/<sha256>.<ext>``, whatever name it was given, so identical
+bytes are kept once however many product images, categories, banners or
+avatars use them. A file's content never changes under its name, which
+lets ``core.media`` cache it as ``immutable``.
+
+``StoredFile`` rows count how many of the fields in ``REFERENCING_FIELDS``
+point at each file; the receivers in ``core.signals`` keep them up to date
+on save and delete. Bulk operations skip signals, so ``manage.py gc_media``
+recounts from the database before deleting anything unreferenced.
+"""
+import hashlib
+import os
+import re
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+CAS_PREFIX = 'cas/'
+CAS_NAME_RE = re.compile(r'^cas/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.\w+$')
+
+# (model label, field name) of every file field stored through this backend.
+REFERENCING_FIELDS = [
+    ('products.ProductImage', 'image'),
+    ('products.Category', 'image'),
+    ('core.Banner', 'image'),
+    ('accounts.UserProfile', 'avatar'),
+]
+
+
+def is_content_addressed(name):
+    return bool(name) and CAS_NAME_RE.match(name) is not None
+
+
+def file_digest(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names files after their SHA-256.
+
+    Names under ``verbatim_prefixes`` are files derived from a stored file
+    (renditions), whose names are computed from the original's, and are
+    kept as given.
+    """
+    verbatim_prefixes = ('renditions/',)
+
+    def _save(self, name, content):
+        if name.startswith(self.verbatim_prefixes):
+            return super()._save(name, content)
+        digest = file_digest(content)
+        ext = os.path.splitext(name)[1].lower()
+        name = f'{CAS_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+        if self.exists(name):
+            # Reset the mtime so gc_media's grace period covers the new reference.
+            os.utime(self.path(name))
+            return name
+        return super()._save(name, content)
+
+
+def adjust_ref_count(name, delta):
+    """Add ``delta`` references to the stored file ``name``."""
+    from .models import StoredFile
+    if not is_content_addressed(name):
+        return
+    if not StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') + delta):
+        StoredFile.objects.create(name=name, ref_count=max(delta, 0))
+
+
+def referenced_files():
+    """``Counter`` of stored file names over every field in ``REFERENCING_FIELDS``."""
+    counts = Counter()
+    for label, field in REFERENCING_FIELDS:
+        names = apps.get_model(label)._base_manager.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+        counts.update(names.values_list(field, flat=True).iterator(chunk_size=5000))
+    return counts
+
+
+def referenced_renditions():
+    from products.models import ProductImage
+    from products.renditions import RENDITION_FORMATS, rendition_name
+    return {
+        rendition_name(name, width, ext)
+        for name, widths in ProductImage.objects.values_list('image', 'rendition_widths').iterator(chunk_size=5000)
+        for width in widths or []
+        for ext in RENDITION_FORMATS
+    }
+
+
+def recount_references(counts):
+    """Reset every ``StoredFile.ref_count`` to the counts found in the database."""
+    from .models import StoredFile
+    rows = [StoredFile(name=name, ref_count=count) for name, count in counts.items() if is_content_addressed(name)]
+    with transaction.atomic():
+        StoredFile.objects.update(ref_count=0)
+        StoredFile.objects.bulk_create(
+            rows, batch_size=2000, update_conflicts=True, unique_fields=['name'], update_fields=['ref_count'],
+        )
+
+
+def collect_garbage(storage, min_age, include_legacy=False, dry_run=False):
+    """
+    Delete stored files nothing refers to; returns ``(files, bytes)`` removed.
+
+    Only content-addressed files and their renditions are considered,
+    unless ``include_legacy`` also sweeps files saved before this storage
+    (e.g. after ``dedupe_media``). Files modified within ``min_age`` seconds
+    are left alone, so an upload whose row isn't saved yet survives.
+    """
+    from .models import StoredFile
+    counts = referenced_files()
+    if not dry_run:
+        recount_references(counts)
+    keep = set(counts) | referenced_renditions()
+    cutoff = time.time() - min_age
+    removed, reclaimed = [], 0
+    for directory, _, filenames in os.walk(storage.location):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+            if name in keep:
+                continue
+            if not include_legacy and not name.startswith((CAS_PREFIX, f'renditions/{CAS_PREFIX}')):
+                continue
+            stat = os.stat(path)
+            if stat.st_mtime > cutoff:
+                continue
+            removed.append(name)
+            reclaimed += stat.st_size
+            if not dry_run:
+                storage.delete(name)
+    if not dry_run:
+        stale = [name for name in removed if is_content_addressed(name)]
+        for start in range(0, len(stale), 500):
+            StoredFile.objects.filter(name__in=stale[start:start + 500]).delete()
+    return len(removed), reclaimed
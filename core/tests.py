@@ -1,3 +1,371 @@
-from django.test import TestCase
+import os
+import tempfile
+import time
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from cart.models import DailySales, Order, OrderItem
+from favorites.models import Favorite
+from products.models import CatalogVersion, Category, Product, ProductImage, RelatedProduct
+from .benchmark import ClientDriver, run_benchmark
+from .cache import get_home_version
+from .management.commands.seed_benchmark import Command
+from .metrics import request_stats
+from .models import Banner, StoredFile
+from .storage import is_content_addressed
+
+
+@override_settings(QUERY_BUDGET_STRICT=True, SERVER_TIMING=True)
+class QueryBudgetTests(TestCase):
+    """
+    Every budgeted page must stay within ``QUERY_BUDGETS``.
+
+    The middleware raises ``QueryBudgetExceeded`` in strict mode, so a view
+    that grows a query (or an N+1 over the 40 products below) fails here.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        living = Category.objects.create(name='Living', slug='living')
+        sofas = Category.objects.create(name='Sofas', slug='sofas', parent=living)
+        cls.products = [
+            Product.objects.create(
+                name=f'Product {i}', slug=f'product-{i}', category=(living, sofas)[i % 2],
+                description='Furniture', price=100 + i, stock=5, is_featured=i % 3 == 0,
+            )
+            for i in range(40)
+        ]
+        for product in cls.products[:20]:
+            for order in range(2):
+                ProductImage.objects.create(product=product, image=f'products/{product.slug}-{order}.jpg', order=order)
+        cls.user = User.objects.create_user('shopper', password='secret')
+        Favorite.objects.bulk_create([Favorite(user=cls.user, product=product) for product in cls.products[:10]])
+
+    def setUp(self):
+        cache.clear()
+        request_stats.clear()
+
+    def pages(self):
+        product = self.products[1]
+        return [
+            reverse('core:home'),
+            reverse('products:catalog'),
+            reverse('products:catalog') + '?category=living&sort=price_asc',
+            reverse('products:catalog') + '?material=wood&min_price=100',
+            product.get_absolute_url(),
+            reverse('cart:cart_detail'),
+            reverse('cart:checkout'),
+            reverse('cart:order_history'),
+            reverse('favorites:list'),
+        ]
+
+    def fill_cart(self):
+        for product in self.products[:10]:
+            self.client.post(reverse('cart:add_to_cart', args=[product.pk]), {'quantity': 1})
+
+    def assertWithinBudget(self):
+        for url in self.pages():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn(response.status_code, (200, 302))
+                self.assertIn('Server-Timing', response)
+
+    def test_anonymous(self):
+        self.assertWithinBudget()
+
+    def test_anonymous_with_cart(self):
+        self.fill_cart()
+        self.assertWithinBudget()
+
+    def test_signed_in_with_cart_and_favorites(self):
+        self.client.force_login(self.user)
+        self.fill_cart()
+        self.assertWithinBudget()
+
+    def test_every_budgeted_view_was_exercised(self):
+        self.client.force_login(self.user)
+        self.fill_cart()
+        self.assertWithinBudget()
+        self.assertEqual(set(settings.QUERY_BUDGETS) - set(request_stats.summary()), set())
+
+
+class HomeCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Living', slug='living')
+        cls.products = [
+            Product.objects.create(
+                name=f'Sofa {i}', slug=f'sofa-{i}', category=category, price=100, stock=1, is_featured=True,
+            )
+            for i in range(3)
+        ]
+        cls.users = [User.objects.create_user(f'shopper-{i}', password='secret') for i in range(2)]
+        Favorite.objects.create(user=cls.users[0], product=cls.products[0])
+        Favorite.objects.create(user=cls.users[1], product=cls.products[2])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_signed_in_users_share_the_fragment(self):
+        responses = []
+        for user in self.users:
+            self.client.force_login(user)
+            responses.append(self.client.get(reverse('core:home')))
+        # Both users' fragments are cached under the same key.
+        keys = [key for key in cache._cache if 'template.cache.home_content' in key]
+        self.assertEqual(len(keys), 1)
+        for response, product in zip(responses, (self.products[0], self.products[2])):
+            self.assertContains(response, (
+                f'<button class="btn btn-light btn-sm position-absolute top-0 end-0 m-2 rounded-circle fav-btn z-1"'
+                f' data-product-id="{product.pk}" onclick="toggleFavorite({product.pk}, this)">'
+                f'<i class="bi bi-heart"></i></button>'
+            ), count=2, html=True)
+            self.assertEqual(response.context['favorite_id_list'], [product.pk])
+            self.assertContains(response, f'<script id="favorite-ids" type="application/json">[{product.pk}]</script>', html=True)
+
+
+class SeedBenchmarkTests(TestCase):
+    def seed(self, **options):
+        options = {'products': 40, 'images_per_product': 2, 'orders': 30, 'users': 5, 'days': 3, 'batch_size': 10, **options}
+        call_command('seed_benchmark', stdout=StringIO(), **options)
+
+    def test_reset_deletes_in_batches_without_per_row_signals(self):
+        self.seed()
+        product = Product.objects.filter(slug__startswith='bench-').first()
+        other = Product.objects.create(name='Kept', slug='kept', category=product.category, price=10, stock=1)
+        RelatedProduct.objects.create(product=other, related=product, rank=0, score=1, computed_at=timezone.now())
+        order = Order.objects.create(full_name='Customer', phone='1', address='1 Street', city='Tashkent', total_price=10)
+        line = OrderItem.objects.create(order=order, product=product, product_name=product.name, price=10)
+        rolled_up = DailySales.objects.create(
+            day=timezone.localdate(Order.objects.filter(user__isnull=False).latest('created_at').created_at),
+            dimension='total', key='', computed_at=timezone.now(),
+        )
+        versions = get_home_version(), CatalogVersion.current()
+
+        command = Command(stdout=StringIO())
+        command.batch_size = 20
+        with CaptureQueriesContext(connection) as queries:
+            command.reset()
+
+        self.assertFalse(Product.objects.filter(slug__startswith='bench-').exists())
+        self.assertFalse(ProductImage.objects.exists())
+        self.assertFalse(Order.objects.filter(user__username__startswith='bench-').exists())
+        self.assertFalse(User.objects.filter(username__startswith='bench-').exists())
+        self.assertFalse(RelatedProduct.objects.exists())
+        line.refresh_from_db()
+        self.assertIsNone(line.product_id)
+        self.assertTrue(Product.objects.filter(pk=other.pk).exists())
+        rolled_up.refresh_from_db()
+        self.assertTrue(rolled_up.stale)
+        self.assertNotEqual((get_home_version(), CatalogVersion.current()), versions)
+        # Deleting row by row fires signals for each of the 40 products and 80 images: 250 queries.
+        self.assertLess(len(queries), 60)
+
+    def test_reseed_after_reset(self):
+        self.seed()
+        self.seed(reset=True)
+        self.assertEqual(Product.objects.filter(slug__startswith='bench-').count(), 40)
+        self.assertFalse(Product.objects.filter(cover_image__isnull=True).exists())
+
+
+class BenchmarkTests(TestCase):
+    @override_settings(SERVER_TIMING=False)
+    def test_fails_fast_without_query_counts(self):
+        category = Category.objects.create(name='Living', slug='living')
+        Product.objects.create(name='Sofa', slug='sofa', category=category, price=100, stock=1)
+        with self.assertRaisesMessage(ValueError, 'turn on SERVER_TIMING'):
+            run_benchmark(ClientDriver, workers=1, flows=1)
+
+
+class MediaServingTests(TestCase):
+    BODY = b'abcdefghijklmnopqrstuvwxyz'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tempdir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.tempdir.cleanup)
+        media_root = os.path.join(cls.tempdir.name, 'media')
+        os.makedirs(os.path.join(media_root, 'products'))
+        with open(os.path.join(media_root, 'products', 'letters.txt'), 'wb') as f:
+            f.write(cls.BODY)
+        with open(os.path.join(media_root, 'products', 'c0ffee' * 6 + '.txt'), 'wb') as f:
+            f.write(cls.BODY)
+        with open(os.path.join(cls.tempdir.name, 'secret.txt'), 'wb') as f:
+            f.write(b'secret')
+        settings_override = override_settings(MEDIA_ROOT=media_root, MEDIA_OFFLOAD='')
+        settings_override.enable()
+        cls.addClassCleanup(settings_override.disable)
+
+    def get(self, path='products/letters.txt', headers=None):
+        response = self.client.get(f'/media/{path}', headers=headers)
+        self.addCleanup(response.close)
+        return response
+
+    def test_whole_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.getvalue(), self.BODY)
+        self.assertEqual(response['Content-Length'], str(len(self.BODY)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], f'public, max-age={settings.MEDIA_MAX_AGE}')
+
+    def test_byte_ranges(self):
+        for header, status, content_range, body in [
+            ('bytes=2-5', 206, 'bytes 2-5/26', b'cdef'),
+            ('bytes=20-', 206, 'bytes 20-25/26', b'uvwxyz'),
+            ('bytes=-4', 206, 'bytes 22-25/26', b'wxyz'),
+            ('bytes=-100', 206, 'bytes 0-25/26', self.BODY),
+            ('bytes=24-100', 206, 'bytes 24-25/26', b'yz'),
+            ('bytes=5-2', 200, None, self.BODY),
+            ('bytes=0-1,4-5', 200, None, self.BODY),
+        ]:
+            with self.subTest(range=header):
+                response = self.get(headers={'Range': header})
+                self.assertEqual(response.status_code, status)
+                self.assertEqual(response.get('Content-Range'), content_range)
+                self.assertEqual(response.getvalue(), body)
+                self.assertEqual(response['Content-Length'], str(len(body)))
+
+    def test_unsatisfiable_range(self):
+        for header in ['bytes=26-', 'bytes=100-200', 'bytes=-0']:
+            with self.subTest(range=header):
+                response = self.get(headers={'Range': header})
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], 'bytes */26')
+
+    def test_if_range(self):
+        etag = self.get()['ETag']
+        response = self.get(headers={'Range': 'bytes=0-2', 'If-Range': etag})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.getvalue(), b'abc')
+        response = self.get(headers={'Range': 'bytes=0-2', 'If-Range': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.getvalue(), self.BODY)
+
+    def test_conditional_get(self):
+        first = self.get()
+        for headers in [{'If-None-Match': first['ETag']}, {'If-Modified-Since': first['Last-Modified']}]:
+            with self.subTest(headers=headers):
+                response = self.get(headers=headers)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], first['ETag'])
+        self.assertEqual(self.get(headers={'If-None-Match': '"stale"'}).status_code, 200)
+
+    def test_content_addressed_files_are_immutable(self):
+        response = self.get('products/' + 'c0ffee' * 6 + '.txt')
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_paths_outside_media_root(self):
+        for path in ['../secret.txt', 'products/../../secret.txt', '%2e%2e/secret.txt', '/etc/passwd', 'products', 'missing.txt']:
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path).status_code, 404)
+
+    def test_offload(self):
+        with self.settings(MEDIA_OFFLOAD='x-accel-redirect'):
+            response = self.get(headers={'Range': 'bytes=0-2'})
+            self.assertEqual(response['X-Accel-Redirect'], settings.MEDIA_ACCEL_REDIRECT_PREFIX + 'products/letters.txt')
+            self.assertEqual(response.content, b'')
+        with self.settings(MEDIA_OFFLOAD='x-sendfile'):
+            response = self.get()
+            self.assertEqual(response['X-Sendfile'], os.path.join(settings.MEDIA_ROOT, 'products', 'letters.txt'))
+
+
+def png(color):
+    buffer = BytesIO()
+    Image.new('RGB', (8, 8), color).save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue(), name='upload.png')
+
+
+class ContentAddressedStorageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(
+            name='Sofa', slug='sofa', category=Category.objects.create(name='Living', slug='living'), price=100,
+        )
+
+    def setUp(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=tempdir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def ref_count(self, name):
+        return StoredFile.objects.get(name=name).ref_count
+
+    def test_identical_bytes_are_stored_once(self):
+        first = default_storage.save('products/sofa.png', png('red'))
+        second = default_storage.save('banners/SALE.PNG', png('red'))
+        other = default_storage.save('products/sofa.png', png('blue'))
+        self.assertTrue(is_content_addressed(first))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertTrue(first.endswith('.png'))
+        self.assertEqual(len(os.listdir(os.path.dirname(default_storage.path(first)))), 1)
+
+    def test_ref_counts_follow_saves_and_deletes(self):
+        images = [ProductImage.objects.create(product=self.product, image=png('red')) for _ in range(2)]
+        banner = Banner.objects.create(title='Sale', image=png('red'))
+        red = banner.image.name
+        self.assertEqual(images[0].image.name, red)
+        self.assertEqual(self.ref_count(red), 3)
+
+        banner.image = png('blue')
+        banner.save()
+        self.assertEqual(self.ref_count(red), 2)
+        self.assertEqual(self.ref_count(banner.image.name), 1)
+
+        images[0].delete()
+        self.assertEqual(self.ref_count(red), 1)
+        banner.delete()
+        self.product.delete()
+        self.assertEqual(set(StoredFile.objects.values_list('ref_count', flat=True)), {0})
+
+    def age(self, name, hours):
+        past = time.time() - hours * 3600
+        os.utime(default_storage.path(name), (past, past))
+
+    def test_gc_media(self):
+        kept = ProductImage.objects.create(product=self.product, image=png('red'))
+        orphan = default_storage.save('products/orphan.png', png('blue'))
+        StoredFile.objects.create(name=orphan, ref_count=1)
+        fresh = default_storage.save('products/fresh.png', png('green'))
+        legacy = 'products/legacy.png'
+        os.makedirs(default_storage.path('products'))
+        with open(default_storage.path(legacy), 'wb') as f:
+            f.write(b'legacy')
+        for name in (kept.image.name, orphan, legacy):
+            self.age(name, 48)
+        StoredFile.objects.filter(name=kept.image.name).update(ref_count=7)
+
+        out = StringIO()
+        call_command('gc_media', dry_run=True, stdout=out)
+        self.assertIn('Would delete 1 files', out.getvalue())
+        self.assertTrue(default_storage.exists(orphan))
+        self.assertEqual(self.ref_count(kept.image.name), 7)
+
+        call_command('gc_media', stdout=StringIO())
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertFalse(StoredFile.objects.filter(name=orphan).exists())
+        self.assertTrue(default_storage.exists(kept.image.name))
+        self.assertEqual(self.ref_count(kept.image.name), 1)
+        self.assertTrue(default_storage.exists(fresh))
+        self.assertTrue(default_storage.exists(legacy))
+
+        call_command('gc_media', min_age=0, include_legacy=True, stdout=StringIO())
+        self.assertFalse(default_storage.exists(fresh))
+        self.assertFalse(default_storage.exists(legacy))
+        self.assertTrue(default_storage.exists(kept.image.name))
@@ -1,18 +1,22 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
-from .models import Banner
-from products.models import Product, Category
+from favorites.context_processors import request_favorite_ids
+from .cache import HOME_CACHE_TIMEOUT, HomeContent
+from .metrics import request_stats
 
 
 def home(request):
-    banners = Banner.objects.filter(is_active=True)
-    categories = Category.objects.filter(parent__isnull=True)
-    featured_products = Product.objects.filter(is_featured=True, stock__gt=0)[:8]
-    new_arrivals = Product.objects.filter(stock__gt=0).order_by('-created_at')[:8]
+    home_content = HomeContent()
+
     return render(request, 'core/home.html', {
-        'banners': banners,
-        'categories': categories,
-        'featured_products': featured_products,
-        'new_arrivals': new_arrivals,
+        'home_version': home_content.version,
+        'home_cache_timeout': HOME_CACHE_TIMEOUT,
+        'banners': home_content.banners,
+        'categories': home_content.categories,
+        'featured_products': home_content.featured_products,
+        'new_arrivals': home_content.new_arrivals,
+        'favorite_id_list': sorted(request_favorite_ids(request)) if request.user.is_authenticated else [],
     })
 
 
@@ -22,3 +26,11 @@ def about(request):
 
 def contact(request):
     return render(request, 'core/contact.html')
+
+
+@staff_member_required
+def request_stats_view(request):
+    """Rolling per-URL query and latency stats recorded by RequestMetricsMiddleware."""
+    if request.method == 'POST':
+        request_stats.clear()
+    return JsonResponse(request_stats.summary())
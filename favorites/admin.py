@@ -7,3 +7,5 @@ class FavoriteAdmin(admin.ModelAdmin):
     list_display = ('user', 'product', 'created_at')
     list_filter = ('created_at',)
     search_fields = ('user__username', 'product__name')
+    list_select_related = ('user', 'product')
+    raw_id_fields = ('user', 'product')
@@ -0,0 +1,29 @@
+from django.core.cache import cache
+
+from .models import Favorite
+
+FAVORITES_CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(user_id):
+    return f'favorites:{user_id}'
+
+
+def get_favorite_ids(user):
+    """Ids of the products ``user`` has favorited, cached per user."""
+    if not user.is_authenticated:
+        return frozenset()
+    key = _cache_key(user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(Favorite.objects.filter(user=user).values_list('product_id', flat=True))
+        cache.set(key, ids, FAVORITES_CACHE_TIMEOUT)
+    return ids
+
+
+def invalidate_favorite_ids(user):
+    cache.delete(_cache_key(user.pk))
+
+
+async def ainvalidate_favorite_ids(user):
+    await cache.adelete(_cache_key(user.pk))
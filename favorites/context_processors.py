@@ -0,0 +1,15 @@
+from django.utils.functional import SimpleLazyObject
+
+from .cache import get_favorite_ids
+
+
+def request_favorite_ids(request):
+    """Favorite product ids for the current user, loaded once per request."""
+    if not hasattr(request, '_favorite_ids'):
+        request._favorite_ids = get_favorite_ids(request.user)
+    return request._favorite_ids
+
+
+def favorites_context(request):
+    """Add the user's favorite product ids to all templates, lazily."""
+    return {'favorite_ids': SimpleLazyObject(lambda: request_favorite_ids(request))}
@@ -1,34 +1,37 @@
 from django.shortcuts import render
-from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
+from core.http import json_view
+from .cache import ainvalidate_favorite_ids
 from .models import Favorite
 from products.models import Product
 
 
 @login_required
 def favorites_list(request):
-    favorites = Favorite.objects.filter(user=request.user).select_related('product__category').prefetch_related('product__images')
+    favorites = Favorite.objects.filter(user=request.user).select_related('product__category', 'product__cover_image').prefetch_related('product__images')
     return render(request, 'favorites/favorites.html', {
         'favorites': favorites,
     })
 
 
 @login_required
-def toggle_favorite(request, product_id):
+@json_view
+async def toggle_favorite(request, product_id):
     if request.method == 'POST':
-        try:
-            product = Product.objects.get(pk=product_id)
-        except Product.DoesNotExist:
-            return JsonResponse({'error': 'Product not found'}, status=404)
+        if not await Product.objects.filter(pk=product_id).aexists():
+            return {'error': 'Product not found'}, 404
 
-        favorite, created = Favorite.objects.get_or_create(
-            user=request.user, product=product
+        user = await request.auser()
+        favorite, created = await Favorite.objects.aget_or_create(
+            user=user, product_id=product_id
         )
-
         if not created:
-            favorite.delete()
-            return JsonResponse({'status': 'removed', 'message': 'Removed from favorites'})
+            await favorite.adelete()
+        # After the write, or a concurrent request could cache the old set again.
+        await ainvalidate_favorite_ids(user)
 
-        return JsonResponse({'status': 'added', 'message': 'Added to favorites'})
+        if not created:
+            return {'status': 'removed', 'message': 'Removed from favorites'}
+        return {'status': 'added', 'message': 'Added to favorites'}
 
-    return JsonResponse({'error': 'Invalid request'}, status=400)
+    return {'error': 'Invalid request'}, 400
@@ -29,21 +29,23 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.staticfiles.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'cart.context_processors.CartMiddleware',
+    'cart.middleware.CartCountMiddleware',
 ]
 
 ROOT_URLCONF = 'furniture_shop.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.metrics.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -52,6 +54,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'cart.context_processors.cart_context',
+                'favorites.context_processors.favorites_context',
             ],
         },
     },
@@ -66,6 +69,37 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'luxehome',
+    }
+}
+
+# Lifetime in seconds of the version tokens that invalidate the home page
+# and category tree caches. LocMemCache is per process, so a token replaced
+# by one worker only reaches the others once their copy expires; with a
+# shared cache (Redis, Memcached) this can be None.
+CACHE_VERSION_TIMEOUT = 60
+
+# Request metrics: Server-Timing headers and per-URL-name query budgets.
+# With QUERY_BUDGET_STRICT a view over budget raises instead of logging.
+SERVER_TIMING = DEBUG
+QUERY_BUDGETS = {
+    'core:home': 10,
+    'products:catalog': 10,
+    'products:product_detail': 12,
+    'cart:add_to_cart': 10,
+    'cart:cart_detail': 6,
+    'cart:checkout': 14,
+    'cart:order_history': 5,
+    'favorites:list': 6,
+}
+QUERY_BUDGET_STRICT = False
+
+# How long a shared cache (reverse proxy/CDN) may keep anonymous catalog pages
+CATALOG_SHARED_MAX_AGE = 60
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -78,13 +112,37 @@ TIME_ZONE = 'UTC'
 USE_I18N = True
 USE_TZ = True
 
-# Static files
+# Static files: collectstatic writes content-hashed, precompressed copies to
+# STATIC_ROOT, which core.staticfiles.StaticFilesMiddleware serves.
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    'default': {'BACKEND': 'core.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'core.staticfiles.CompressedManifestStaticFilesStorage'},
+}
 
-# Media files (uploads)
+# Media files (uploads), served by core.media.serve_media. MEDIA_OFFLOAD hands
+# the transfer to the front server: 'x-accel-redirect' (nginx, with an
+# internal location at MEDIA_ACCEL_REDIRECT_PREFIX aliased to MEDIA_ROOT),
+# 'x-sendfile' (Apache/lighttpd) or '' to stream from Python.
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_OFFLOAD = ''
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+MEDIA_MAX_AGE = 60 * 60 * 24 * 7
+
+# Cart storage backend: DatabaseCartStorage, MemoryCartStorage or SessionCartStorage
+CART_STORAGE = 'cart.storage.DatabaseCartStorage'
+CART_MEMORY_MAX_CARTS = 10000
+
+# Product search backend (dotted path; empty picks one for the database engine)
+PRODUCT_SEARCH_BACKEND = os.environ.get('PRODUCT_SEARCH_BACKEND', '')
+
+# Admin changelists using core.pagination.EstimatedCountPaginator count
+# exactly up to this many rows and estimate beyond it.
+ADMIN_EXACT_COUNT_LIMIT = 10000
 
 # Auth
 LOGIN_URL = '/accounts/login/'
@@ -94,5 +152,13 @@ LOGOUT_REDIRECT_URL = '/'
 # Telegram Bot settings
 TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN', '')
 TELEGRAM_CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID', '')
+TELEGRAM_API_URL = os.environ.get('TELEGRAM_API_URL', 'https://api.telegram.org')
+TELEGRAM_TIMEOUT = 10
+
+# Order notification outbox (drained by `manage.py send_notifications`)
+NOTIFICATION_BATCH_SIZE = 20
+NOTIFICATION_MAX_ATTEMPTS = 8
+NOTIFICATION_RETRY_BACKOFF = 30  # seconds, doubled after every failed attempt
+NOTIFICATION_RETRY_MAX_DELAY = 3600
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -1,4 +1,7 @@
 from django.contrib import admin
+
+from core.pagination import EstimatedCountPaginator
+
 from .models import Category, Product, ProductImage
 
 
@@ -13,7 +16,9 @@ class CategoryAdmin(admin.ModelAdmin):
     list_display = ('name', 'slug', 'parent')
     prepopulated_fields = {'slug': ('name',)}
     list_filter = ('parent',)
+    list_select_related = ('parent',)
     search_fields = ('name',)
+    autocomplete_fields = ('parent',)
 
 
 @admin.register(Product)
@@ -21,6 +26,11 @@ class ProductAdmin(admin.ModelAdmin):
     list_display = ('name', 'category', 'price', 'old_price', 'stock', 'is_featured', 'created_at')
     list_filter = ('category', 'is_featured', 'material', 'color')
     list_editable = ('price', 'stock', 'is_featured')
+    list_select_related = ('category',)
+    list_per_page = 50
     search_fields = ('name', 'description')
     prepopulated_fields = {'slug': ('name',)}
+    autocomplete_fields = ('category',)
     inlines = [ProductImageInline]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
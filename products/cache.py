@@ -0,0 +1,31 @@
+"""
+Category version token.
+
+Categories have no ``updated_at``, so saving or deleting one replaces a
+token in the cache instead. Anything cached from the category tree embeds
+the token in its cache key. HTTP validators must agree across workers, so
+they use ``CatalogVersion`` from the database instead.
+
+The token lives for ``CACHE_VERSION_TIMEOUT``, which bounds how long a
+worker with its own cache keeps serving the old tree after another worker
+changed it.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CATEGORY_VERSION_KEY = 'categories:version'
+
+
+def get_category_version():
+    version = cache.get(CATEGORY_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(CATEGORY_VERSION_KEY, version, settings.CACHE_VERSION_TIMEOUT):
+            version = cache.get(CATEGORY_VERSION_KEY, version)
+    return version
+
+
+def invalidate_categories():
+    cache.set(CATEGORY_VERSION_KEY, time.time_ns(), settings.CACHE_VERSION_TIMEOUT)
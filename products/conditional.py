@@ -0,0 +1,118 @@
+"""
+Conditional GET and cache headers for catalog pages.
+
+Each page is described by a cheap *signature* (an aggregate over the
+indexed ``Product.updated_at`` plus the ``CatalogVersion`` counters for
+category changes and product deletions) that changes whenever the rendered
+HTML could. It is read from the database only, so every worker computes
+the same ETag and it stays put until the catalog changes.
+The signature, combined with who is looking, becomes a weak ETag; a
+matching ``If-None-Match`` is answered with a 304 before the view runs.
+
+Anonymous pages are marked ``public`` so a reverse proxy can keep them for
+``CATALOG_SHARED_MAX_AGE`` seconds; pages for signed-in users are
+``private`` and revalidated on every request. Both vary on ``Cookie``
+because the session cookie decides who is signed in. The cart badge is
+filled in client-side, so the HTML itself does not depend on the cart.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from favorites.context_processors import request_favorite_ids
+from .models import CatalogVersion, Product, RelatedProduct
+
+
+def catalog_signature(request):
+    """
+    Signature of the whole catalog.
+
+    Facet counts on every catalog page span products outside the filtered
+    set, so the signature covers all products rather than just the page.
+    Stock changes bump ``updated_at``, and deletions bump
+    ``CatalogVersion``; counting the products would scan the whole table.
+    """
+    last_modified = Product.objects.aggregate(last_modified=Max('updated_at'))['last_modified']
+    return list(CatalogVersion.current()), last_modified
+
+
+def product_signature(request, slug):
+    """
+    Signature of a product and its related products.
+
+    Covers the product's category (where the fallback recommendations come
+    from) and its ``RelatedProduct`` rows, whose ``computed_at`` changes
+    whenever the index rebuilds them.
+    """
+    product = Product.objects.filter(slug=slug).values('pk', 'category_id').first()
+    if product is None:
+        return None
+    state = Product.objects.filter(category_id=product['category_id']).aggregate(last_modified=Max('updated_at'))
+    related = RelatedProduct.objects.filter(product_id=product['pk']).aggregate(
+        last_modified=Max('related__updated_at'), built=Max('computed_at')
+    )
+    last_modified = max(filter(None, [state['last_modified'], related['last_modified']]), default=None)
+    parts = [product['pk'], related['built'], *CatalogVersion.current()]
+    return parts, last_modified
+
+
+def _viewer(request):
+    user = request.user
+    if not user.is_authenticated:
+        return ['anonymous']
+    return [user.pk, user.is_staff, sorted(request_favorite_ids(request))]
+
+
+def _make_etag(parts):
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def conditional_page(signature):
+    """
+    Answer GET/HEAD for the decorated view with ETag, Last-Modified and cache headers.
+
+    ``signature(request, *args, **kwargs)`` returns ``(parts, last_modified)``,
+    or ``None`` to let the view handle the request (e.g. to raise 404). Only
+    the ETag is used to decide on a 304: ``Last-Modified`` alone can't see
+    deletions or who is signed in, so it is sent for information only.
+    Responses carrying flash messages are never cached.
+    """
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or len(get_messages(request)):
+                response = view(request, *args, **kwargs)
+                patch_cache_control(response, private=True, no_cache=True)
+                return response
+
+            state = signature(request, *args, **kwargs)
+            if state is None:
+                return view(request, *args, **kwargs)
+            parts, last_modified = state
+            etag = _make_etag([request.path, *parts, last_modified, *_viewer(request)])
+
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code not in (200, 304):
+                return response
+
+            response.headers.setdefault('ETag', etag)
+            if last_modified is not None:
+                response.headers.setdefault('Last-Modified', http_date(last_modified.timestamp()))
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True, no_cache=True)
+            else:
+                patch_cache_control(
+                    response, public=True, max_age=0, s_maxage=settings.CATALOG_SHARED_MAX_AGE,
+                )
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return inner
+    return decorator
@@ -1,6 +1,32 @@
+import hashlib
+
 import django_filters
+from django.core.cache import cache
 from django.db import models
+from django.utils.http import urlencode
 from .models import Product, Category
+from .search import get_search_backend
+from .tree import get_category_tree
+
+
+SORT_OPTIONS = {
+    'price_asc': 'price',
+    'price_desc': '-price',
+    'newest': '-created_at',
+    'name': 'name',
+}
+DEFAULT_SORT = 'newest'
+
+# Half-open ``[low, high)`` ranges; ``None`` leaves that end open.
+PRICE_BUCKETS = [
+    (None, 250),
+    (250, 500),
+    (500, 1000),
+    (1000, 2000),
+    (2000, None),
+]
+FACET_PARAMS = ('q', 'category', 'min_price', 'max_price', 'material', 'color')
+FACET_CACHE_TIMEOUT = 60 * 5
 
 
 class ProductFilter(django_filters.FilterSet):
@@ -17,22 +43,110 @@ class ProductFilter(django_filters.FilterSet):
         fields = []
 
     def search_filter(self, queryset, name, value):
-        return queryset.filter(
-            models.Q(name__icontains=value) |
-            models.Q(description__icontains=value)
-        )
+        return get_search_backend().search(queryset, value)
 
     def category_filter(self, queryset, name, value):
-        return queryset.filter(
-            models.Q(category__slug=value) |
-            models.Q(category__parent__slug=value)
-        )
+        return queryset.filter(self.category_q(value))
+
+    @staticmethod
+    def category_q(slug):
+        """Products in the category ``slug`` or any of its descendants."""
+        return models.Q(category_id__in=get_category_tree().descendant_ids(slug))
+
+    @staticmethod
+    def price_q(min_price=None, max_price=None):
+        condition = models.Q()
+        if min_price is not None:
+            condition &= models.Q(price__gte=min_price)
+        if max_price is not None:
+            condition &= models.Q(price__lte=max_price)
+        return condition
+
+    @staticmethod
+    def price_bucket_q(bucket):
+        """Products in ``bucket``, which is half-open so a boundary price lands in one bucket only."""
+        low, high = bucket
+        condition = models.Q()
+        if low is not None:
+            condition &= models.Q(price__gte=low)
+        if high is not None:
+            condition &= models.Q(price__lt=high)
+        return condition
+
+    def facet_conditions(self):
+        """The active facet filters as ``{facet: Q}``."""
+        data = self.form.cleaned_data if self.is_bound and self.form.is_valid() else {}
+        conditions = {}
+        if data.get('category'):
+            conditions['category'] = self.category_q(data['category'])
+        if data.get('min_price') is not None or data.get('max_price') is not None:
+            conditions['price'] = self.price_q(data.get('min_price'), data.get('max_price'))
+        for facet in ('material', 'color'):
+            if data.get(facet):
+                conditions[facet] = models.Q(**{facet: data[facet]})
+        return conditions
+
+    def facet_cache_key(self, category_slugs):
+        params = sorted((name, self.data.get(name)) for name in FACET_PARAMS if self.data.get(name))
+        digest = hashlib.md5(
+            (urlencode(params) + '|' + ','.join(category_slugs)).encode()
+        ).hexdigest()
+        return f'products:facets:{digest}'
+
+    def facet_counts(self, category_slugs):
+        """
+        Counts for every category, material, color and price bucket.
+
+        Each facet is counted with all active filters applied except its
+        own, so shoppers see how many results each alternative would give.
+        Everything is computed as conditional ``COUNT``s in one aggregate
+        query over the search-filtered base queryset, and cached by the
+        normalized query string.
+        """
+        key = self.facet_cache_key(category_slugs)
+        counts = cache.get(key)
+        if counts is not None:
+            return counts
+
+        queryset = self.queryset
+        if self.is_bound and self.form.is_valid() and self.form.cleaned_data.get('q'):
+            queryset = self.search_filter(queryset, 'q', self.form.cleaned_data['q'])
+
+        conditions = self.facet_conditions()
+
+        def excluding(facet):
+            combined = models.Q()
+            for name, condition in conditions.items():
+                if name != facet:
+                    combined &= condition
+            return combined
+
+        columns = {}
+        for slug in category_slugs:
+            columns[('category', slug)] = excluding('category') & self.category_q(slug)
+        for facet, choices in (('material', Product.MATERIAL_CHOICES), ('color', Product.COLOR_CHOICES)):
+            for value, label in choices:
+                columns[(facet, value)] = excluding(facet) & models.Q(**{facet: value})
+        for bucket in PRICE_BUCKETS:
+            columns[('price', bucket)] = excluding('price') & self.price_bucket_q(bucket)
+
+        aliases = {f'facet_{i}': column for i, column in enumerate(columns)}
+        totals = queryset.order_by().aggregate(**{
+            alias: models.Count('pk', filter=columns[column])
+            for alias, column in aliases.items()
+        })
+
+        counts = {'category': {}, 'material': {}, 'color': {}, 'price': {}}
+        for alias, (facet, value) in aliases.items():
+            counts[facet][value] = totals[alias]
+        cache.set(key, counts, FACET_CACHE_TIMEOUT)
+        return counts
 
     def sort_filter(self, queryset, name, value):
-        sort_options = {
-            'price_asc': 'price',
-            'price_desc': '-price',
-            'newest': '-created_at',
-            'name': 'name',
-        }
-        return queryset.order_by(sort_options.get(value, '-created_at'))
+        return queryset.order_by(self.ordering, '-pk' if self.ordering.startswith('-') else 'pk')
+
+    @property
+    def ordering(self):
+        """Ordering field for the requested sort, including the default."""
+        value = self.data.get('sort') or DEFAULT_SORT
+        return SORT_OPTIONS.get(value, SORT_OPTIONS[DEFAULT_SORT])
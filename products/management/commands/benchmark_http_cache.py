@@ -0,0 +1,66 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from products.models import Category, Product
+
+
+class Command(BaseCommand):
+    help = 'Measure how often catalog pages revalidate with a 304 and the time saved.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Repeat requests to make.')
+        parser.add_argument('--pages', type=int, default=10, help='Distinct pages to cycle through.')
+
+    def _urls(self, pages):
+        catalog = reverse('products:catalog')
+        urls = [catalog, f'{catalog}?sort=price_asc']
+        urls += [f'{catalog}?category={slug}' for slug in Category.objects.values_list('slug', flat=True)[:pages]]
+        urls += [product.get_absolute_url() for product in Product.objects.filter(stock__gt=0)[:pages]]
+        return urls[:pages]
+
+    def _timed(self, client, url, **headers):
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        return response, (time.perf_counter() - start) * 1000
+
+    def handle(self, *args, **options):
+        urls = self._urls(options['pages'])
+        if not urls:
+            self.stderr.write('No products to benchmark; add some first.')
+            return
+
+        client = Client()
+        etags = {}
+        full, revalidated = [], []
+        for url in urls:
+            response, elapsed = self._timed(client, url)
+            etags[url] = response.get('ETag')
+            full.append(elapsed)
+
+        not_modified = 0
+        for i in range(options['requests']):
+            url = urls[i % len(urls)]
+            response, elapsed = self._timed(client, url, if_none_match=etags[url] or '')
+            if response.status_code == 304:
+                not_modified += 1
+                revalidated.append(elapsed)
+            else:
+                etags[url] = response.get('ETag')
+                full.append(elapsed)
+
+        ratio = not_modified / options['requests'] * 100
+        full_ms = statistics.median(full)
+        self.stdout.write(f'Pages:           {len(urls)}')
+        self.stdout.write(f'304 responses:   {not_modified}/{options["requests"]} ({ratio:.1f}%)')
+        self.stdout.write(f'Full render:     {full_ms:.2f} ms median')
+        if revalidated:
+            cached_ms = statistics.median(revalidated)
+            self.stdout.write(f'304 revalidate:  {cached_ms:.2f} ms median')
+            self.stdout.write(self.style.SUCCESS(
+                f'Saved {full_ms - cached_ms:.2f} ms per revalidated request '
+                f'({(1 - cached_ms / full_ms) * 100:.0f}%).'
+            ))
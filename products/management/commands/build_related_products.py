@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.recommendations import RELATED_PRODUCTS_LIMIT, rebuild_related_products
+
+
+class Command(BaseCommand):
+    help = 'Build the related-products index, incrementally unless --full is given.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every product.')
+        parser.add_argument('--limit', type=int, default=RELATED_PRODUCTS_LIMIT, help='Recommendations kept per product.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        products, rows = rebuild_related_products(
+            full=options['full'], batch_size=options['batch_size'], limit=options['limit'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed {products} products ({rows} recommendations) in {time.perf_counter() - start:.1f}s.'
+        ))
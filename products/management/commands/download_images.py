@@ -0,0 +1,105 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from products.models import Category, Product, ProductImage
+from products.sample_data import BANNER_IMAGE_URLS, CATEGORY_IMAGE_URLS, PRODUCT_IMAGE_URLS
+from products.seeding import seed_images
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+MIN_IMAGE_BYTES = 1000
+
+_local = threading.local()
+
+
+def _session():
+    if not hasattr(_local, 'session'):
+        _local.session = requests.Session()
+        _local.session.headers.update(HEADERS)
+    return _local.session
+
+
+def download(url, retries=3, timeout=30, backoff=1.0):
+    """Fetch ``url``, retrying with exponential backoff. Returns the body or ``None``."""
+    for attempt in range(retries):
+        try:
+            response = _session().get(url, timeout=timeout, allow_redirects=True)
+            if response.status_code == 200 and len(response.content) > MIN_IMAGE_BYTES:
+                return response.content
+        except requests.RequestException:
+            pass
+        if attempt + 1 < retries:
+            time.sleep(backoff * 2 ** attempt)
+    return None
+
+
+class Command(BaseCommand):
+    help = 'Download the real sample photos for products, categories and banners.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8, help='Simultaneous downloads.')
+        parser.add_argument('--retries', type=int, default=3)
+        parser.add_argument('--timeout', type=int, default=30, help='Seconds per request.')
+
+    def handle(self, *args, **options):
+        # (kind, key, order, url, filename)
+        jobs = []
+        products = Product.objects.in_bulk(list(PRODUCT_IMAGE_URLS), field_name='slug')
+        for slug, urls in PRODUCT_IMAGE_URLS.items():
+            if slug in products:
+                jobs += [('product', slug, i, url, f'products/{slug}_real_{i + 1}.jpg') for i, url in enumerate(urls)]
+        for slug, url in CATEGORY_IMAGE_URLS.items():
+            jobs.append(('category', slug, 0, url, f'categories/category_real_{slug}.jpg'))
+        for i, url in enumerate(BANNER_IMAGE_URLS):
+            jobs.append(('banner', i, 0, url, f'banners/banner_real_{i + 1}.jpg'))
+
+        def fetch(job):
+            kind, key, order, url, filename = job
+            data = download(url, retries=options['retries'], timeout=options['timeout'])
+            if data is None:
+                return job, None
+            return job, default_storage.save(filename, ContentFile(data))
+
+        results = {'product': {}, 'category': {}, 'banner': {}}
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            for future in as_completed([pool.submit(fetch, job) for job in jobs]):
+                (kind, key, order, url, filename), name = future.result()
+                if name is None:
+                    failed += 1
+                    self.stderr.write(f'Failed: {url}')
+                    continue
+                results[kind].setdefault(key, []).append((order, name))
+
+        self.save_product_images(products, results['product'])
+        self.save_images(Category.objects.in_bulk(list(results['category']), field_name='slug'), results['category'])
+        self.save_banner_images(results['banner'])
+        self.stdout.write(self.style.SUCCESS(f'Downloaded {len(jobs) - failed} images ({failed} failed).'))
+
+    def save_product_images(self, products, downloaded):
+        """Replace the placeholder images of every product that got at least one photo."""
+        ProductImage.objects.filter(product__slug__in=list(downloaded)).delete()
+        images = []
+        for slug, names in downloaded.items():
+            for position, (order, name) in enumerate(sorted(names)):
+                images.append(ProductImage(product=products[slug], image=name, is_primary=position == 0, order=position))
+        seed_images(images)
+
+    def save_images(self, objects, downloaded):
+        for key, [(order, name)] in downloaded.items():
+            obj = objects.get(key)
+            if obj is not None:
+                obj.image = name
+                obj.save(update_fields=['image'])
+
+    def save_banner_images(self, downloaded):
+        from core.models import Banner
+        banners = dict(enumerate(Banner.objects.order_by('order', 'pk')))
+        self.save_images(banners, downloaded)
@@ -0,0 +1,92 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from products.imagegen import (
+    CATEGORY_ICONS, CATEGORY_PALETTES, create_banner_image, create_product_image, get_style_for_product,
+)
+from products.models import Category, Product, ProductImage
+from products.seeding import seed_images
+
+
+def _init_worker():
+    django.setup()
+
+
+def _render_product(args):
+    """Draw and store the placeholder images for one product; returns their storage names."""
+    pk, name, slug, category_slug, count, size = args
+    style = get_style_for_product(name, category_slug)
+    names = []
+    for variant in range(count):
+        data = create_product_image(name, width=size, height=size, palette=style['palette'],
+                                    icon=style['icon'], variant=variant)
+        names.append(default_storage.save(f'products/{slug}_{variant + 1}.jpg', ContentFile(data)))
+    return pk, names
+
+
+class Command(BaseCommand):
+    help = 'Draw placeholder images for products, categories and banners that have none.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count).')
+        parser.add_argument('--batch-size', type=int, default=500, help='Products per database batch.')
+        parser.add_argument('--min-images', type=int, default=3)
+        parser.add_argument('--max-images', type=int, default=5)
+        parser.add_argument('--size', type=int, default=800, help='Product image width and height in pixels.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.generate_product_images(options)
+        self.generate_category_images()
+        self.generate_banner_images()
+        self.stdout.write(self.style.SUCCESS(
+            'Done. Run "python manage.py generate_renditions" to build the responsive sizes.'
+        ))
+
+    def generate_product_images(self, options):
+        rand = random.Random(options['seed'])
+        jobs = [
+            (pk, name, slug, category_slug, rand.randint(options['min_images'], options['max_images']), options['size'])
+            for pk, name, slug, category_slug in Product.objects.filter(images__isnull=True)
+            .order_by('pk').values_list('pk', 'name', 'slug', 'category__slug')
+        ]
+        if not jobs:
+            self.stdout.write('All products already have images.')
+            return
+
+        done = 0
+        pending = []
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+            for pk, names in pool.map(_render_product, jobs, chunksize=8):
+                pending.extend(
+                    ProductImage(product_id=pk, image=name, is_primary=order == 0, order=order)
+                    for order, name in enumerate(names)
+                )
+                done += 1
+                if done % options['batch_size'] == 0 or done == len(jobs):
+                    seed_images(pending)
+                    pending = []
+                    self.stdout.write(f'{done}/{len(jobs)} products')
+
+    def generate_category_images(self):
+        for category in Category.objects.filter(Q(image='') | Q(image__isnull=True), parent__isnull=True):
+            data = create_product_image(
+                category.name, width=600, height=400,
+                palette=CATEGORY_PALETTES.get(category.slug), icon=CATEGORY_ICONS.get(category.slug, 'sofa'),
+            )
+            category.image.save(f'category_{category.slug}.jpg', ContentFile(data), save=True)
+            self.stdout.write(f'Created category image: {category.name}')
+
+    def generate_banner_images(self):
+        from core.models import Banner
+        for index, banner in enumerate(Banner.objects.order_by('order', 'pk')):
+            if banner.image:
+                continue
+            banner.image.save(f'banner_{index + 1}.jpg', ContentFile(create_banner_image(banner.title, color_scheme=index)), save=True)
+            self.stdout.write(f'Created banner image: {banner.title}')
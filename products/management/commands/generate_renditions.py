@@ -0,0 +1,54 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+
+from products.models import ProductImage
+
+
+def _init_worker():
+    django.setup()
+
+
+def _render(args):
+    from django.core.files.storage import default_storage
+    from products.renditions import generate_renditions
+    pk, name = args
+    return pk, generate_renditions(name, default_storage)
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG renditions for product images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Regenerate images that already have renditions.')
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count).')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        queryset = ProductImage.objects.order_by('pk')
+        if not options['all']:
+            queryset = queryset.filter(rendition_widths=[])
+        jobs = list(queryset.values_list('pk', 'image'))
+        if not jobs:
+            self.stdout.write('Nothing to do.')
+            return
+
+        done = failed = 0
+        pending = []
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+            for pk, widths in pool.map(_render, jobs, chunksize=8):
+                if not widths:
+                    failed += 1
+                    continue
+                pending.append(ProductImage(pk=pk, rendition_widths=widths))
+                if len(pending) >= options['batch_size']:
+                    ProductImage.objects.bulk_update(pending, ['rendition_widths'])
+                    done += len(pending)
+                    pending = []
+                    self.stdout.write(f'{done}/{len(jobs)} images')
+        if pending:
+            ProductImage.objects.bulk_update(pending, ['rendition_widths'])
+            done += len(pending)
+
+        self.stdout.write(self.style.SUCCESS(f'Generated renditions for {done} images ({failed} unreadable).'))
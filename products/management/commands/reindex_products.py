@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from products.models import Product
+from products.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the product full-text search index.'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        count = backend.reindex(Product.objects.all())
+        self.stdout.write(self.style.SUCCESS(
+            f'Reindexed {count} products with {type(backend).__name__}.'
+        ))
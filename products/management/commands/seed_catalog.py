@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from products.models import Category, Product
+from products.sample_data import CATEGORIES, PRODUCTS, SUBCATEGORIES
+from products.search import get_search_backend
+from products.seeding import seed_categories, seed_products, synthetic_products
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load the sample catalog, optionally padded with synthetic products.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=0, help='Synthetic products to add on top of the sample catalog.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for synthetic products.')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        categories = seed_categories(CATEGORIES, SUBCATEGORIES)
+
+        sample = [
+            Product(**dict(row, category=categories[row['category']]))
+            for row in PRODUCTS
+        ]
+        created = seed_products(sample, options['batch_size'])
+
+        if options['products']:
+            offset = Product.objects.filter(slug__startswith='synthetic-').count()
+            created += seed_products(
+                synthetic_products(
+                    list(Category.objects.all()), options['products'], start=offset, seed=options['seed'] + offset,
+                ),
+                options['batch_size'],
+            )
+
+        indexed = get_search_backend().reindex(Product.objects.all())
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} products ({len(categories)} categories, {indexed} indexed) '
+            f'in {time.perf_counter() - start:.1f}s.'
+        ))
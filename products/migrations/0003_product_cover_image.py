@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_cover_image(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductImage = apps.get_model('products', 'ProductImage')
+    cover = ProductImage.objects.filter(
+        product=models.OuterRef('pk')
+    ).order_by('-is_primary', 'order', 'pk').values('pk')[:1]
+    Product.objects.update(cover_image=models.Subquery(cover))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='cover_image',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Primary image, maintained automatically from product images', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='products.productimage'),
+        ),
+        migrations.RunPython(backfill_cover_image, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_cover_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='rendition_widths',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
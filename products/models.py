@@ -1,5 +1,19 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models.functions import Concat, Substr
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.urls import reverse
+from django.utils import timezone
+
+
+def pick_primary_image(images):
+    """First image flagged primary, otherwise the first image."""
+    images = list(images)
+    for image in images:
+        if image.is_primary:
+            return image
+    return images[0] if images else None
 
 
 class Category(models.Model):
@@ -10,6 +24,11 @@ class Category(models.Model):
         'self', on_delete=models.CASCADE,
         blank=True, null=True, related_name='children'
     )
+    path = models.CharField(
+        max_length=255, blank=True, editable=False, db_index=True,
+        help_text='Materialized path of ancestor ids, e.g. "3/12/"'
+    )
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name_plural = 'Categories'
@@ -18,6 +37,34 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    def clean(self):
+        if self.pk and self.parent_id and Category.objects.filter(
+            pk=self.parent_id, path__startswith=self.path
+        ).exists():
+            raise ValidationError({'parent': 'A category cannot be moved under itself.'})
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.update_path()
+
+    def update_path(self):
+        """Recompute ``path`` and ``depth``, moving the whole subtree if they changed."""
+        old_path = Category.objects.filter(pk=self.pk).values_list('path', flat=True).get()
+        parent_path = ''
+        if self.parent_id:
+            parent_path = Category.objects.filter(pk=self.parent_id).values_list('path', flat=True).get()
+        path = f'{parent_path}{self.pk}/'
+        self.path, self.depth = path, path.count('/') - 1
+        if path == old_path:
+            return
+        Category.objects.filter(pk=self.pk).update(path=path, depth=self.depth)
+        if old_path:
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(models.Value(path), Substr('path', len(old_path) + 1)),
+                depth=models.F('depth') + self.depth - (old_path.count('/') - 1),
+            )
+
     def get_absolute_url(self):
         return f"{reverse('products:catalog')}?category={self.slug}"
 
@@ -65,11 +112,31 @@ class Product(models.Model):
     weight = models.DecimalField(max_digits=7, decimal_places=2, blank=True, null=True, help_text='Weight in kg')
     stock = models.PositiveIntegerField(default=0)
     is_featured = models.BooleanField(default=False)
+    cover_image = models.ForeignKey(
+        'ProductImage', on_delete=models.SET_NULL,
+        blank=True, null=True, editable=False, related_name='+',
+        help_text='Primary image, maintained automatically from product images'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Catalog listing, one index per sort order (keyset pagination
+            # breaks ties on id). Partial: only in-stock products are listed.
+            models.Index(fields=['created_at', 'id'], condition=models.Q(stock__gt=0), name='product_instock_newest_idx'),
+            models.Index(fields=['price', 'id'], condition=models.Q(stock__gt=0), name='product_instock_price_idx'),
+            models.Index(fields=['name', 'id'], condition=models.Q(stock__gt=0), name='product_instock_name_idx'),
+            # Facet filters, newest first within each value.
+            models.Index(fields=['category', 'created_at'], condition=models.Q(stock__gt=0), name='product_instock_category_idx'),
+            models.Index(fields=['material', 'created_at'], condition=models.Q(stock__gt=0), name='product_instock_material_idx'),
+            models.Index(fields=['color', 'created_at'], condition=models.Q(stock__gt=0), name='product_instock_color_idx'),
+            # Home page featured products.
+            models.Index(fields=['created_at'], condition=models.Q(stock__gt=0, is_featured=True), name='product_featured_idx'),
+            # Catalog ETags (Max('updated_at')).
+            models.Index(fields=['updated_at'], name='product_updated_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -79,10 +146,26 @@ class Product(models.Model):
 
     @property
     def primary_image(self):
-        img = self.images.filter(is_primary=True).first()
-        if not img:
-            img = self.images.first()
-        return img
+        """
+        The image shown on product cards.
+
+        Uses ``select_related('cover_image')`` or ``prefetch_related('images')``
+        when available, so listing pages don't pay a query per product.
+        """
+        if Product.cover_image.is_cached(self):
+            return self.cover_image
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('images')
+        if prefetched is not None:
+            return pick_primary_image(prefetched)
+        if self.cover_image_id is None:
+            return None
+        return self.cover_image
+
+    def refresh_cover_image(self):
+        """Recompute ``cover_image`` from the stored images."""
+        cover = self.images.order_by('-is_primary', 'order', 'pk').first()
+        Product.objects.filter(pk=self.pk).update(cover_image=cover, updated_at=timezone.now())
+        self.cover_image = cover
 
     @property
     def discount_percent(self):
@@ -102,9 +185,137 @@ class ProductImage(models.Model):
     image = models.ImageField(upload_to='products/')
     is_primary = models.BooleanField(default=False)
     order = models.PositiveIntegerField(default=0)
+    rendition_widths = models.JSONField(default=list, blank=True, editable=False)
 
     class Meta:
         ordering = ['order']
 
     def __str__(self):
         return f"Image for {self.product.name}"
+
+    def srcset(self, ext):
+        """``srcset`` value for the stored renditions in ``ext`` format."""
+        from .renditions import rendition_name
+        return ', '.join(
+            f'{self.image.storage.url(rendition_name(self.image.name, width, ext))} {width}w'
+            for width in self.rendition_widths
+        )
+
+
+class RelatedProduct(models.Model):
+    """
+    One precomputed recommendation: ``related`` is the ``rank``-th best
+    match for ``product``. Built by ``manage.py build_related_products``.
+    """
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name='recommendations'
+    )
+    related = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name='recommended_for'
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ['product', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'rank'], name='related_product_rank_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.related} for {self.product}"
+
+
+class CatalogVersion(models.Model):
+    """
+    Counters for catalog changes that ``Product.updated_at`` can't show.
+
+    A single row, bumped by the receivers below when a category is saved
+    or deleted and when a product is deleted. Catalog ETags embed it, so
+    every worker derives the same validator from the database and it only
+    changes when the catalog does.
+    """
+    categories = models.PositiveBigIntegerField(default=0)
+    deletions = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def current(cls):
+        """``(categories, deletions)``."""
+        return cls.objects.filter(pk=1).values_list('categories', 'deletions').first() or (0, 0)
+
+    @classmethod
+    def bump(cls, field):
+        if not cls.objects.filter(pk=1).update(**{field: models.F(field) + 1}):
+            cls.objects.get_or_create(pk=1, defaults={field: 1})
+
+
+SEARCH_FIELDS = {'name', 'description'}
+
+
+@receiver(post_save, sender=Product)
+def index_product_search(sender, instance, update_fields=None, **kwargs):
+    from .search import get_search_backend
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return
+    get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=Product)
+def remove_product_search(sender, instance, **kwargs):
+    from .search import get_search_backend
+    get_search_backend().remove(instance.pk)
+
+
+@receiver(post_save, sender=ProductImage)
+def reset_renditions(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Forget the renditions of a replaced image.
+
+    ``manage.py generate_renditions`` encodes renditions for images without
+    widths, outside the upload request; the old files are left for ``gc_media``.
+    """
+    from .renditions import rendition_name
+    if raw or not instance.rendition_widths or (update_fields is not None and 'image' not in update_fields):
+        return
+    if instance.image and instance.image.storage.exists(
+        rendition_name(instance.image.name, instance.rendition_widths[0], 'webp')
+    ):
+        return
+    instance.rendition_widths = []
+    ProductImage.objects.filter(pk=instance.pk).update(rendition_widths=[])
+
+
+@receiver(post_delete, sender=ProductImage)
+def remove_renditions(sender, instance, **kwargs):
+    """Delete the renditions once the last image using the file is gone and the delete has committed."""
+    from .renditions import delete_renditions
+    name, widths, storage = instance.image.name, instance.rendition_widths, instance.image.storage
+    if not name or not widths:
+        return
+
+    def delete():
+        if not ProductImage.objects.filter(image=name).exists():
+            delete_renditions(name, widths, storage)
+    transaction.on_commit(delete)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def update_cover_image(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    Product(pk=instance.product_id).refresh_cover_image()
+
+
+@receiver(post_delete, sender=Product)
+def bump_deletions_version(sender, instance, **kwargs):
+    CatalogVersion.bump('deletions')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_version(sender, instance, **kwargs):
+    from .cache import invalidate_categories
+    invalidate_categories()
+    CatalogVersion.bump('categories')
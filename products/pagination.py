@@ -0,0 +1,133 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    """Raised when a cursor token cannot be decoded."""
+
+
+def approximate_count(queryset, cap=1000):
+    """
+    Count rows up to ``cap``.
+
+    Returns ``(count, exact)``. The query is ``COUNT(*)`` over a
+    ``LIMIT cap + 1`` subquery, so it never reads more than ``cap + 1``
+    rows regardless of how large the table is.
+    """
+    count = queryset.order_by()[:cap + 1].count()
+    if count > cap:
+        return cap, False
+    return count, True
+
+
+class KeysetPage:
+    """A single page of results produced by :class:`KeysetPaginator`."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Cursor (keyset) pagination over a single ordering field.
+
+    Rows are ordered by ``ordering`` and then by primary key in the same
+    direction, so the sort is total even when many rows share a value.
+    Instead of ``OFFSET`` each page seeks past the last row of the previous
+    page with ``(field, pk) > (value, last_pk)``, so every page costs the
+    same no matter how deep the user goes.
+    """
+
+    def __init__(self, queryset, ordering, per_page=24):
+        self.descending = ordering.startswith('-')
+        self.field_name = ordering.lstrip('-')
+        self.field = queryset.model._meta.get_field(self.field_name)
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def _order_by(self, reverse=False):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return (f'{prefix}{self.field_name}', f'{prefix}pk')
+
+    def _seek(self, value, pk, reverse=False):
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        return (
+            Q(**{f'{self.field_name}__{lookup}': value}) |
+            Q(**{self.field_name: value, f'pk__{lookup}': pk})
+        )
+
+    def encode_cursor(self, obj, reverse=False):
+        value = self.field.value_to_string(obj)
+        payload = json.dumps([value, obj.pk, int(reverse)], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            value, pk, reverse = json.loads(base64.urlsafe_b64decode(padded))
+            value = self.field.to_python(value)
+            if value is None:
+                raise ValueError('cursor has no value to seek from')
+            return value, int(pk), bool(reverse)
+        except (ValueError, TypeError, ValidationError) as e:
+            raise InvalidCursor(str(e)) from e
+
+    def get_page(self, cursor=None):
+        """
+        Return the page after ``cursor`` (or the first page).
+
+        An invalid cursor falls back to the first page rather than raising,
+        since cursors come straight from the query string.
+        """
+        reverse = False
+        queryset = self.queryset
+        if cursor:
+            try:
+                value, pk, reverse = self.decode_cursor(cursor)
+            except InvalidCursor:
+                cursor = None
+            else:
+                queryset = queryset.filter(self._seek(value, pk, reverse))
+
+        rows = list(queryset.order_by(*self._order_by(reverse))[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage(rows)
+
+        if reverse:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1]) if has_next else None,
+            previous_cursor=self.encode_cursor(rows[0], reverse=True) if has_previous else None,
+        )
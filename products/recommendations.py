@@ -0,0 +1,180 @@
+"""
+Related-products index.
+
+Recommendations are built offline by ``manage.py build_related_products``
+and stored as ranked ``RelatedProduct`` rows, so the detail page reads them
+with a single indexed query.
+
+A candidate is scored on:
+
+* how many orders it was bought in together with the product;
+* sharing the product's category, or at least its top-level category;
+* sharing material and color;
+* price proximity, on a log scale so $100 vs $150 counts like $1000 vs $1500.
+
+Candidates are the nearest products by price within the same category and
+the same top-level category, plus everything the product was bought with.
+Out-of-stock products are never recommended.
+
+Incremental builds only recompute products changed since the last build
+(new orders bump ``updated_at`` through the stock update, and add
+co-purchases) together with their price neighbours, whose lists may now
+want to include them.
+"""
+import bisect
+import math
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Category, Product, RelatedProduct
+from .seeding import batched
+
+RELATED_PRODUCTS_LIMIT = 8
+PRICE_NEIGHBOURS = 20
+WEIGHTS = {
+    'co_purchase': 1.5,
+    'category': 1.0,
+    'root_category': 0.5,
+    'material': 0.5,
+    'color': 0.5,
+    'price': 1.0,
+}
+
+Item = namedtuple('Item', 'pk category root material color price in_stock')
+
+
+class CatalogSnapshot:
+    """The product columns scoring needs, with in-stock products sorted by price per category."""
+
+    def __init__(self):
+        roots = {
+            pk: int(path.split('/', 1)[0]) if path else pk
+            for pk, path in Category.objects.values_list('pk', 'path')
+        }
+        self.items = {}
+        groups = defaultdict(list)
+        rows = Product.objects.values_list('pk', 'category_id', 'material', 'color', 'price', 'stock')
+        for pk, category_id, material, color, price, stock in rows.iterator(chunk_size=10000):
+            item = Item(pk, category_id, roots.get(category_id, category_id), material, color, float(price), stock > 0)
+            self.items[pk] = item
+            if item.in_stock:
+                groups[('category', item.category)].append((item.price, pk))
+                groups[('root', item.root)].append((item.price, pk))
+        self.groups = {key: sorted(members) for key, members in groups.items()}
+        self.prices = {key: [price for price, pk in members] for key, members in self.groups.items()}
+
+    def neighbours(self, item):
+        """In-stock products nearest in price in ``item``'s category and top-level category."""
+        for key in (('category', item.category), ('root', item.root)):
+            members = self.groups.get(key, [])
+            index = bisect.bisect_left(self.prices.get(key, []), item.price)
+            for price, pk in members[max(0, index - PRICE_NEIGHBOURS):index + PRICE_NEIGHBOURS]:
+                if pk != item.pk:
+                    yield pk
+
+    def score(self, item, other, bought_together=0):
+        score = WEIGHTS['co_purchase'] * math.log1p(bought_together)
+        if other.category == item.category:
+            score += WEIGHTS['category']
+        elif other.root == item.root:
+            score += WEIGHTS['root_category']
+        if item.material and other.material == item.material:
+            score += WEIGHTS['material']
+        if item.color and other.color == item.color:
+            score += WEIGHTS['color']
+        ratio = abs(math.log(max(other.price, 0.01) / max(item.price, 0.01)))
+        return score + WEIGHTS['price'] * max(0.0, 1 - ratio)
+
+
+def co_purchase_counts(product_ids):
+    """``{product_id: {other_id: orders}}`` of in-stock products bought together with ``product_ids``."""
+    from cart.models import OrderItem
+    rows = (
+        OrderItem.objects.filter(product_id__in=product_ids, order__items__product__stock__gt=0)
+        .values_list('product_id', 'order__items__product_id')
+        .annotate(orders=Count('order_id', distinct=True))
+        .order_by()
+    )
+    counts = defaultdict(dict)
+    for product_id, other_id, orders in rows:
+        if product_id != other_id:
+            counts[product_id][other_id] = orders
+    return counts
+
+
+def changed_since(since):
+    """Ids of products updated, or ordered, after ``since``."""
+    from cart.models import OrderItem
+    ids = set(Product.objects.filter(updated_at__gt=since).values_list('pk', flat=True))
+    ids.update(
+        OrderItem.objects.filter(order__created_at__gt=since, product__isnull=False)
+        .values_list('product_id', flat=True)
+    )
+    return ids
+
+
+def build_related_products(product_ids, snapshot, computed_at, limit=RELATED_PRODUCTS_LIMIT):
+    """Replace the recommendations of ``product_ids``; returns the number of rows written."""
+    bought_together = co_purchase_counts(product_ids)
+    rows = []
+    for pk in product_ids:
+        item = snapshot.items.get(pk)
+        if item is None:
+            continue
+        partners = bought_together.get(pk, {})
+        candidates = set(snapshot.neighbours(item))
+        candidates.update(other for other in partners if other in snapshot.items)
+        scored = sorted(
+            ((snapshot.score(item, snapshot.items[other], partners.get(other, 0)), other) for other in candidates),
+            key=lambda pair: (-pair[0], pair[1]),
+        )
+        rows.extend(
+            RelatedProduct(product_id=pk, related_id=other, rank=rank, score=round(score, 4), computed_at=computed_at)
+            for rank, (score, other) in enumerate(scored[:limit])
+        )
+    with transaction.atomic():
+        RelatedProduct.objects.filter(product_id__in=product_ids).delete()
+        RelatedProduct.objects.bulk_create(rows)
+    return len(rows)
+
+
+def rebuild_related_products(full=False, batch_size=2000, limit=RELATED_PRODUCTS_LIMIT):
+    """
+    Bring the index up to date; returns ``(products recomputed, rows written)``.
+
+    Without ``full``, only what changed since the last build is recomputed.
+    The build time is taken before reading the catalog, so anything changed
+    while the build runs is picked up by the next one.
+    """
+    computed_at = timezone.now()
+    since = None if full else RelatedProduct.objects.aggregate(last=Max('computed_at'))['last']
+    snapshot = CatalogSnapshot()
+    if since is None:
+        product_ids = set(snapshot.items)
+    else:
+        product_ids = changed_since(since)
+        for pk in list(product_ids):
+            if pk in snapshot.items:
+                product_ids.update(snapshot.neighbours(snapshot.items[pk]))
+
+    written = 0
+    for batch in batched(sorted(product_ids), batch_size):
+        written += build_related_products(batch, snapshot, computed_at, limit)
+    return len(product_ids), written
+
+
+def get_related_products(product, count=4):
+    """
+    Up to ``count`` in-stock recommendations for ``product``, best first.
+
+    Products not in the index yet fall back to the newest in-stock products
+    of the same category.
+    """
+    cards = Product.objects.filter(stock__gt=0).select_related('category', 'cover_image').prefetch_related('images')
+    related = list(cards.filter(recommended_for__product=product).order_by('recommended_for__rank')[:count])
+    if related:
+        return related
+    return list(cards.filter(category=product.category_id).exclude(pk=product.pk)[:count])
@@ -0,0 +1,71 @@
+"""
+Resized WebP/JPEG renditions of product images.
+
+Renditions are written next to the originals under ``renditions/`` at the
+widths in ``RENDITION_WIDTHS`` (never upscaled), and the widths actually
+produced are recorded on ``ProductImage.rendition_widths`` so templates can
+build ``srcset`` attributes without touching the filesystem.
+
+Encoding is too slow for the upload request, so ``manage.py
+generate_renditions`` builds them for every image whose widths are empty;
+until then templates show the original.
+"""
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+RENDITION_WIDTHS = (320, 640, 960, 1280)
+RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 75, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 80, 'optimize': True, 'progressive': True}),
+}
+
+
+def rendition_name(name, width, ext):
+    stem, _ = os.path.splitext(name)
+    return f'renditions/{stem}_{width}w.{ext}'
+
+
+def generate_renditions(name, storage=None):
+    """
+    Write every rendition for the stored image ``name``.
+
+    Returns the list of widths produced, or an empty list if the original
+    can't be read.
+    """
+    storage = storage or default_storage
+    try:
+        with storage.open(name) as f:
+            original = Image.open(f)
+            original = ImageOps.exif_transpose(original)
+            original.load()
+    except (OSError, ValueError):
+        return []
+
+    if original.mode not in ('RGB', 'L'):
+        original = original.convert('RGB')
+
+    widths = sorted({min(width, original.width) for width in RENDITION_WIDTHS})
+    for width in widths:
+        height = max(1, round(original.height * width / original.width))
+        resized = original if width == original.width else original.resize((width, height), Image.LANCZOS)
+        for ext, (fmt, options) in RENDITION_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, fmt, **options)
+            path = rendition_name(name, width, ext)
+            if storage.exists(path):
+                storage.delete(path)
+            storage.save(path, ContentFile(buffer.getvalue()))
+    return widths
+
+
+
+def delete_renditions(name, widths, storage=None):
+    """Delete the renditions of ``name`` at ``widths``."""
+    storage = storage or default_storage
+    for width in widths:
+        for ext in RENDITION_FORMATS:
+            storage.delete(rendition_name(name, width, ext))
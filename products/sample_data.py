@@ -0,0 +1,298 @@
+"""
+Sample catalog for local development.
+
+Used by the ``seed_catalog`` and ``download_images`` management commands.
+"""
+
+CATEGORIES = [
+    ('Living Room', 'living-room'),
+    ('Bedroom', 'bedroom'),
+    ('Dining', 'dining'),
+    ('Office', 'office'),
+    ('Outdoor', 'outdoor'),
+    ('Storage', 'storage'),
+]
+
+SUBCATEGORIES = [
+    ('Sofas', 'sofas', 'living-room'),
+    ('Coffee Tables', 'coffee-tables', 'living-room'),
+    ('TV Stands', 'tv-stands', 'living-room'),
+    ('Beds', 'beds', 'bedroom'),
+    ('Nightstands', 'nightstands', 'bedroom'),
+    ('Wardrobes', 'wardrobes', 'bedroom'),
+    ('Dining Tables', 'dining-tables', 'dining'),
+    ('Dining Chairs', 'dining-chairs', 'dining'),
+    ('Desks', 'desks', 'office'),
+    ('Office Chairs', 'office-chairs', 'office'),
+    ('Bookshelves', 'bookshelves', 'storage'),
+]
+
+PRODUCTS = [
+    {
+        'name': 'Modern Velvet Sofa',
+        'slug': 'modern-velvet-sofa',
+        'category': 'sofas',
+        'description': 'Luxurious 3-seater velvet sofa with solid wood legs. Perfect for modern living rooms with its clean lines and plush comfort. Features high-density foam cushions and a durable hardwood frame.',
+        'price': 1299.99,
+        'old_price': 1599.99,
+        'material': 'fabric',
+        'color': 'grey',
+        'dimensions': '220x90x85 cm',
+        'weight': 45,
+        'stock': 15,
+        'is_featured': True,
+    },
+    {
+        'name': 'Scandinavian Oak Coffee Table',
+        'slug': 'scandinavian-oak-coffee-table',
+        'category': 'coffee-tables',
+        'description': 'Minimalist coffee table crafted from solid oak wood. Features tapered legs and a smooth natural finish. Includes a lower shelf for additional storage.',
+        'price': 449.99,
+        'old_price': None,
+        'material': 'wood',
+        'color': 'natural',
+        'dimensions': '110x60x45 cm',
+        'weight': 18,
+        'stock': 25,
+        'is_featured': True,
+    },
+    {
+        'name': 'Leather Executive Office Chair',
+        'slug': 'leather-executive-office-chair',
+        'category': 'office-chairs',
+        'description': 'Premium leather office chair with ergonomic design. Features adjustable height, tilt mechanism, and padded armrests. Perfect for long working hours.',
+        'price': 699.99,
+        'old_price': 899.99,
+        'material': 'leather',
+        'color': 'black',
+        'dimensions': '65x65x120 cm',
+        'weight': 22,
+        'stock': 30,
+        'is_featured': True,
+    },
+    {
+        'name': 'Walnut King Size Bed Frame',
+        'slug': 'walnut-king-size-bed-frame',
+        'category': 'beds',
+        'description': 'Elegant king-size bed frame made from premium walnut wood. Slatted base for optimal mattress support. Headboard features a beautiful grain pattern.',
+        'price': 1899.99,
+        'old_price': 2299.99,
+        'material': 'wood',
+        'color': 'brown',
+        'dimensions': '200x180x110 cm',
+        'weight': 65,
+        'stock': 8,
+        'is_featured': True,
+    },
+    {
+        'name': 'Marble Top Dining Table',
+        'slug': 'marble-top-dining-table',
+        'category': 'dining-tables',
+        'description': 'Stunning dining table with genuine marble top and black metal legs. Seats 6-8 people comfortably. The natural marble pattern makes each table unique.',
+        'price': 2499.99,
+        'old_price': None,
+        'material': 'marble',
+        'color': 'white',
+        'dimensions': '180x90x75 cm',
+        'weight': 80,
+        'stock': 5,
+        'is_featured': True,
+    },
+    {
+        'name': 'Rattan Garden Lounge Set',
+        'slug': 'rattan-garden-lounge-set',
+        'category': 'outdoor',
+        'description': 'Complete outdoor lounge set including 2-seater sofa, 2 armchairs, and coffee table. Weather-resistant rattan weave with waterproof cushions.',
+        'price': 1599.99,
+        'old_price': 1999.99,
+        'material': 'rattan',
+        'color': 'brown',
+        'dimensions': '200x150x80 cm',
+        'weight': 40,
+        'stock': 10,
+        'is_featured': True,
+    },
+    {
+        'name': 'Industrial Metal Bookshelf',
+        'slug': 'industrial-metal-bookshelf',
+        'category': 'bookshelves',
+        'description': '5-tier industrial bookshelf with metal frame and solid wood shelves. Perfect for displaying books, plants, and decorative items.',
+        'price': 349.99,
+        'old_price': 449.99,
+        'material': 'metal',
+        'color': 'black',
+        'dimensions': '80x35x180 cm',
+        'weight': 25,
+        'stock': 20,
+        'is_featured': False,
+    },
+    {
+        'name': 'Velvet Dining Chair Set of 4',
+        'slug': 'velvet-dining-chair-set',
+        'category': 'dining-chairs',
+        'description': 'Set of 4 elegant dining chairs with velvet upholstery and gold-finished metal legs. Comfortable padding and a modern design that elevates any dining space.',
+        'price': 599.99,
+        'old_price': 799.99,
+        'material': 'fabric',
+        'color': 'green',
+        'dimensions': '45x55x85 cm each',
+        'weight': 6,
+        'stock': 12,
+        'is_featured': True,
+    },
+    {
+        'name': 'Minimalist TV Stand',
+        'slug': 'minimalist-tv-stand',
+        'category': 'tv-stands',
+        'description': 'Clean-lined TV stand with cable management and soft-close drawers. Fits TVs up to 65 inches. Made from engineered wood with a matte white finish.',
+        'price': 399.99,
+        'old_price': None,
+        'material': 'wood',
+        'color': 'white',
+        'dimensions': '160x40x50 cm',
+        'weight': 30,
+        'stock': 18,
+        'is_featured': False,
+    },
+    {
+        'name': 'Oak Nightstand with Drawer',
+        'slug': 'oak-nightstand-drawer',
+        'category': 'nightstands',
+        'description': 'Compact nightstand crafted from solid oak. Features one drawer and an open shelf. Rounded edges and a warm natural finish.',
+        'price': 199.99,
+        'old_price': 249.99,
+        'material': 'wood',
+        'color': 'natural',
+        'dimensions': '45x35x55 cm',
+        'weight': 10,
+        'stock': 35,
+        'is_featured': False,
+    },
+    {
+        'name': 'Standing Desk - Adjustable Height',
+        'slug': 'standing-desk-adjustable',
+        'category': 'desks',
+        'description': 'Electric height-adjustable standing desk with memory presets. Bamboo top with steel frame. Smooth and quiet motor for effortless transitions between sitting and standing.',
+        'price': 799.99,
+        'old_price': 999.99,
+        'material': 'wood',
+        'color': 'natural',
+        'dimensions': '140x70x65-130 cm',
+        'weight': 35,
+        'stock': 14,
+        'is_featured': True,
+    },
+    {
+        'name': 'Glass Console Table',
+        'slug': 'glass-console-table',
+        'category': 'living-room',
+        'description': 'Elegant console table with tempered glass top and gold-finished metal frame. Perfect for entryways and living rooms.',
+        'price': 329.99,
+        'old_price': None,
+        'material': 'glass',
+        'color': 'natural',
+        'dimensions': '120x35x80 cm',
+        'weight': 15,
+        'stock': 22,
+        'is_featured': False,
+    },
+]
+
+BANNERS = [
+    {
+        'title': 'Elevate Your Living Space',
+        'subtitle': 'Discover our premium furniture collection designed for modern homes.',
+        'order': 1,
+    },
+    {
+        'title': 'Up to 30% Off Selected Items',
+        'subtitle': 'Limited time offers on sofas, beds, and dining sets. Shop now!',
+        'order': 2,
+    },
+    {
+        'title': 'New Arrivals for 2026',
+        'subtitle': 'Fresh designs that bring warmth and character to every room.',
+        'order': 3,
+    },
+]
+
+# Real furniture photos from Unsplash (free to use)
+PRODUCT_IMAGE_URLS = {
+    'modern-velvet-sofa': [
+        'https://images.unsplash.com/photo-1555041469-a586c61ea9bc?w=800&q=80',
+        'https://images.unsplash.com/photo-1493663284031-b7e3aefcae8e?w=800&q=80',
+        'https://images.unsplash.com/photo-1506439773649-6e0eb8cfb237?w=800&q=80',
+        'https://images.unsplash.com/photo-1567016432779-094069958ea5?w=800&q=80',
+    ],
+    'scandinavian-oak-coffee-table': [
+        'https://images.unsplash.com/photo-1533090481720-856c6e3c1fdc?w=800&q=80',
+        'https://images.unsplash.com/photo-1611967164521-abae8fba4668?w=800&q=80',
+        'https://images.unsplash.com/photo-1532372576444-dda954194ad0?w=800&q=80',
+    ],
+    'leather-executive-office-chair': [
+        'https://images.unsplash.com/photo-1580480055273-228ff5388ef8?w=800&q=80',
+        'https://images.unsplash.com/photo-1589364025530-3047cfa3a883?w=800&q=80',
+        'https://images.unsplash.com/photo-1541558869434-2840d308329a?w=800&q=80',
+    ],
+    'walnut-king-size-bed-frame': [
+        'https://images.unsplash.com/photo-1505693416388-ac5ce068fe85?w=800&q=80',
+        'https://images.unsplash.com/photo-1522771739844-6a9f6d5f14af?w=800&q=80',
+        'https://images.unsplash.com/photo-1588046130717-0eb0c9a3ba15?w=800&q=80',
+        'https://images.unsplash.com/photo-1540518614846-7eded433c457?w=800&q=80',
+    ],
+    'marble-top-dining-table': [
+        'https://images.unsplash.com/photo-1617806118233-18e1de247200?w=800&q=80',
+        'https://images.unsplash.com/photo-1595428774223-ef52624120d2?w=800&q=80',
+        'https://images.unsplash.com/photo-1604578762246-41134e37f9cc?w=800&q=80',
+    ],
+    'rattan-garden-lounge-set': [
+        'https://images.unsplash.com/photo-1600210492486-724fe5c67fb0?w=800&q=80',
+        'https://images.unsplash.com/photo-1558618666-fcd25c85f82e?w=800&q=80',
+        'https://images.unsplash.com/photo-1595659379706-6be068143afc?w=800&q=80',
+    ],
+    'industrial-metal-bookshelf': [
+        'https://images.unsplash.com/photo-1594620302200-9a762244a156?w=800&q=80',
+        'https://images.unsplash.com/photo-1507842217343-583bb7270b66?w=800&q=80',
+        'https://images.unsplash.com/photo-1600585152220-90363fe7e115?w=800&q=80',
+    ],
+    'velvet-dining-chair-set': [
+        'https://images.unsplash.com/photo-1551298370-9d3d53740c72?w=800&q=80',
+        'https://images.unsplash.com/photo-1503602642458-232111445657?w=800&q=80',
+        'https://images.unsplash.com/photo-1549497538-303791108f95?w=800&q=80',
+    ],
+    'minimalist-tv-stand': [
+        'https://images.unsplash.com/photo-1615874959474-d609969a20ed?w=800&q=80',
+        'https://images.unsplash.com/photo-1611269154421-4e27233ac5c7?w=800&q=80',
+        'https://images.unsplash.com/photo-1593696140826-c58b021acf8b?w=800&q=80',
+    ],
+    'oak-nightstand-drawer': [
+        'https://images.unsplash.com/photo-1532323544230-7191fd51bc1b?w=800&q=80',
+        'https://images.unsplash.com/photo-1543248939-4296e1a4d044?w=800&q=80',
+        'https://images.unsplash.com/photo-1556228453-efd6c1ff04f6?w=800&q=80',
+    ],
+    'standing-desk-adjustable': [
+        'https://images.unsplash.com/photo-1593642632559-0c6d3fc62b89?w=800&q=80',
+        'https://images.unsplash.com/photo-1518455027359-f3f8164ba6bd?w=800&q=80',
+        'https://images.unsplash.com/photo-1611269154421-4e27233ac5c7?w=800&q=80',
+    ],
+    'glass-console-table': [
+        'https://images.unsplash.com/photo-1555041469-a586c61ea9bc?w=800&q=80',
+        'https://images.unsplash.com/photo-1600210491892-03d54c0aaf87?w=800&q=80',
+        'https://images.unsplash.com/photo-1618220179428-22790b461013?w=800&q=80',
+    ],
+}
+
+BANNER_IMAGE_URLS = [
+    'https://images.unsplash.com/photo-1618219908412-a29a1bb7b86e?w=1920&q=80',
+    'https://images.unsplash.com/photo-1616486338812-3dadae4b4ace?w=1920&q=80',
+    'https://images.unsplash.com/photo-1586023492125-27b2c045efd7?w=1920&q=80',
+]
+
+CATEGORY_IMAGE_URLS = {
+    'living-room': 'https://images.unsplash.com/photo-1583847268964-b28dc8f51f92?w=800&q=80',
+    'bedroom': 'https://images.unsplash.com/photo-1522771739844-6a9f6d5f14af?w=800&q=80',
+    'dining': 'https://images.unsplash.com/photo-1617806118233-18e1de247200?w=800&q=80',
+    'office': 'https://images.unsplash.com/photo-1593642632559-0c6d3fc62b89?w=800&q=80',
+    'outdoor': 'https://images.unsplash.com/photo-1600210492486-724fe5c67fb0?w=800&q=80',
+    'storage': 'https://images.unsplash.com/photo-1594620302200-9a762244a156?w=800&q=80',
+}
@@ -0,0 +1,165 @@
+"""
+Pluggable full-text search for products.
+
+The backend is chosen by ``settings.PRODUCT_SEARCH_BACKEND`` (a dotted path);
+when that is empty it is picked from the database engine: an FTS5 virtual
+table on SQLite, a GIN-indexed ``tsvector`` expression on PostgreSQL, and a
+plain ``icontains`` scan everywhere else.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+FTS_TABLE = 'products_product_fts'
+TSVECTOR_CONFIG = 'english'
+TSVECTOR_SQL = (
+    "to_tsvector('" + TSVECTOR_CONFIG + "', "
+    "coalesce({table}.\"name\", '') || ' ' || coalesce({table}.\"description\", ''))"
+)
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    """Split a free-text query into plain word terms."""
+    return TERM_RE.findall(query.lower())
+
+
+class DatabaseSearchBackend:
+    """Fallback backend: ``icontains`` on name and description."""
+
+    def search(self, queryset, query, ranked=False):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+        for term in terms:
+            queryset = queryset.filter(
+                models.Q(name__icontains=term) |
+                models.Q(description__icontains=term)
+            )
+        return queryset
+
+    def index(self, product):
+        pass
+
+    def remove(self, product_id):
+        pass
+
+    def reindex(self, queryset):
+        return 0
+
+
+class SQLiteFTSBackend(DatabaseSearchBackend):
+    """
+    SQLite FTS5 backend.
+
+    ``products_product_fts`` holds one row per product keyed by ``rowid`` =
+    product id. Every term is matched as a prefix and results are ranked with
+    ``bm25`` (name weighted above description; lower is better).
+    """
+
+    name_weight = 10.0
+    description_weight = 1.0
+
+    def match_expression(self, query):
+        return ' AND '.join(f'"{term}"*' for term in search_terms(query))
+
+    def search(self, queryset, query, ranked=False):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        table = queryset.model._meta.db_table
+        queryset = queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]
+        ))
+        if ranked:
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f'SELECT bm25({FTS_TABLE}, %s, %s) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = "{table}"."id"',
+                [self.name_weight, self.description_weight, match],
+                output_field=models.FloatField(),
+            )).order_by('search_rank')
+        return queryset
+
+    def index(self, product):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [product.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)',
+                [product.pk, product.name, product.description],
+            )
+
+    def remove(self, product_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [product_id])
+
+    def reindex(self, queryset):
+        table = queryset.model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+                f'SELECT id, name, description FROM "{table}"'
+            )
+            indexed = cursor.rowcount
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        return indexed
+
+
+class PostgresSearchBackend(DatabaseSearchBackend):
+    """
+    PostgreSQL backend.
+
+    Matches against the same ``to_tsvector`` expression the
+    ``products_product_search_gin`` index is built on, so the planner can use
+    the index. Terms are prefix-matched with ``:*`` and ranked with
+    ``ts_rank`` (higher is better). The index is maintained by PostgreSQL
+    itself, so ``index``/``remove`` have nothing to do.
+    """
+
+    def tsquery(self, query):
+        return ' & '.join(f'{term}:*' for term in search_terms(query))
+
+    def search(self, queryset, query, ranked=False):
+        tsquery = self.tsquery(query)
+        if not tsquery:
+            return queryset.none()
+        vector = TSVECTOR_SQL.format(table=f'"{queryset.model._meta.db_table}"')
+        queryset = queryset.filter(RawSQL(
+            f"{vector} @@ to_tsquery('{TSVECTOR_CONFIG}', %s)", [tsquery],
+            output_field=models.BooleanField(),
+        ))
+        if ranked:
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f"ts_rank({vector}, to_tsquery('{TSVECTOR_CONFIG}', %s))", [tsquery],
+                output_field=models.FloatField(),
+            )).order_by('-search_rank')
+        return queryset
+
+    def reindex(self, queryset):
+        with connection.cursor() as cursor:
+            cursor.execute('REINDEX INDEX products_product_search_gin')
+        return queryset.count()
+
+
+VENDOR_BACKENDS = {
+    'sqlite': 'products.search.SQLiteFTSBackend',
+    'postgresql': 'products.search.PostgresSearchBackend',
+}
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_search_backend():
+    """Return the configured search backend instance."""
+    path = getattr(settings, 'PRODUCT_SEARCH_BACKEND', '') or VENDOR_BACKENDS.get(
+        connection.vendor, 'products.search.DatabaseSearchBackend'
+    )
+    return _load_backend(path)
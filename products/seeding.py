@@ -0,0 +1,101 @@
+"""
+Bulk seeding helpers shared by the seeding management commands.
+
+Rows are written with ``bulk_create`` in batches, one transaction per
+batch, so model ``save()`` and signals are bypassed. The helpers fill in
+what those would have maintained: category paths and product cover images.
+Rebuild the search index afterwards (``reindex_products``).
+"""
+import random
+from itertools import islice
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models.functions import Now
+
+from .models import Category, Product, ProductImage
+
+SYNTHETIC_ADJECTIVES = [
+    'Modern', 'Scandinavian', 'Rustic', 'Industrial', 'Classic', 'Minimalist',
+    'Vintage', 'Luxury', 'Compact', 'Mid-Century', 'Coastal', 'Nordic',
+]
+
+
+def batched(items, size):
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def seed_categories(categories, subcategories):
+    """
+    Create missing categories from ``(name, slug)`` and ``(name, slug, parent_slug)`` rows.
+
+    Returns every category by slug.
+    """
+    existing = Category.objects.in_bulk(field_name='slug')
+    with transaction.atomic():
+        for rows in ([(name, slug, None) for name, slug in categories], subcategories):
+            new = [
+                Category(name=name, slug=slug, parent=existing[parent_slug] if parent_slug else None)
+                for name, slug, parent_slug in rows if slug not in existing
+            ]
+            Category.objects.bulk_create(new)
+            for category in new:
+                parent_path = category.parent.path if category.parent else ''
+                category.path = f'{parent_path}{category.pk}/'
+                category.depth = category.path.count('/') - 1
+                existing[category.slug] = category
+            Category.objects.bulk_update(new, ['path', 'depth'])
+    return existing
+
+
+def seed_products(products, batch_size=1000):
+    """Create products from unsaved ``Product`` instances, skipping slugs that exist. Returns the number created."""
+    created = 0
+    for batch in batched(products, batch_size):
+        taken = set(Product.objects.filter(slug__in=[product.slug for product in batch]).values_list('slug', flat=True))
+        new = [product for product in batch if product.slug not in taken]
+        with transaction.atomic():
+            Product.objects.bulk_create(new)
+        created += len(new)
+    return created
+
+
+def synthetic_products(categories, count, prefix='synthetic-', start=0, seed=0):
+    """Yield ``count`` unsaved, randomly generated products spread over ``categories``."""
+    rand = random.Random(seed)
+    materials = [value for value, label in Product.MATERIAL_CHOICES]
+    colors = [value for value, label in Product.COLOR_CHOICES]
+    for i in range(start, start + count):
+        category = rand.choice(categories)
+        material, color = rand.choice(materials), rand.choice(colors)
+        price = Decimal(rand.randint(50, 5000)) - Decimal('0.01')
+        yield Product(
+            name=f'{rand.choice(SYNTHETIC_ADJECTIVES)} {material.title()} {category.name.rstrip("s")} {i}',
+            slug=f'{prefix}{i}',
+            category=category,
+            description=f'{color.title()} {material} piece for the {category.name.lower()}.',
+            price=price,
+            old_price=(price * Decimal('1.2')).quantize(Decimal('0.01')) if rand.random() < 0.2 else None,
+            material=material,
+            color=color,
+            stock=0 if rand.random() < 0.1 else rand.randint(1, 500),
+            is_featured=rand.random() < 0.01,
+        )
+
+
+def seed_images(images, batch_size=5000):
+    """Create ``ProductImage`` rows in batches and refresh their products' cover images."""
+    for batch in batched(images, batch_size):
+        with transaction.atomic():
+            ProductImage.objects.bulk_create(batch)
+            refresh_cover_images(Product.objects.filter(pk__in={image.product_id for image in batch}))
+
+
+def refresh_cover_images(queryset):
+    """Recompute ``cover_image`` for ``queryset`` in one UPDATE."""
+    cover = ProductImage.objects.filter(
+        product=models.OuterRef('pk')
+    ).order_by('-is_primary', 'order', 'pk').values('pk')[:1]
+    queryset.update(cover_image=models.Subquery(cover), updated_at=Now())
@@ -0,0 +1,27 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(image, sizes='100vw', **attrs):
+    """
+    Render a ``<picture>`` for a ProductImage with WebP and JPEG srcsets.
+
+    Falls back to a plain ``<img>`` of the original file until renditions
+    have been generated. Extra keyword arguments become ``<img>`` attributes::
+
+        {% picture product.primary_image sizes="80px" class="rounded" alt=product.name %}
+    """
+    attributes = format_html_join(' ', '{}="{}"', sorted(attrs.items()))
+    if not image.rendition_widths:
+        return format_html('<img src="{}" loading="lazy" {}>', image.image.url, attributes)
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" loading="lazy" {}>'
+        '</picture>',
+        image.srcset('webp'), sizes,
+        image.image.url, image.srcset('jpg'), sizes, attributes,
+    )
@@ -1,3 +1,477 @@
-from django.test import TestCase
+import base64
+import datetime
+import re
+import tempfile
+import unittest
+from decimal import Decimal
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.http import QueryDict
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from cart.models import Order, OrderItem
+from core.cache import _product_cards
+from .conditional import catalog_signature
+from .filters import PRICE_BUCKETS, SORT_OPTIONS, ProductFilter
+from .models import CatalogVersion, Category, Product, ProductImage, RelatedProduct
+from .pagination import InvalidCursor, KeysetPaginator
+from .recommendations import CatalogSnapshot, get_related_products, rebuild_related_products
+from .renditions import rendition_name
+from .search import get_search_backend
+
+FULL_SCAN = re.compile(r'\bSCAN products_product\b(?! USING)')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite specific')
+class QueryPlanTests(TestCase):
+    """The hot product queries must be answered from an index, never a full table scan."""
+
+    CANONICAL_FILTERS = [
+        {},
+        {'sort': 'price_asc'},
+        {'sort': 'price_desc'},
+        {'sort': 'name'},
+        {'sort': 'newest'},
+        {'category': 'living'},
+        {'category': 'sofas'},
+        {'material': 'wood'},
+        {'color': 'grey'},
+        {'min_price': '100', 'max_price': '500'},
+        {'min_price': '100', 'sort': 'price_asc'},
+        {'category': 'living', 'material': 'wood'},
+        {'category': 'living', 'sort': 'price_desc'},
+        {'material': 'wood', 'color': 'grey', 'sort': 'name'},
+        {'q': 'sofa'},
+        {'q': 'sofa', 'category': 'living', 'sort': 'price_asc'},
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        living = Category.objects.create(name='Living', slug='living')
+        sofas = Category.objects.create(name='Sofas', slug='sofas', parent=living)
+        office = Category.objects.create(name='Office', slug='office')
+        categories = [living, sofas, office]
+        materials = [value for value, label in Product.MATERIAL_CHOICES]
+        colors = [value for value, label in Product.COLOR_CHOICES]
+        Product.objects.bulk_create([
+            Product(
+                name=f'Sofa {i}' if i % 4 == 0 else f'Chair {i}',
+                slug=f'product-{i}',
+                category=categories[i % len(categories)],
+                description='Furniture',
+                price=Decimal(50 + i * 7 % 2000),
+                stock=i % 3,
+                material=materials[i % len(materials)],
+                color=colors[i % len(colors)],
+                is_featured=i % 10 == 0,
+            )
+            for i in range(500)
+        ])
+        get_search_backend().reindex(Product.objects.all())
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assertNoFullScan(self, queryset):
+        plan = queryset.explain()
+        self.assertIsNone(FULL_SCAN.search(plan), f'Full scan of products_product:\n{plan}')
+
+    def catalog_queryset(self, data, cursor=False, reverse=False):
+        product_filter = ProductFilter(data, queryset=Product.objects.filter(stock__gt=0))
+        paginator = KeysetPaginator(product_filter.qs, product_filter.ordering)
+        queryset = paginator.queryset
+        if cursor:
+            anchor = Product.objects.order_by('pk')[250]
+            queryset = queryset.filter(paginator._seek(getattr(anchor, paginator.field_name), anchor.pk, reverse))
+        return queryset.order_by(*paginator._order_by(reverse))[:paginator.per_page + 1]
+
+    def test_catalog_first_page(self):
+        for data in self.CANONICAL_FILTERS:
+            with self.subTest(**data):
+                self.assertNoFullScan(self.catalog_queryset(data))
+
+    def test_catalog_cursor_pages(self):
+        for data in self.CANONICAL_FILTERS:
+            for reverse in (False, True):
+                with self.subTest(reverse=reverse, **data):
+                    self.assertNoFullScan(self.catalog_queryset(data, cursor=True, reverse=reverse))
+
+    def test_catalog_signature(self):
+        with CaptureQueriesContext(connection) as queries:
+            catalog_signature(RequestFactory().get('/products/'))
+        for query in queries:
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                plan = '\n'.join(row[-1] for row in cursor.fetchall())
+            # Not even a covering index scan: it runs on every 304 revalidation.
+            self.assertNotRegex(plan, r'\bSCAN products_product\b')
+
+    def test_catalog_signature_sees_deletions(self):
+        request = RequestFactory().get('/products/')
+        before = catalog_signature(request)
+        Product.objects.order_by('updated_at').first().delete()
+        self.assertNotEqual(catalog_signature(request), before)
+
+    def test_home(self):
+        self.assertNoFullScan(_product_cards().filter(is_featured=True)[:8])
+        self.assertNoFullScan(_product_cards().order_by('-created_at')[:8])
+
+    def test_product_detail(self):
+        product = Product.objects.filter(stock__gt=0).first()
+        self.assertNoFullScan(Product.objects.filter(slug=product.slug))
+        self.assertNoFullScan(
+            Product.objects.filter(category=product.category, stock__gt=0).exclude(pk=product.pk)[:4]
+        )
+        self.assertNoFullScan(
+            Product.objects.filter(recommended_for__product=product, stock__gt=0).order_by('recommended_for__rank')[:4]
+        )
+
+
+class FacetCountTests(TestCase):
+    """Each facet is counted with every active filter except its own."""
+
+    @classmethod
+    def setUpTestData(cls):
+        living = Category.objects.create(name='Living', slug='living')
+        Category.objects.create(name='Sofas', slug='sofas', parent=living)
+        Category.objects.create(name='Office', slug='office')
+        categories = list(Category.objects.order_by('pk'))
+        materials = [value for value, label in Product.MATERIAL_CHOICES]
+        colors = [value for value, label in Product.COLOR_CHOICES]
+        Product.objects.bulk_create([
+            Product(
+                name=f'Product {i}', slug=f'product-{i}', category=categories[i % 3], description='Furniture',
+                price=Decimal(100 + i * 37 % 2500), stock=1,
+                material=materials[i % len(materials)], color=colors[i * 7 % len(colors)],
+            )
+            for i in range(300)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def expected(self, data, facet, value):
+        """Count by hand: ``facet = value`` plus every filter in ``data`` but ``facet``'s own."""
+        tree = {'living': {'living', 'sofas'}, 'sofas': {'sofas'}, 'office': {'office'}}
+        checks = {
+            'category': lambda product, slug: product.category.slug in tree[slug],
+            'material': lambda product, material: product.material == material,
+            'color': lambda product, color: product.color == color,
+            'price': lambda product, bounds: (
+                (bounds[0] is None or product.price >= bounds[0]) and (bounds[1] is None or product.price <= bounds[1])
+            ),
+            'bucket': lambda product, bucket: (
+                (bucket[0] is None or product.price >= bucket[0]) and (bucket[1] is None or product.price < bucket[1])
+            ),
+        }
+        own = {'min_price', 'max_price'} if facet == 'price' else {facet}
+        filters = {name: value for name, value in data.items() if name not in own}
+        if 'min_price' in filters or 'max_price' in filters:
+            filters['price'] = (filters.pop('min_price', None), filters.pop('max_price', None))
+        filters['bucket' if facet == 'price' else facet] = value
+        products = Product.objects.select_related('category')
+        return sum(all(checks[name](product, wanted) for name, wanted in filters.items()) for product in products)
+
+    def test_counts_exclude_own_facet(self):
+        materials = [value for value, label in Product.MATERIAL_CHOICES]
+        colors = [value for value, label in Product.COLOR_CHOICES]
+        for data in [
+            {'material': materials[0]},
+            {'category': 'living', 'color': colors[1]},
+            {'category': 'sofas', 'material': materials[1], 'color': colors[0], 'min_price': 500},
+            {'material': materials[2], 'max_price': 1000},
+        ]:
+            with self.subTest(**data):
+                counts = ProductFilter(data, queryset=Product.objects.all()).facet_counts(['living', 'sofas', 'office'])
+                for slug in ('living', 'sofas', 'office'):
+                    self.assertEqual(counts['category'][slug], self.expected(data, 'category', slug))
+                for material in materials:
+                    self.assertEqual(counts['material'][material], self.expected(data, 'material', material))
+                for color in colors:
+                    self.assertEqual(counts['color'][color], self.expected(data, 'color', color))
+                for bucket in PRICE_BUCKETS:
+                    self.assertEqual(counts['price'][bucket], self.expected(data, 'price', bucket))
+
+    def test_boundary_prices_fall_in_one_bucket(self):
+        category = Category.objects.get(slug='office')
+        Product.objects.bulk_create([
+            Product(name=f'Boundary {price}', slug=f'boundary-{price}', category=category, price=price, stock=1)
+            for price in (250, 500, 1000, 2000)
+        ])
+        counts = ProductFilter({}, queryset=Product.objects.all()).facet_counts([])
+        self.assertEqual(sum(counts['price'].values()), Product.objects.count())
+        for bucket in PRICE_BUCKETS:
+            self.assertEqual(counts['price'][bucket], self.expected({}, 'price', bucket))
+
+    def test_bucket_links_match_counts(self):
+        Product.objects.create(name='Boundary', slug='boundary', category=Category.objects.get(slug='office'), price=500)
+        response = self.client.get(reverse('products:catalog'), {'material': Product.MATERIAL_CHOICES[0][0]})
+        for bucket in response.context['price_buckets']:
+            with self.subTest(bucket=bucket['label']):
+                product_filter = ProductFilter(QueryDict(bucket['query']), queryset=Product.objects.all())
+                self.assertEqual(product_filter.qs.count(), bucket['count'])
+
+
+class KeysetPaginatorTests(TestCase):
+    """Cursors walk every sort in both directions without skipping or repeating rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Living', slug='living')
+        Product.objects.bulk_create([
+            # Few distinct prices, names and timestamps, so most pages split a run of equal values.
+            Product(name=f'Chair {i % 4}', slug=f'chair-{i}', category=category, price=Decimal(100 + i % 3 * 50), stock=1)
+            for i in range(23)
+        ])
+        start = timezone.now()
+        for i, pk in enumerate(Product.objects.order_by('pk').values_list('pk', flat=True)):
+            Product.objects.filter(pk=pk).update(created_at=start - datetime.timedelta(days=i % 5))
+
+    def expected(self, ordering):
+        pk = '-pk' if ordering.startswith('-') else 'pk'
+        return list(Product.objects.order_by(ordering, pk).values_list('pk', flat=True))
+
+    def pks(self, page):
+        return [product.pk for product in page]
+
+    def test_cursors_round_trip_for_each_sort(self):
+        for ordering in SORT_OPTIONS.values():
+            with self.subTest(ordering=ordering):
+                paginator = KeysetPaginator(Product.objects.all(), ordering, per_page=5)
+                pages = [paginator.get_page()]
+                self.assertFalse(pages[0].has_previous)
+                while pages[-1].has_next:
+                    pages.append(paginator.get_page(pages[-1].next_cursor))
+                self.assertEqual([pk for page in pages for pk in self.pks(page)], self.expected(ordering))
+                self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 3])
+
+                backwards = [pages[-1]]
+                while backwards[-1].has_previous:
+                    backwards.append(paginator.get_page(backwards[-1].previous_cursor))
+                self.assertEqual([self.pks(page) for page in reversed(backwards)], [self.pks(page) for page in pages])
+                self.assertTrue(all(page.has_next for page in backwards[1:]))
+
+    def test_equal_values_are_ordered_by_pk(self):
+        Product.objects.update(price=Decimal('250.00'))
+        for ordering, key in [('price', 'pk'), ('-price', '-pk')]:
+            with self.subTest(ordering=ordering):
+                paginator = KeysetPaginator(Product.objects.all(), ordering, per_page=4)
+                page, seen = paginator.get_page(), []
+                seen += self.pks(page)
+                while page.has_next:
+                    page = paginator.get_page(page.next_cursor)
+                    seen += self.pks(page)
+                self.assertEqual(seen, list(Product.objects.order_by(key).values_list('pk', flat=True)))
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        paginator = KeysetPaginator(Product.objects.all(), 'price', per_page=5)
+        first = self.pks(paginator.get_page())
+
+        def encode(payload):
+            return base64.urlsafe_b64encode(payload.encode()).decode()
+
+        for cursor in [
+            'not a cursor', '!!!', encode('{}'), encode('5'), encode('["1.00", 1]'),
+            encode('["cheap", 1, 0]'), encode('["1.00", "a", 0]'), encode('[null, 1, 0]'),
+        ]:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    paginator.decode_cursor(cursor)
+                page = paginator.get_page(cursor)
+                self.assertEqual(self.pks(page), first)
+                self.assertFalse(page.has_previous)
+
+
+class CatalogETagTests(TestCase):
+    """Catalog validators come from the database, so any worker answers a revalidation with a 304."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name='Living', slug='living')
+        cls.products = [
+            Product.objects.create(name=f'Sofa {i}', slug=f'sofa-{i}', category=cls.category, price=100, stock=1)
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def urls(self):
+        return [reverse('products:catalog'), self.products[0].get_absolute_url()]
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, headers={'If-None-Match': etag}).status_code
+
+    def test_etag_survives_a_cold_cache(self):
+        for url in self.urls():
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                cache.clear()
+                self.assertEqual(self.revalidate(url, etag), 304)
+
+    def test_etag_changes_with_categories_and_deletions(self):
+        for change in [self.category.save, self.products[1].delete]:
+            etags = {url: self.client.get(url)['ETag'] for url in self.urls()}
+            change()
+            for url, etag in etags.items():
+                with self.subTest(change=change, url=url):
+                    self.assertEqual(self.revalidate(url, etag), 200)
+
+    def test_bump(self):
+        before = CatalogVersion.current()
+        CatalogVersion.bump('deletions')
+        CatalogVersion.bump('categories')
+        self.assertEqual(CatalogVersion.current(), (before[0] + 1, before[1] + 1))
+
+
+class RelatedProductsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        living = Category.objects.create(name='Living', slug='living')
+        sofas = Category.objects.create(name='Sofas', slug='sofas', parent=living)
+        chairs = Category.objects.create(name='Chairs', slug='chairs', parent=living)
+        office = Category.objects.create(name='Office', slug='office')
+
+        def product(slug, category, price, material='wood', color='grey', stock=5):
+            return Product.objects.create(
+                name=slug.title(), slug=slug, category=category, price=price,
+                material=material, color=color, stock=stock,
+            )
+
+        cls.sofa = product('sofa', sofas, 500)
+        cls.other_sofa = product('other-sofa', sofas, 1000, material='metal', color='white')
+        cls.sold_out = product('sold-out-sofa', sofas, 500, stock=0)
+        cls.chair = product('chair', chairs, 120)
+        cls.desk = product('desk', office, 5000, material='metal', color='white')
+        cls.lamp = product('lamp', office, 4000, material='metal', color='white')
+
+        # The desk shares nothing with the sofa but three orders.
+        for i in range(3):
+            order = Order.objects.create(full_name='Customer', phone='1', address='1 Street', city='Tashkent', total_price=1)
+            for item in (cls.sofa, cls.desk, cls.sold_out):
+                OrderItem.objects.create(order=order, product=item, product_name=item.name, price=item.price)
+
+    def related(self, product):
+        return list(RelatedProduct.objects.filter(product=product).values_list('related__slug', flat=True))
+
+    def test_co_purchase_outranks_category_match(self):
+        snapshot = CatalogSnapshot()
+        sofa, other_sofa, desk = (snapshot.items[p.pk] for p in (self.sofa, self.other_sofa, self.desk))
+        self.assertGreater(snapshot.score(sofa, desk, bought_together=3), snapshot.score(sofa, other_sofa))
+
+        rebuild_related_products(full=True)
+        related = self.related(self.sofa)
+        self.assertEqual(related[0], 'desk')
+        self.assertIn('other-sofa', related)
+
+    def test_out_of_stock_products_are_never_recommended(self):
+        rebuild_related_products(full=True)
+        self.assertTrue(RelatedProduct.objects.exists())
+        self.assertFalse(RelatedProduct.objects.filter(related=self.sold_out).exists())
+
+    def test_incremental_build_recomputes_changed_products_and_price_neighbours(self):
+        rebuild_related_products(full=True)
+        built = dict(RelatedProduct.objects.values_list('product__slug', 'computed_at').distinct())
+        self.chair.price = 130
+        self.chair.save()
+
+        products, rows = rebuild_related_products()
+
+        # The chair, plus the in-stock products priced near it under the same top-level category.
+        self.assertEqual(products, 3)
+        rebuilt = dict(RelatedProduct.objects.values_list('product__slug', 'computed_at').distinct())
+        changed = {slug for slug in rebuilt if rebuilt[slug] != built[slug]}
+        self.assertEqual(changed, {'chair', 'sofa', 'other-sofa'})
+
+        self.assertEqual(rebuild_related_products(), (0, 0))
+
+    def test_full_build_replaces_existing_rows(self):
+        RelatedProduct.objects.create(
+            product=self.lamp, related=self.sold_out, rank=0, score=99, computed_at=timezone.now(),
+        )
+        call_command('build_related_products', full=True, stdout=StringIO())
+        self.assertNotIn('sold-out-sofa', self.related(self.lamp))
+        self.assertEqual(self.related(self.lamp), ['desk'])
+        self.assertEqual(RelatedProduct.objects.values('computed_at').distinct().count(), 1)
+
+    def test_falls_back_to_category_without_recommendations(self):
+        self.assertEqual(get_related_products(self.sofa), [self.other_sofa])
+
+        rebuild_related_products(full=True)
+        related = get_related_products(self.sofa)
+        self.assertEqual(related[0], self.desk)
+        self.assertNotIn(self.sold_out, related)
+
+
+class RenditionTests(TestCase):
+    """Renditions are encoded by ``generate_renditions``, never in the request that saves the image."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(
+            name='Sofa', slug='sofa', category=Category.objects.create(name='Living', slug='living'), price=100,
+        )
+
+    def setUp(self):
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=tempdir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def image(self, color='red'):
+        buffer = BytesIO()
+        Image.new('RGB', (400, 300), color).save(buffer, 'PNG')
+        return ProductImage.objects.create(product=self.product, image=ContentFile(buffer.getvalue(), name='sofa.png'))
+
+    def renditions(self, image):
+        return [
+            name for width in (320, 400) for ext in ('webp', 'jpg')
+            if default_storage.exists(name := rendition_name(image.image.name, width, ext))
+        ]
+
+    def generate(self):
+        call_command('generate_renditions', workers=1, stdout=StringIO())
+
+    def test_saving_does_not_encode(self):
+        image = self.image()
+        self.assertEqual(image.rendition_widths, [])
+        self.assertFalse(default_storage.exists('renditions'))
+
+        self.generate()
+        image.refresh_from_db()
+        self.assertEqual(image.rendition_widths, [320, 400])
+        self.assertEqual(len(self.renditions(image)), 4)
+
+    def test_replacing_the_image_resets_renditions(self):
+        image = self.image()
+        self.generate()
+        image.refresh_from_db()
+        buffer = BytesIO()
+        Image.new('RGB', (400, 300), 'blue').save(buffer, 'PNG')
+        image.image = ContentFile(buffer.getvalue(), name='blue.png')
+        image.save()
+        image.refresh_from_db()
+        self.assertEqual(image.rendition_widths, [])
+
+    def test_deleting_removes_renditions_of_unshared_files(self):
+        shared, other = self.image(), self.image()
+        self.assertEqual(shared.image.name, other.image.name)
+        self.generate()
+        shared.refresh_from_db()
+        other.refresh_from_db()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            shared.delete()
+        self.assertEqual(len(self.renditions(other)), 4)
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertEqual(self.renditions(other), [])
@@ -0,0 +1,89 @@
+"""
+Cached category tree.
+
+The whole tree is built from one query ordered by depth and name, stored in
+the cache under the category version token, and memoized per process until
+the token changes or expires (``CACHE_VERSION_TIMEOUT``). Each node knows the ids of itself and all of its
+descendants, so filtering products by any ancestor is a single
+``category_id IN (...)`` lookup on the indexed foreign key.
+"""
+from django.core.cache import cache
+from django.urls import reverse
+
+from .cache import get_category_version
+from .models import Category
+
+CATEGORY_TREE_TIMEOUT = 60 * 60 * 24
+
+_memo = (None, None)
+
+
+class CategoryNode:
+    """A read-only category in the cached tree."""
+
+    def __init__(self, pk, name, slug, parent_id, depth):
+        self.pk = pk
+        self.name = name
+        self.slug = slug
+        self.parent_id = parent_id
+        self.depth = depth
+        self.children = []
+        self.descendant_ids = [pk]
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        return f"{reverse('products:catalog')}?category={self.slug}"
+
+
+class CategoryTree:
+
+    def __init__(self, rows):
+        self.by_slug = {}
+        nodes = {}
+        self.roots = []
+        for pk, name, slug, parent_id, depth in rows:
+            node = CategoryNode(pk, name, slug, parent_id, depth)
+            nodes[pk] = node
+            self.by_slug[slug] = node
+            parent = nodes.get(parent_id)
+            if parent is None:
+                self.roots.append(node)
+            else:
+                parent.children.append(node)
+
+        for node in sorted(nodes.values(), key=lambda node: -node.depth):
+            parent = nodes.get(node.parent_id)
+            if parent is not None:
+                parent.descendant_ids.extend(node.descendant_ids)
+
+    def __iter__(self):
+        """All nodes, parents before their children."""
+        stack = list(reversed(self.roots))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def descendant_ids(self, slug):
+        """Ids of the category ``slug`` and everything below it; empty if unknown."""
+        node = self.by_slug.get(slug)
+        return node.descendant_ids if node else []
+
+
+def get_category_tree():
+    global _memo
+    version = get_category_version()
+    memo_version, tree = _memo
+    if memo_version == version:
+        return tree
+    tree = cache.get_or_set(
+        f'categories:tree:{version}',
+        lambda: CategoryTree(
+            Category.objects.order_by('depth', 'name').values_list('pk', 'name', 'slug', 'parent_id', 'depth')
+        ),
+        CATEGORY_TREE_TIMEOUT,
+    )
+    _memo = (version, tree)
+    return tree
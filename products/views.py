@@ -1,34 +1,108 @@
+from decimal import Decimal
+
 from django.shortcuts import render, get_object_or_404
-from .models import Product, Category
-from .filters import ProductFilter
+from favorites.context_processors import request_favorite_ids
+from .conditional import catalog_signature, conditional_page, product_signature
+from .models import Product
+from .filters import PRICE_BUCKETS, ProductFilter
+from .pagination import KeysetPaginator, approximate_count
+from .recommendations import get_related_products
+from .tree import get_category_tree
+
+PRODUCTS_PER_PAGE = 24
+PRODUCT_COUNT_CAP = 1000
+
+
+def _cursor_query(request, cursor):
+    """Current query string with the cursor replaced."""
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return params.urlencode()
+
+
+def _price_bucket_label(min_price, max_price):
+    if min_price is None:
+        return f'Under ${max_price}'
+    if max_price is None:
+        return f'${min_price}+'
+    return f'${min_price} - ${max_price}'
+
 
+def _facets(request, product_filter, tree):
+    """Facet counts for the sidebar, with its option lists."""
+    counts = product_filter.facet_counts([node.slug for node in tree])
 
+    def category_options(nodes):
+        return [
+            {'category': node, 'count': counts['category'].get(node.slug, 0), 'children': category_options(node.children)}
+            for node in nodes
+        ]
+
+    def choice_options(facet, choices):
+        selected = request.GET.get(facet, '')
+        return [
+            {'value': value, 'label': label, 'count': counts[facet].get(value, 0), 'selected': value == selected}
+            for value, label in choices
+        ]
+
+    price_buckets = []
+    for min_price, max_price in PRICE_BUCKETS:
+        params = request.GET.copy()
+        params.pop('cursor', None)
+        # ``max_price`` is inclusive; stop a cent short so the link matches the half-open bucket.
+        below = None if max_price is None else Decimal(max_price) - Decimal('0.01')
+        for name, value in (('min_price', min_price), ('max_price', below)):
+            if value is None:
+                params.pop(name, None)
+            else:
+                params[name] = value
+        price_buckets.append({
+            'label': _price_bucket_label(min_price, max_price),
+            'query': params.urlencode(),
+            'count': counts['price'].get((min_price, max_price), 0),
+        })
+
+    return {
+        'category_options': category_options(tree.roots),
+        'material_options': choice_options('material', Product.MATERIAL_CHOICES),
+        'color_options': choice_options('color', Product.COLOR_CHOICES),
+        'price_buckets': price_buckets,
+    }
+
+
+@conditional_page(catalog_signature)
 def catalog(request):
     queryset = Product.objects.filter(stock__gt=0).select_related('category').prefetch_related('images')
     product_filter = ProductFilter(request.GET, queryset=queryset)
-    categories = Category.objects.filter(parent__isnull=True).prefetch_related('children')
+    tree = get_category_tree()
+
+    paginator = KeysetPaginator(product_filter.qs, product_filter.ordering, per_page=PRODUCTS_PER_PAGE)
+    page = paginator.get_page(request.GET.get('cursor'))
+    product_count, product_count_exact = approximate_count(product_filter.qs, cap=PRODUCT_COUNT_CAP)
 
     return render(request, 'products/catalog.html', {
+        **_facets(request, product_filter, tree),
         'filter': product_filter,
-        'products': product_filter.qs,
-        'categories': categories,
+        'products': page,
+        'page': page,
+        'next_query': _cursor_query(request, page.next_cursor) if page.has_next else '',
+        'previous_query': _cursor_query(request, page.previous_cursor) if page.has_previous else '',
+        'product_count': product_count,
+        'product_count_exact': product_count_exact,
         'current_category': request.GET.get('category', ''),
         'current_sort': request.GET.get('sort', ''),
     })
 
 
+@conditional_page(product_signature)
 def product_detail(request, slug):
     product = get_object_or_404(
         Product.objects.select_related('category').prefetch_related('images'),
         slug=slug
     )
-    related_products = Product.objects.filter(
-        category=product.category, stock__gt=0
-    ).exclude(pk=product.pk).prefetch_related('images')[:4]
+    related_products = get_related_products(product)
 
-    is_favorite = False
-    if request.user.is_authenticated:
-        is_favorite = product.favorites.filter(user=request.user).exists()
+    is_favorite = product.pk in request_favorite_ids(request)
 
     return render(request, 'products/product_detail.html', {
         'product': product,
@@ -115,6 +115,23 @@ function toggleFavorite(productId, btn) {
     });
 }
 
+// Fill the hearts of cached product cards from the #favorite-ids payload
+document.addEventListener('DOMContentLoaded', function() {
+    const payload = document.getElementById('favorite-ids');
+    if (!payload) return;
+    const ids = new Set(JSON.parse(payload.textContent));
+    document.querySelectorAll('.fav-btn[data-product-id]').forEach(btn => {
+        if (ids.has(parseInt(btn.dataset.productId, 10))) {
+            btn.querySelector('i').className = 'bi bi-heart-fill text-danger';
+        }
+    });
+});
+
+// Fill the cart badge from the cart_count cookie kept by CartCountMiddleware
+document.addEventListener('DOMContentLoaded', function() {
+    updateCartBadge(parseInt(getCookie('cart_count'), 10) || 0);
+});
+
 // Initialize product card swipers
 document.addEventListener('DOMContentLoaded', function() {
     document.querySelectorAll('[class*="product-swiper-"]').forEach(el => {